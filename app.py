@@ -1,134 +1,39 @@
+from __future__ import annotations
+
 import streamlit as st
-import pandas as pd
-from fpdf import FPDF
 from datetime import datetime, date, timedelta
-import os, copy, io
-import requests
+from concurrent.futures import ThreadPoolExecutor
+import os, io
 import base64
 import math
-import calendar
+from urllib.parse import urlsplit
 from zoneinfo import ZoneInfo
 
-from utils import fmt_weight  # totals
-from utils import fmt_qty  # per-unit
-
-from bulk_section import draw_bulk_section, bulk_sections
-from recipes_section import draw_recipes_section, meal_recipes
-from prepack_room_section import draw_prepack_room_section
-from meat_veg_section import draw_meat_veg_section
-
-# ---------- PDF Header (HACCP) ----------
-# These are intentionally static and only change when HACCP docs are reviewed.
-HACCP_LATEST_ISSUE_DATE = "13/01/24"
-HACCP_PREVIOUS_ISSUE_DATE = "28/10/23"
-HACCP_APPROVED_BY = "T. Fadlallah"
-HACCP_PREPARED_BY = "C. Guzzardi"
-
-
-class ProductionPDF(FPDF):
-    """
-    FPDF with a fixed HACCP header rendered on every page.
-
-    Important:
-    - fpdf (classic) is latin-1 only. Any unicode (e.g. “–”, “—”, smart quotes) will crash output().
-    - We defensively coerce ALL text going into cell/multi_cell into latin-1 (with replacement)
-      so a single bad character can’t break the whole report.
-    """
-
-    def __init__(self, *args, header_date_str: str, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.header_date_str = header_date_str
-
-        # Header layout constants (mm)
-        self._hdr_x = 10
-        self._hdr_y = 10
-        self._hdr_w = 210 - 20
-        # Row heights: main title, date/page, HACCP title, issue row, approved/prepared row
-        self._hdr_rows = [12, 10, 8, 6, 6]
-        self._hdr_h = sum(self._hdr_rows)
-        self._hdr_gap = 6  # space below header before page content starts
-
-        # Copy label (set by app.py while rendering sections)
-        self.copy_no = 1
-        self.copy_total = 1
-
-    # --- latin-1 safety ---
-    @staticmethod
-    def _latin1(txt) -> str:
-        if txt is None:
-            return ""
-        s = str(txt)
-        # Replace unsupported characters rather than throwing UnicodeEncodeError
-        return s.encode("latin-1", "replace").decode("latin-1")
-
-    # Override core text writers so all downstream sections are protected
-    def cell(self, w, h=0, txt="", border=0, ln=0, align="", fill=False, link=""):
-        return super().cell(w, h, self._latin1(txt), border, ln, align, fill, link)
-
-    def multi_cell(self, w, h, txt="", border=0, align="J", fill=False):
-        return super().multi_cell(w, h, self._latin1(txt), border, align, fill)
-
-    def header(self):
-        # Outer box
-        x0, y0, w = self._hdr_x, self._hdr_y, self._hdr_w
-        r1, r2, r3, r4, r5 = self._hdr_rows
-        self.set_line_width(0.4)
-        self.rect(x0, y0, w, self._hdr_h)
-
-        # Row 1: main title
-        self.set_xy(x0, y0)
-        self.set_font("Arial", "B", 18)
-        self.cell(w, r1, "Production Schedule Report", border=0, ln=1, align="C")
-
-        # Row 2: date and page  (IMPORTANT: use ASCII hyphen, not unicode en dash)
-        self.set_xy(x0, y0 + r1)
-        self.set_font("Arial", "B", 14)
-        self.cell(
-            w,
-            r2,
-            f"{self.header_date_str} - Page {self.page_no()}   Copy {self.copy_no}/{self.copy_total}",
-            border=0,
-            ln=1,
-            align="C",
-        )
-
-        # Horizontal lines between rows
-        y = y0 + r1
-        self.line(x0, y, x0 + w, y)
-        y = y0 + r1 + r2
-        self.line(x0, y, x0 + w, y)
-        y = y0 + r1 + r2 + r3
-        self.line(x0, y, x0 + w, y)
-        y = y0 + r1 + r2 + r3 + r4
-        self.line(x0, y, x0 + w, y)
-
-        # Row 3: HACCP title
-        self.set_xy(x0, y0 + r1 + r2)
-        self.set_font("Arial", "B", 13)
-        self.cell(w, r3, "Clean Eats Australia - HACCP FSP Section F - Form 1", border=0, ln=1, align="C")
-
-        # Row 4: issue dates (2 columns)
-        half = w / 2
-        self.set_font("Arial", "", 9)
-        self.set_xy(x0, y0 + r1 + r2 + r3)
-        self.cell(half, r4, f"Latest Issue Date: {HACCP_LATEST_ISSUE_DATE}", border=0, align="C")
-        self.cell(half, r4, f"Previous Issue Date: {HACCP_PREVIOUS_ISSUE_DATE}", border=0, ln=1, align="C")
-        # vertical split line
-        self.line(x0 + half, y0 + r1 + r2 + r3, x0 + half, y0 + r1 + r2 + r3 + r4)
-
-        # Row 5: approved / prepared (2 columns)
-        self.set_xy(x0, y0 + r1 + r2 + r3 + r4)
-        self.cell(half, r5, f"Approved by: {HACCP_APPROVED_BY}", border=0, align="C")
-        self.cell(half, r5, f"Prepared by: {HACCP_PREPARED_BY}", border=0, ln=1, align="C")
-        self.line(x0 + half, y0 + r1 + r2 + r3 + r4, x0 + half, y0 + self._hdr_h)
-
-        # Move cursor below header so subsequent content starts in the right place
-        self.set_y(y0 + self._hdr_h + self._hdr_gap)
+from lazy_imports import IMPORT_PROFILE, LAZY_MODULES, lazy_module
+from perf_trace import collect_spans, span, summarize_spans
+import metrics
+from report_index import DAILY, WEEKLY, ReportIndex, latest_per_day, month_label, report_index
+
+# Loaded on first use: the upload page and history don't need pandas or the
+# report sections until there is something to calculate (see lazy_imports)
+pd = lazy_module("pandas")
+requests = lazy_module("requests")
+report_builder = lazy_module("report_builder")
+report_cache = lazy_module("report_cache")
+report_dependencies = lazy_module("report_dependencies")
+scenarios = lazy_module("scenarios")
+procurement_forecast = lazy_module("procurement_forecast")
+range_summary_section = lazy_module("range_summary_section")
+rollups = lazy_module("rollups")
+content_index_module = lazy_module("content_index")
 
 # ---------- Page ----------
 st.set_page_config(page_title="Production Report", layout="wide")
 st.title("📦 Production Report")
 
+# Prometheus /metrics endpoint / text file, if configured (see metrics)
+metrics.start_from_env()
+
 # ---------- Timezone ----------
 LOCAL_TZ = ZoneInfo("Australia/Melbourne")
 
@@ -143,45 +48,70 @@ SUMMARY_MEAL_ORDER = [
     "Family Mac and 3 Cheese Pasta Bake","Baked Family Lasagna"
 ]
 
+# Recipes that can be prepared in bulk ahead of the day (Step 3 toggles)
+BULK_RECIPES = ["Spaghetti Bolognese","Beef Chow Mein","Beef Burrito Bowl","Shepherd's Pie"]
+
 # 🔧 UPDATE THESE 2 TO MATCH YOUR REPO / TOKEN SECRET NAME
 GITHUB_REPO = "LukeCreativeInd/kitchen_planner_test"
 GITHUB_TOKEN_SECRET = "GITHUB_TOKEN"
 
+# API / raw file hosts (override to point the app at a stub server, see load_test)
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_RAW_URL = os.environ.get("GITHUB_RAW_URL", "https://raw.githubusercontent.com").rstrip("/")
+
 # Folders
 GITHUB_DAILY_PDF = "reports"
 GITHUB_WEEKLY_PDF = "reports/weekly"
 GITHUB_DAILY_CSV = "reports/data"          # hidden from History; paired with daily PDFs
 
+# Reports listed per page in Document History
+HISTORY_PAGE_SIZE = 15
+
+# Archived CSVs fetched at the same time when loading several days
+GITHUB_FETCH_WORKERS = 8
+
 # ---------- GitHub helpers ----------
 def _gh_headers():
     return {"Authorization": f"token {st.secrets[GITHUB_TOKEN_SECRET]}"}
 
 def _contents_url(path: str) -> str:
-    return f"https://api.github.com/repos/{GITHUB_REPO}/contents/{path}"
+    return f"{GITHUB_API_URL}/repos/{GITHUB_REPO}/contents/{path}"
+
+def _github_call(method: str, url: str, **kwargs):
+    # Every GitHub request goes through here so it is timed (see perf_trace)
+    with span("github", method=method.upper(), path=urlsplit(url).path) as call:
+        r = getattr(requests, method)(url, **kwargs)
+        call["status"] = r.status_code
+        call["bytes"] = len(r.content)
+        if "X-RateLimit-Remaining" in r.headers:
+            call["rate_limit_remaining"] = int(r.headers["X-RateLimit-Remaining"])
+    return r
 
 def _push_bytes_to_github(file_bytes: bytes, path: str, message: str) -> bool:
-    api_url = _contents_url(path)
-    b64_content = base64.b64encode(file_bytes).decode()
-    headers = _gh_headers()
-
-    # get sha if file exists
-    sha = None
-    r = requests.get(api_url, headers=headers)
-    if r.status_code == 200:
-        try:
-            sha = r.json().get("sha")
-        except Exception:
-            sha = None
+    with span("github.upload", path=path, bytes=len(file_bytes)) as upload:
+        api_url = _contents_url(path)
+        b64_content = base64.b64encode(file_bytes).decode()
+        headers = _gh_headers()
+
+        # get sha if file exists
+        sha = None
+        r = _github_call("get", api_url, headers=headers)
+        if r.status_code == 200:
+            try:
+                sha = r.json().get("sha")
+            except Exception:
+                sha = None
 
-    data = {"message": message, "content": b64_content, "branch": "main"}
-    if sha:
-        data["sha"] = sha
+        data = {"message": message, "content": b64_content, "branch": "main"}
+        if sha:
+            data["sha"] = sha
 
-    resp = requests.put(api_url, headers=headers, json=data)
-    return resp.status_code in (200, 201)
+        resp = _github_call("put", api_url, headers=headers, json=data)
+        upload["ok"] = resp.status_code in (200, 201)
+    return upload["ok"]
 
 def _get_sha(path: str) -> str | None:
-    r = requests.get(_contents_url(path), headers=_gh_headers())
+    r = _github_call("get", _contents_url(path), headers=_gh_headers())
     if r.status_code != 200:
         return None
     try:
@@ -194,7 +124,7 @@ def delete_file_from_github(path: str, message: str = "Delete file") -> bool:
     if not sha:
         return True  # missing = success
     payload = {"message": message, "sha": sha, "branch": "main"}
-    resp = requests.delete(_contents_url(path), headers=_gh_headers(), json=payload)
+    resp = _github_call("delete", _contents_url(path), headers=_gh_headers(), json=payload)
     return resp.status_code in (200, 204)
 
 def push_pdf_to_github(pdf_bytes: bytes, filename: str, weekly: bool = False) -> bool:
@@ -207,7 +137,7 @@ def push_csv_to_github(df: pd.DataFrame, filename: str) -> bool:
 
 def list_files_from_github(folder: str, endswith: str = ".pdf"):
     api_url = _contents_url(folder)
-    r = requests.get(api_url, headers=_gh_headers())
+    r = _github_call("get", api_url, headers=_gh_headers())
     if r.status_code != 200:
         return []
     items = r.json()
@@ -215,8 +145,8 @@ def list_files_from_github(folder: str, endswith: str = ".pdf"):
             for it in items if isinstance(it, dict) and it.get("name", "").endswith(endswith)]
 
 def fetch_csv_from_github(path: str) -> pd.DataFrame | None:
-    api_url = f"https://raw.githubusercontent.com/{GITHUB_REPO}/main/{path}"
-    r = requests.get(api_url)
+    api_url = f"{GITHUB_RAW_URL}/{GITHUB_REPO}/main/{path}"
+    r = _github_call("get", api_url)
     if r.status_code != 200:
         return None
     try:
@@ -225,158 +155,282 @@ def fetch_csv_from_github(path: str) -> pd.DataFrame | None:
         return None
 
 # ---------- Helpers ----------
-def draw_summary_section(pdf, df, brand_names, production_date):
-    pdf.add_page()
-    pdf.set_font("Arial", "B", 13)
-    pdf.cell(0, 9, "Meal Production Summary", ln=1, align='C')
-    pdf.ln(2)
-
-    # ---- Table ----
-    n_cols = 1 + len(brand_names) + 2
-    a4_w = 210
-    a4_h = 297
-    available_w = a4_w - 20
-    meal_col_w = 60 if n_cols <= 6 else 50
-    other_col_w = (available_w - meal_col_w) / (n_cols - 1) if n_cols > 1 else available_w
-    col_widths = [meal_col_w] + [other_col_w] * (n_cols - 1)
-
-    headers = ["Meal"] + brand_names + ["Already Made", "Total"]
-    pdf.set_font("Arial", "B", 9)
-    for h, w in zip(headers, col_widths):
-        pdf.cell(w, 7, h, 1, 0, 'C')
-    pdf.ln(7)
-
-    pdf.set_font("Arial", "", 8)
-    for _, row in df.iterrows():
-        pdf.cell(col_widths[0], 6, str(row["Product name"]), 1)
-        for i, brand in enumerate(brand_names):
-            qty = row[brand] if brand in row else 0
-            pdf.cell(col_widths[i+1], 6, str(qty), 1)
-        pdf.cell(col_widths[len(brand_names)+1], 6, str(row["Already Made"]), 1)
-        pdf.cell(col_widths[len(brand_names)+2], 6, str(row["Total"]), 1)
-        pdf.ln(6)
-
-    pdf.set_font("Arial", "B", 8)
-    pdf.cell(col_widths[0], 6, "TOTAL", 1)
-    for i, brand in enumerate(brand_names):
-        pdf.cell(col_widths[i+1], 6, str(df[brand].sum() if brand in df else 0), 1)
-    pdf.cell(col_widths[len(brand_names)+1], 6, str(df["Already Made"].sum()), 1)
-    pdf.cell(col_widths[len(brand_names)+2], 6, str(df["Total"].sum()), 1)
-    pdf.ln(6)
-
-    # ---- Use By Dates block (below meal summary table) ----
-    # Dates are inclusive of production date (e.g. 28 days incl today => today + 27)
-    use_by = [
-        ("Family Lasagna", production_date + timedelta(days=27)),
-        ("Family Mac & Cheese", production_date + timedelta(days=20)),
-        ("Beef Lasagna", production_date + timedelta(days=20)),
-        ("Individual Meals", production_date + timedelta(days=13)),
-    ]
-
-    block_x = 10
-    block_w = 210 - 20
-    row_h = 6
-
-    # If we're too close to the bottom of the page, push the Use By box onto a fresh page
-    if pdf.get_y() + (row_h * 3) + 6 > (a4_h - 17):
-        pdf.add_page()
-
-    pdf.ln(3)
-    y0 = pdf.get_y()
-    pdf.set_line_width(0.4)
-    pdf.rect(block_x, y0, block_w, row_h * 3)
-
-    # Row 1 merged title
-    pdf.set_xy(block_x, y0)
-    pdf.set_font("Arial", "B", 10)
-    pdf.cell(block_w, row_h, "Use By Dates", border=0, ln=1, align="C")
-
-    # Line between row1 and row2
-    pdf.line(block_x, y0 + row_h, block_x + block_w, y0 + row_h)
-
-    # Row 2 + 3: 2 columns (CENTERED)
-    col_w = block_w / 2
-    pdf.set_font("Arial", "", 9)
-
-    def cell_text(name, d):
-        return f"{name} - {d.strftime('%d/%m/%Y')}"
-
-    # Row 2
-    pdf.set_xy(block_x, y0 + row_h)
-    pdf.cell(col_w, row_h, cell_text(use_by[0][0], use_by[0][1]), border=0, ln=0, align="C")
-    pdf.set_xy(block_x + col_w, y0 + row_h)
-    pdf.cell(col_w, row_h, cell_text(use_by[1][0], use_by[1][1]), border=0, ln=0, align="C")
-
-    # Vertical line
-    pdf.line(block_x + col_w, y0 + row_h, block_x + col_w, y0 + row_h * 3)
-
-    # Line between row2 and row3
-    pdf.line(block_x, y0 + row_h * 2, block_x + block_w, y0 + row_h * 2)
-
-    # Row 3
-    pdf.set_xy(block_x, y0 + row_h * 2)
-    pdf.cell(col_w, row_h, cell_text(use_by[2][0], use_by[2][1]), border=0, ln=0, align="C")
-    pdf.set_xy(block_x + col_w, y0 + row_h * 2)
-    pdf.cell(col_w, row_h, cell_text(use_by[3][0], use_by[3][1]), border=0, ln=0, align="C")
-
-    pdf.ln(row_h * 2 + 3)
-    return pdf.get_y()
-
-def parse_daily_filename(name: str):
-    try:
-        base = name.replace("daily_production_report_", "").replace(".pdf", "")
-        d, t = base.split("_", 1)
-        datetime.strptime(d, "%Y-%m-%d")
-        datetime.strptime(t, "%H-%M-%S")
-        return d, t
-    except Exception:
-        return None, None
-
-def human_label_from_filename(name: str):
-    # AU date + time from filename (UI only)
-    d, t = parse_daily_filename(name)
-    if not d or not t:
-        return name
-    try:
-        dt = datetime.strptime(f"{d} {t}", "%Y-%m-%d %H-%M-%S")
-        label = dt.strftime("%d/%m/%Y %I:%M %p").replace(" 0", " ")
-        return f"Daily Report — {label}"
-    except Exception:
-        return name
-
-def month_group_key(name: str):
-    d, _ = parse_daily_filename(name)
-    if not d:
-        return (-1, -1)
-    try:
-        y, m, _day = d.split("-")
-        return (int(y), int(m))
-    except Exception:
-        return (-1, -1)
+def daily_index(refresh: bool = False) -> ReportIndex:
+    # Daily report listing, fetched once per session (or on refresh) and shared by every tab
+    if refresh or "history_daily" not in st.session_state:
+        st.session_state["history_daily"] = report_index(
+            list_files_from_github(GITHUB_DAILY_PDF), DAILY, csv_folder=GITHUB_DAILY_CSV
+        )
+    return st.session_state["history_daily"]
+
+def weekly_index(refresh: bool = False) -> ReportIndex:
+    if refresh or "history_weekly" not in st.session_state:
+        st.session_state["history_weekly"] = report_index(list_files_from_github(GITHUB_WEEKLY_PDF), WEEKLY)
+    return st.session_state["history_weekly"]
+
+def load_daily_summary_frames(records, label: str = "date"):
+    # Paired summary CSVs of daily report records -> ([(record[label], df)], [missing csv names])
+    # Fetched in parallel: a quarter is ~90 round trips to GitHub
+    records = list(records)
+    with ThreadPoolExecutor(max_workers=GITHUB_FETCH_WORKERS) as pool:
+        fetched = list(pool.map(fetch_csv_from_github, [r["csv_path"] for r in records]))
+    frames, missing = [], []
+    for r, df in zip(records, fetched):
+        if df is None:
+            missing.append(r["csv_path"].rsplit("/", 1)[-1])
+            continue
+        need = {"Product name", "Total"}
+        if not need.issubset(df.columns):
+            brand_cols = [c for c in df.columns if c not in ("Product name","Already Made","Total")]
+            if brand_cols:
+                df["Total"] = (df[brand_cols].sum(axis=1) - df.get("Already Made", 0)).clip(lower=0)
+            else:
+                continue
+        if "Already Made" not in df.columns:
+            df["Already Made"] = 0
+        frames.append((r[label], df))
+    return frames, missing
+
+def content_index(refresh: bool = False):
+    # Quantities of the newest report of every day; only reports new to the index are fetched
+    latest = daily_index().latest_per_day()
+    with span("content_index.sync", reports=len(latest)) as rec:
+        rec["added"] = content_index_module.CONTENT_INDEX.sync(
+            latest, lambda todo: load_daily_summary_frames(todo, label="name"), retry_missing=refresh
+        )
+    return content_index_module.CONTENT_INDEX
+
+def preselect_latest(key: str, index: ReportIndex, start, end):
+    # Select the newest report of each day in start..end whenever the range changes (the operator can still edit it)
+    if st.session_state.get(f"{key}_range") != (start, end):
+        st.session_state[f"{key}_range"] = (start, end)
+        st.session_state[key] = [r["name"] for r in index.latest_per_day(start, end)]
+
+def resolve_one_per_day(index: ReportIndex, names: list) -> list:
+    # Selected report names -> the newest generation of each selected day; says which ones were dropped
+    chosen = [r["name"] for r in latest_per_day(index.by_name[n] for n in names)]
+    dropped = [index.by_name[n]["label"] for n in names if n not in chosen]
+    if dropped:
+        st.info("Older generations of a selected day are left out (they would be counted twice):\n\n- " + "\n- ".join(dropped))
+    return chosen
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def parse_production_file(file_bytes: bytes, name: str):
+    # One brand's upload -> (Product name/Quantity frame, error message); cached per file content
+    with span("file.parse", file=name, bytes=len(file_bytes)):
+        try:
+            df = pd.read_csv(io.BytesIO(file_bytes)) if name.endswith(".csv") else pd.read_excel(io.BytesIO(file_bytes))
+        except Exception as e:
+            return None, f"failed to read: {e}"
+        df.columns = df.columns.str.strip()
+        if not {"Product name","Quantity"}.issubset(df.columns):
+            return None, "file must have 'Product name' and 'Quantity'"
+        df = df[["Product name","Quantity"]]
+        df["Product name"] = df["Product name"].astype(str).str.strip()
+        df["Quantity"] = pd.to_numeric(df["Quantity"], errors="coerce").fillna(0).astype(int)
+        return df.groupby("Product name", as_index=False).sum(), None
+
+def history_page(records: list, key: str) -> list:
+    # UI only: one page of records plus a page picker (shown when there is more than one page)
+    pages = max(1, math.ceil(len(records) / HISTORY_PAGE_SIZE))
+    if st.session_state.get(key, 1) > pages:
+        st.session_state[key] = pages
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key=key)
+    start = (page - 1) * HISTORY_PAGE_SIZE
+    return records[start:start + HISTORY_PAGE_SIZE]
+
+def performance_panel(spans):
+    # UI only: where the time went in one generation (the same spans are in the JSON lines log)
+    with st.expander("Performance"):
+        st.dataframe(pd.DataFrame(summarize_spans(spans)), hide_index=True, width='stretch')
+        detail = [
+            {"Step": "· " * r["depth"] + r["span"], "ms": r["ms"],
+             "Details": ", ".join(f"{k}={v}" for k, v in r.items() if k not in ("span", "ms", "depth", "ts"))}
+            for r in spans
+        ]
+        st.dataframe(pd.DataFrame(detail), hide_index=True, width='stretch')
+
+def preview_frame(table) -> pd.DataFrame:
+    # UI only: one computed section table as a small dataframe
+    rows = list(table["rows"])
+    if table.get("total_row"):
+        rows.append(table["total_row"])
+    return pd.DataFrame(rows, columns=[label for label, _frac in table["columns"]])
 
-def month_label(year: int, month: int):
-    if year == -1 and month == -1:
-        return "Other"
-    return f"{calendar.month_name[month]} {year}"
+# ----------------- TAB 1: Daily Flow -----------------
+# The daily flow is a fragment, so its widgets never rerun the other tabs.
+# Step 4 onwards is a nested fragment, so editing quantities reruns only
+# the editor and what is computed from it.
+@st.fragment
+def summary_editor(dataframes, brand_names, selected_date, bulk_toggles):
+    selected_date_str = selected_date.strftime('%Y-%m-%d')
+    now_str = datetime.now(LOCAL_TZ).strftime('%H-%M-%S')
 
-def weekly_pretty_label(name: str) -> str:
-    # UI only
-    n = name.replace("weekly_summary_", "").replace(".pdf", "")
-    try:
-        rng, tm = n.rsplit("_", 1)
-        start, _, end = rng.partition("_to_")
-        d1 = datetime.strptime(start, "%Y-%m-%d").strftime("%d/%m/%Y")
-        d2 = datetime.strptime(end,   "%Y-%m-%d").strftime("%d/%m/%Y")
-        tlabel = datetime.strptime(tm, "%H-%M-%S").strftime("%I:%M %p").lstrip("0")
-        return f"Weekly Summary — {d1} to {d2} — {tlabel}"
-    except Exception:
-        return name
+    # Only include the 26 production meal options in the summary table.
+    # This prevents POS materials, packs, memberships, or other non-meal products
+    # from appearing in the production report.
+    all_products = SUMMARY_MEAL_ORDER
+    with span("summary.build", brands=len(brand_names)):
+        rows = []
+        for p in all_products:
+            row = {"Product name": p, "Already Made": 0}
+            for i, df in enumerate(dataframes):
+                row[brand_names[i]] = int(df.loc[df["Product name"]==p,"Quantity"].sum()) if p in df["Product name"].values else 0
+            rows.append(row)
+        summary_df = pd.DataFrame(rows)
+        if brand_names: summary_df = summary_df[["Product name"]+brand_names+["Already Made"]]
 
-# ---------- Tabs ----------
-tab1, tab2, tab3 = st.tabs(["📥 Upload & Generate", "📄 Document History", "📆 Weekly Summary"])
+    st.subheader("Step 4: Adjust Quantities (if needed)")
+    edited_df = st.data_editor(
+        summary_df,
+        num_rows="dynamic",
+        width='stretch',
+        column_config={b: {"width":70} for b in (brand_names+["Already Made"])},
+        key="editable_table_daily"
+    )
+    if brand_names:
+        edited_df["Total"] = (edited_df[brand_names].sum(axis=1)-edited_df["Already Made"]).clip(lower=0)
+    else:
+        edited_df["Total"]=0
+
+    # Keep only the 26 production meals, then sort them in production order.
+    edited_df = edited_df[edited_df["Product name"].isin(SUMMARY_MEAL_ORDER)].copy()
+    edited_df["meal_order"] = edited_df["Product name"].apply(lambda x: SUMMARY_MEAL_ORDER.index(x))
+    edited_df = edited_df.sort_values("meal_order").drop(columns=["meal_order"])
+    st.dataframe(edited_df[["Product name"]+brand_names+["Already Made","Total"]], width='stretch')
+
+    # Section calculations kept across reruns: an edit only recalculates the
+    # tables/lines that depend on the meals it changed
+    if "incremental_report" not in st.session_state:
+        st.session_state["incremental_report"] = report_dependencies.IncrementalReport()
+    calculated = st.session_state["incremental_report"].update(edited_df, bulk_toggles)
+
+    # --- Live preview: same calculations as the PDF sections, no PDF render/upload ---
+    if st.toggle("Live preview of section quantities (no PDF)", key="live_preview"):
+        preview = report_builder.calc_report_tables(edited_df, bulk_toggles, calculated=calculated)
+        for key, tables in preview.items():
+            with st.expander(f"{report_builder.REPORT_SECTIONS[key][0]} ({len(tables)} tables)"):
+                pcols = st.columns(2)
+                for i, table in enumerate(tables):
+                    with pcols[i % 2]:
+                        title = f"{table['group']} / {table['title']}" if table.get("group") else table["title"]
+                        st.markdown(f"**{title}**")
+                        st.dataframe(preview_frame(table), hide_index=True, width='stretch')
+        with st.expander("Company-wide ingredient totals"):
+            ingredient_rows = report_builder.calc_ingredient_totals(edited_df, bulk_toggles)
+            st.dataframe(
+                pd.DataFrame([
+                    {"Ingredient": r["name"], "Category": r["category"],
+                     "Amount": round(r["amount"], 2), "Unit": r["unit"], "Meals": len(r["meals"])}
+                    for r in ingredient_rows
+                ]),
+                hide_index=True, width='stretch',
+            )
+
+    # --- What-if scenarios: today's requirements under other volumes / toggles (no PDF) ---
+    with st.expander("What-if scenarios"):
+        st.caption(
+            "One row per scenario: brand volume change in %, meals set to a fixed quantity "
+            "(e.g. `Beef Lasagna=120; Butter Chicken=0`) and bulk recipes already prepared. "
+            "Every scenario is compared with today's table."
+        )
+        scenario_rows = st.data_editor(
+            pd.DataFrame([{
+                "Scenario": "Scenario 1",
+                **{f"{b} %": 0.0 for b in brand_names},
+                "Meal overrides": "",
+                **{r: bool(bulk_toggles[r]) for r in BULK_RECIPES},
+            }]),
+            num_rows="dynamic",
+            width='stretch',
+            key="scenario_editor",
+        )
+        scenario_specs = [scenarios.scenario("Current", bulk_toggles=bulk_toggles)]
+        for _i, srow in scenario_rows.iterrows():
+            sname = str(srow.get("Scenario") or "").strip()
+            if not sname or sname in [s["name"] for s in scenario_specs]:
+                continue
+            overrides = {}
+            for part in str(srow.get("Meal overrides") or "").split(";"):
+                meal, sep, qty = part.partition("=")
+                if not sep:
+                    continue
+                try:
+                    overrides[meal.strip()] = float(qty)
+                except ValueError:
+                    st.warning(f"{sname}: can't read override '{part.strip()}' — skipped.")
+            pcts = pd.to_numeric(pd.Series([srow.get(f"{b} %") for b in brand_names], dtype=object), errors="coerce").fillna(0)
+            scenario_specs.append(scenarios.scenario(
+                sname,
+                brand_scale={b: 1 + float(p) / 100 for b, p in zip(brand_names, pcts)},
+                meal_overrides=overrides,
+                bulk_toggles={r: bool(srow.get(r)) and not pd.isna(srow.get(r)) for r in BULK_RECIPES},
+            ))
+
+        if len(scenario_specs) > 1:
+            comparison = scenarios.evaluate_scenarios(edited_df, brand_names, scenario_specs)
+            c1, c2 = st.columns([0.7, 0.3])
+            with c1:
+                all_groups = list(dict.fromkeys(comparison["Group"]))
+                show_groups = st.multiselect(
+                    "Show", options=all_groups,
+                    default=[g for g in ("Ingredients", "Meat Order") if g in all_groups],
+                    key="scenario_groups",
+                )
+            with c2:
+                as_change = st.toggle("Show change from current", key="scenario_deltas")
+            shown = scenarios.scenario_deltas(comparison) if as_change else comparison
+            st.dataframe(shown[shown["Group"].isin(show_groups)], hide_index=True, width='stretch')
+
+    if st.button("Generate & Save Production Report PDF"):
+        with collect_spans() as spans:
+            report_key, pdf_bytes = report_cache.get_or_build_report(
+                edited_df, brand_names, selected_date, bulk_toggles, calculated=calculated
+            )
+            pdf_name = f"daily_production_report_{selected_date_str}_{now_str}.pdf"
+            csv_name = f"daily_production_report_{selected_date_str}_{now_str}.csv"
+            already_saved = report_cache.REPORT_CACHE.uploaded_name(report_key)
+            if already_saved:
+                # Identical inputs were already generated and saved: don't push a duplicate.
+                pdf_name = already_saved
+                st.info(f"No changes since the last generation — already saved as {already_saved}.")
+            else:
+                if push_pdf_to_github(pdf_bytes, pdf_name, weekly=False):
+                    report_cache.REPORT_CACHE.mark_uploaded(report_key, pdf_name)
+                push_csv_to_github(edited_df[report_builder.summary_columns(brand_names)], csv_name)
+        st.download_button("📄 Download Production Report PDF", pdf_bytes, file_name=pdf_name, mime="application/pdf")
+        performance_panel(spans)
+
+    # --- Station sheets (reprint only the sections a station needs; not saved to history) ---
+    st.subheader("Station Sheets (optional)")
+    station_sections = st.multiselect(
+        "Sections to reprint",
+        options=list(report_builder.REPORT_SECTIONS),
+        format_func=lambda k: report_builder.REPORT_SECTIONS[k][0],
+        key="station_sections",
+    )
+    if st.button("Generate Selected Station Sheets", disabled=not station_sections):
+        st.session_state["station_pdfs"] = {
+            key: report_cache.get_or_build_report(
+                edited_df, brand_names, selected_date, bulk_toggles, sections=[key], calculated=calculated
+            )[1]
+            for key in report_builder.REPORT_SECTIONS
+            if key in station_sections
+        }
+    for key, station_bytes in (st.session_state.get("station_pdfs") or {}).items():
+        label = report_builder.REPORT_SECTIONS[key][0]
+        st.download_button(
+            f"📄 Download {label}",
+            station_bytes,
+            file_name=f"{key}_{selected_date_str}_{now_str}.pdf",
+            mime="application/pdf",
+            key=f"dl_station_{key}",
+        )
 
-# ----------------- TAB 1: Daily Flow -----------------
-with tab1:
+@st.fragment
+def daily_flow():
     st.subheader("Step 1: Upload Production Files")
     uploaded_files = {}
     col1, col2, col3 = st.columns(3)
@@ -386,12 +440,8 @@ with tab1:
 
     st.subheader("Step 2: Select Report Date")
     selected_date = st.date_input("Production Date", value=datetime.now(LOCAL_TZ))
-    selected_date_str = selected_date.strftime('%Y-%m-%d')
-    now = datetime.now(LOCAL_TZ)
-    now_str = now.strftime('%H-%M-%S')
 
     st.subheader("Step 3: Bulk-Prepared Recipe Toggles")
-    BULK_RECIPES = ["Spaghetti Bolognese","Beef Chow Mein","Beef Burrito Bowl","Shepherd's Pie"]
     bulk_toggles = {r: st.checkbox(f"{r} already prepared (set all recipe ingredients to zero)", key=f"bulk_{r}") for r in BULK_RECIPES}
 
     # --- Parse uploads (optional) ---
@@ -400,168 +450,20 @@ with tab1:
     if any_uploaded:
         for brand, f in uploaded_files.items():
             if not f: continue
-            try:
-                df = pd.read_csv(f) if f.name.endswith(".csv") else pd.read_excel(f)
-            except Exception as e:
-                st.error(f"{brand} failed to read: {e}")
-                continue
-            df.columns = df.columns.str.strip()
-            if not {"Product name","Quantity"}.issubset(df.columns):
-                st.error(f"{brand} file must have 'Product name' and 'Quantity'")
+            df, error = parse_production_file(f.getvalue(), f.name)
+            if error:
+                st.error(f"{brand} {error}")
                 continue
-            df = df[["Product name","Quantity"]]
-            df["Product name"] = df["Product name"].astype(str).str.strip()
-            df["Quantity"] = pd.to_numeric(df["Quantity"], errors="coerce").fillna(0).astype(int)
-            df = df.groupby("Product name", as_index=False).sum()
             dataframes.append(df); brand_names.append(brand)
     else:
         st.info("Upload at least one production file to generate a daily report.")
 
     # --- Editable merged summary ---
     if dataframes:
-        # Only include the 26 production meal options in the summary table.
-        # This prevents POS materials, packs, memberships, or other non-meal products
-        # from appearing in the production report.
-        all_products = SUMMARY_MEAL_ORDER
-        rows = []
-        for p in all_products:
-            row = {"Product name": p, "Already Made": 0}
-            for i, df in enumerate(dataframes):
-                row[brand_names[i]] = int(df.loc[df["Product name"]==p,"Quantity"].sum()) if p in df["Product name"].values else 0
-            rows.append(row)
-        summary_df = pd.DataFrame(rows)
-        if brand_names: summary_df = summary_df[["Product name"]+brand_names+["Already Made"]]
-
-        st.subheader("Step 4: Adjust Quantities (if needed)")
-        edited_df = st.data_editor(
-            summary_df,
-            num_rows="dynamic",
-            width='stretch',
-            column_config={b: {"width":70} for b in (brand_names+["Already Made"])},
-            key="editable_table_daily"
-        )
-        if brand_names:
-            edited_df["Total"] = (edited_df[brand_names].sum(axis=1)-edited_df["Already Made"]).clip(lower=0)
-        else:
-            edited_df["Total"]=0
-
-        # Keep only the 26 production meals, then sort them in production order.
-        edited_df = edited_df[edited_df["Product name"].isin(SUMMARY_MEAL_ORDER)].copy()
-        edited_df["meal_order"] = edited_df["Product name"].apply(lambda x: SUMMARY_MEAL_ORDER.index(x))
-        edited_df = edited_df.sort_values("meal_order").drop(columns=["meal_order"])
-        st.dataframe(edited_df[["Product name"]+brand_names+["Already Made","Total"]], width='stretch')
-
-        meal_totals = dict(zip(edited_df["Product name"].str.upper(), edited_df["Total"]))
-        custom_meal_recipes = copy.deepcopy(meal_recipes)
-        for r,c in bulk_toggles.items():
-            if c and r in custom_meal_recipes:
-                for ing in custom_meal_recipes[r].get("ingredients",{}): custom_meal_recipes[r]["ingredients"][ing]=0
-                if "sub_section" in custom_meal_recipes[r]:
-                    for ing in custom_meal_recipes[r]["sub_section"].get("ingredients",{}): custom_meal_recipes[r]["sub_section"]["ingredients"][ing]=0
-
-        if st.button("Generate & Save Production Report PDF"):
-            header_date = selected_date.strftime('%d/%m/%Y')
-            pdf = ProductionPDF(header_date_str=header_date)
-            pdf.set_auto_page_break(False)
-            a4_w, a4_h = 210, 297
-            left = 10
-            page_w = a4_w - 20
-            col_w = page_w / 2 - 5
-            ch, pad, bottom = 6, 4, a4_h - 17
-            xpos = [left, left + col_w + 10]
-
-            # Copy counts per section
-            copies = {
-                "summary": 2,
-                "bulk": 3,
-                "recipes": 2,
-                "prepack_room": 1,
-                "meat_veg": 3,
-            }
-
-            # --- Meal Summary (2 copies) ---
-            for c in range(1, copies["summary"] + 1):
-                pdf.copy_no, pdf.copy_total = c, copies["summary"]
-                draw_summary_section(
-                    pdf,
-                    edited_df[["Product name"] + brand_names + ["Already Made", "Total"]],
-                    brand_names,
-                    selected_date,
-                )
-
-            # --- Bulk Raw Ingredients to Cook (3 copies) ---
-            for c in range(1, copies["bulk"] + 1):
-                pdf.copy_no, pdf.copy_total = c, copies["bulk"]
-                pdf.add_page()
-                y = pdf.get_y()
-                y = draw_bulk_section(
-                    pdf,
-                    meal_totals,
-                    xpos,
-                    col_w,
-                    ch,
-                    pad,
-                    bottom,
-                    start_y=y,
-                    header_date=selected_date.strftime("%d/%m/%Y"),
-                )
-
-            # --- Meal Raw Ingredients to Cook (2 copies) ---
-            for c in range(1, copies["recipes"] + 1):
-                pdf.copy_no, pdf.copy_total = c, copies["recipes"]
-                pdf.add_page()
-                y = pdf.get_y()
-                y = draw_recipes_section(
-                    pdf,
-                    meal_totals,
-                    xpos,
-                    col_w,
-                    ch,
-                    pad,
-                    bottom,
-                    start_y=y,
-                    meal_recipes_override=custom_meal_recipes,
-                )
-
-            # --- Pre-Pack Room (1 copy) ---
-            for c in range(1, copies["prepack_room"] + 1):
-                pdf.copy_no, pdf.copy_total = c, copies["prepack_room"]
-                y = draw_prepack_room_section(
-                    pdf,
-                    meal_totals,
-                    xpos,
-                    col_w,
-                    ch,
-                    pad,
-                    bottom,
-                    start_y=None
-                )
-
-            # --- Meat Order and Veg Prep (3 copies) ---
-            for c in range(1, copies["meat_veg"] + 1):
-                pdf.copy_no, pdf.copy_total = c, copies["meat_veg"]
-                y = draw_meat_veg_section(
-                    pdf,
-                    meal_totals,
-                    custom_meal_recipes,
-                    bulk_sections,
-                    xpos,
-                    col_w,
-                    ch,
-                    pad,
-                    bottom,
-                    start_y=None
-                )
-
-            pdf_bytes = pdf.output(dest="S").encode("latin1")
-            pdf_name = f"daily_production_report_{selected_date_str}_{now_str}.pdf"
-            csv_name = f"daily_production_report_{selected_date_str}_{now_str}.csv"
-            push_pdf_to_github(pdf_bytes, pdf_name, weekly=False)
-            push_csv_to_github(edited_df[["Product name"]+brand_names+["Already Made","Total"]], csv_name)
-            st.download_button("📄 Download Production Report PDF", pdf_bytes, file_name=pdf_name, mime="application/pdf")
+        summary_editor(dataframes, brand_names, selected_date, bulk_toggles)
 
 # ----------------- TAB 2: History -----------------
-with tab2:
+def history_view():
     st.subheader("Previous Production Reports")
 
     colh1, colh2 = st.columns(2)
@@ -570,106 +472,101 @@ with tab2:
     with colh1:
         st.markdown("**Daily Reports**")
         refresh_daily = st.button("🔄 Refresh Daily History")
-        if "history_daily" not in st.session_state or refresh_daily:
-            st.session_state["history_daily"] = list_files_from_github(GITHUB_DAILY_PDF)
+        index = daily_index(refresh=refresh_daily)
 
-        daily_files = st.session_state.get("history_daily", []) or []
-        daily_search = st.text_input("Search daily (yyyy-mm-dd or text)", key="daily_search")
+        daily_search = st.text_input(
+            "Search daily (yyyy-mm-dd, text, or contents e.g. \"Butter Chicken total > 100\", \"Lamb Souvlaki in August\")",
+            key="daily_search",
+        )
         if daily_search:
-            daily_files = [f for f in daily_files if daily_search.lower() in f["name"].lower()]
-
-        groups = {}
-        for f in daily_files:
-            key = month_group_key(f["name"])
-            groups.setdefault(key, []).append(f)
-
-        sorted_groups = sorted(groups.items(), key=lambda kv: kv[0], reverse=True)
-        today_dt = datetime.now(LOCAL_TZ)
-        current_key = (today_dt.year, today_dt.month)
-
-        if not sorted_groups:
+            # A search naming a meal queries the report contents (indexed on first use), anything else matches file names
+            meals = set(SUMMARY_MEAL_ORDER) | set(content_index_module.CONTENT_INDEX.products())
+            query = content_index_module.parse_query(daily_search, meals, [])
+            if query is not None:
+                contents = content_index(refresh=refresh_daily)
+                columns = set(contents.columns()) | {"Total", "Already Made"}
+                query = content_index_module.parse_query(daily_search, meals | set(contents.products()), columns)
+            if query is None:
+                index = index.search(daily_search)
+            else:
+                hits = contents.query(**query)
+                st.caption(f"{content_index_module.describe_query(query)} — days matched: {hits['report'].nunique()} (newest report of each day)")
+                with st.expander("Matching quantities"):
+                    st.dataframe(
+                        hits.assign(date=hits["date"].dt.strftime("%d/%m/%Y"))[["date", "product", "column", "qty"]],
+                        hide_index=True, width='stretch',
+                    )
+                index = ReportIndex(index.by_name[n] for n in hits["report"].unique() if n in index.by_name)
+
+        groups = index.by_month()
+        months = list(groups)
+
+        if not months:
             st.info("No daily reports found.")
         else:
-            for (y, m), files in sorted_groups:
-                label = f"{month_label(y, m)} ({len(files)})"
-                expanded = ((y, m) == current_key)
-
-                with st.expander(label, expanded=expanded):
-
-                    def ts(f):
-                        d, t = parse_daily_filename(f["name"])
-                        try:
-                            return datetime.strptime(f"{d} {t}", "%Y-%m-%d %H-%M-%S") if d and t else datetime.min
-                        except Exception:
-                            return datetime.min
-                    files_sorted = sorted(files, key=ts, reverse=True)
-
-                    for f in files_sorted:
-                        c1, c2 = st.columns([0.8, 0.2])
-                        with c1:
-                            st.link_button(human_label_from_filename(f["name"]), f["download_url"], width='stretch')
-                        with c2:
-                            confirm = st.checkbox("Confirm", key=f"confirm_daily_{f['name']}")
-                            if st.button("🗑 Delete", key=f"del_daily_{f['name']}", type="secondary", disabled=not confirm, width='stretch'):
-                                pdf_path = f"{GITHUB_DAILY_PDF}/{f['name']}"
-                                csv_name = f['name'].replace(".pdf", ".csv")
-                                csv_path = f"{GITHUB_DAILY_CSV}/{csv_name}"
-                                ok_pdf = delete_file_from_github(pdf_path, "Delete daily report PDF")
-                                ok_csv = delete_file_from_github(csv_path, "Delete paired daily CSV")
-                                if ok_pdf:
-                                    st.success("Deleted.")
-                                    st.session_state["history_daily"] = list_files_from_github(GITHUB_DAILY_PDF)
-                                    st.rerun()
-                                else:
-                                    st.error("Failed to delete report. Check your GitHub token/permissions.")
+            today_dt = datetime.now(LOCAL_TZ)
+            current_key = (today_dt.year, today_dt.month)
+            month = st.selectbox(
+                "Month",
+                options=months,
+                index=months.index(current_key) if current_key in months else 0,
+                format_func=lambda ym: f"{month_label(*ym)} ({len(groups[ym])})",
+                key="daily_history_month",
+            )
+            # Widgets are built for the visible page only
+            for r in history_page(groups[month], key="daily_history_page_{}-{:02d}".format(*month)):
+                c1, c2 = st.columns([0.8, 0.2])
+                with c1:
+                    st.link_button(r["label"], r["download_url"], width='stretch')
+                with c2:
+                    confirm = st.checkbox("Confirm", key=f"confirm_daily_{r['name']}")
+                    if st.button("🗑 Delete", key=f"del_daily_{r['name']}", type="secondary", disabled=not confirm, width='stretch'):
+                        pdf_path = f"{GITHUB_DAILY_PDF}/{r['name']}"
+                        ok_pdf = delete_file_from_github(pdf_path, "Delete daily report PDF")
+                        ok_csv = delete_file_from_github(r["csv_path"], "Delete paired daily CSV")
+                        if ok_pdf:
+                            report_cache.REPORT_CACHE.forget_uploaded(r["name"])
+                            st.success("Deleted.")
+                            daily_index(refresh=True)
+                            st.rerun()
+                        else:
+                            st.error("Failed to delete report. Check your GitHub token/permissions.")
 
     # ----- Weekly -----
     with colh2:
         st.markdown("**Weekly Reports**")
         refresh_weekly = st.button("🔄 Refresh Weekly History")
-        if "history_weekly" not in st.session_state or refresh_weekly:
-            st.session_state["history_weekly"] = list_files_from_github(GITHUB_WEEKLY_PDF)
+        weekly = weekly_index(refresh=refresh_weekly)
 
-        weekly_files = st.session_state.get("history_weekly", []) or []
         weekly_search = st.text_input("Search weekly (yyyy-mm-dd or text)", key="weekly_search")
         if weekly_search:
-            weekly_files = [f for f in weekly_files if weekly_search.lower() in f["name"].lower()]
+            weekly = weekly.search(weekly_search)
+        weekly_records = weekly.newest_first()
 
-        if not weekly_files:
+        if not weekly_records:
             st.info("No weekly reports found.")
         else:
-            def wts(f):
-                n = f["name"].replace("weekly_summary_", "").replace(".pdf", "")
-                try:
-                    rng, tm = n.rsplit("_", 1)
-                    _start, _, end = rng.partition("_to_")
-                    dt = datetime.strptime(end + " " + tm, "%Y-%m-%d %H-%M-%S")
-                    return dt
-                except Exception:
-                    return datetime.min
-            weekly_sorted = sorted(weekly_files, key=wts, reverse=True)
-
-            for f in weekly_sorted:
+            for r in history_page(weekly_records, key="weekly_history_page"):
                 c1, c2 = st.columns([0.8, 0.2])
                 with c1:
-                    st.link_button(weekly_pretty_label(f["name"]), f["download_url"], width='stretch')
+                    st.link_button(r["label"], r["download_url"], width='stretch')
                 with c2:
-                    confirm = st.checkbox("Confirm", key=f"confirm_weekly_{f['name']}")
-                    if st.button("🗑 Delete", key=f"del_weekly_{f['name']}", type="secondary", disabled=not confirm, width='stretch'):
-                        pdf_path = f"{GITHUB_WEEKLY_PDF}/{f['name']}"
+                    confirm = st.checkbox("Confirm", key=f"confirm_weekly_{r['name']}")
+                    if st.button("🗑 Delete", key=f"del_weekly_{r['name']}", type="secondary", disabled=not confirm, width='stretch'):
+                        pdf_path = f"{GITHUB_WEEKLY_PDF}/{r['name']}"
                         ok_pdf = delete_file_from_github(pdf_path, "Delete weekly summary PDF")
                         if ok_pdf:
                             st.success("Deleted.")
-                            st.session_state["history_weekly"] = list_files_from_github(GITHUB_WEEKLY_PDF)
+                            weekly_index(refresh=True)
                             st.rerun()
                         else:
                             st.error("Failed to delete weekly summary. Check your GitHub token/permissions.")
 
 # ----------------- TAB 3: Weekly Summary -----------------
-with tab3:
+def weekly_view():
     st.subheader("Build a Weekly Summary")
 
-    tabs_week = st.tabs(["From existing reports (recommended)", "From file uploads"])
+    tabs_week = st.tabs(["From existing reports (recommended)", "From file uploads", "Month / quarter rollups"])
 
     # ---- From existing reports ----
     with tabs_week[0]:
@@ -685,75 +582,38 @@ with tab3:
         with c2:
             week_end = st.date_input("Week end", value=default_end, key="week_end_existing")
 
-        if "history_daily" not in st.session_state:
-            st.session_state["history_daily"] = list_files_from_github(GITHUB_DAILY_PDF)
-        all_daily = st.session_state["history_daily"] or []
-
-        def _daily_dt(name: str) -> datetime | None:
-            d, t = parse_daily_filename(name)
-            if not d or not t:
-                return None
-            try:
-                return datetime.strptime(f"{d} {t}", "%Y-%m-%d %H-%M-%S")
-            except Exception:
-                return None
-
-        start_dt = datetime.combine(week_start, datetime.min.time())
-        end_dt = datetime.combine(week_end, datetime.max.time())
-        in_range = [f for f in all_daily if (dt := _daily_dt(f["name"])) and start_dt <= dt <= end_dt]
+        index = daily_index()
+        in_range_sorted = index.in_range(week_start, week_end)
+        options = [r["name"] for r in in_range_sorted]
 
-        in_range_sorted = sorted(in_range, key=lambda f: _daily_dt(f["name"]) or datetime.min, reverse=True)
-        options = [f["name"] for f in in_range_sorted]
-        label_map = {f["name"]: human_label_from_filename(f["name"]) for f in in_range_sorted}
+        preselect_latest("weekly_existing_choice", index, week_start, week_end)
 
-        st.write(f"**Reports found in range:** {len(options)}")
+        st.write(f"**Reports found in range:** {len(options)} ({len(index.latest_per_day(week_start, week_end))} days)")
         selected_reports = st.multiselect(
-            "Choose daily reports to include",
+            "Choose daily reports to include (the newest of each day is used)",
             options=options,
-            format_func=lambda n: label_map.get(n, n),
+            format_func=lambda n: index.by_name[n]["label"],
             key="weekly_existing_choice"
         )
+        selected_reports = resolve_one_per_day(index, selected_reports)
+
+        breakdown = st.selectbox(
+            "Columns",
+            options=list(range_summary_section.BREAKDOWNS),
+            format_func=lambda k: range_summary_section.BREAKDOWNS[k],
+            key="weekly_existing_breakdown",
+        )
 
         if selected_reports:
-            dfs, missing = [], []
-            for n in selected_reports:
-                base = n.replace(".pdf", ".csv")
-                csv_path = f"{GITHUB_DAILY_CSV}/{base}"
-                df = fetch_csv_from_github(csv_path)
-                if df is None:
-                    missing.append(base)
-                    continue
-                need = {"Product name", "Total"}
-                if not need.issubset(df.columns):
-                    brand_cols = [c for c in df.columns if c not in ("Product name","Already Made","Total")]
-                    if brand_cols:
-                        df["Total"] = (df[brand_cols].sum(axis=1) - df.get("Already Made", 0)).clip(lower=0)
-                    else:
-                        continue
-                if "Already Made" not in df.columns:
-                    df["Already Made"] = 0
-                dfs.append(df[["Product name","Already Made","Total"]])
+            frames, missing = load_daily_summary_frames([index.by_name[n] for n in selected_reports])
 
             if missing:
                 st.warning("Missing CSV for:\n\n- " + "\n- ".join(missing))
 
-            if dfs:
-                merged = pd.concat(dfs, ignore_index=True)
-                weekly_df = merged.groupby("Product name", as_index=False).sum(numeric_only=True)
-
-                keep_cols = [c for c in ["Product name","Already Made","Total"] if c in weekly_df.columns]
-                weekly_df = weekly_df[keep_cols]
-                if "Already Made" not in weekly_df.columns:
-                    weekly_df["Already Made"] = 0
-                if "Total" not in weekly_df.columns:
-                    weekly_df["Total"] = 0
-
+            if frames:
+                weekly_df = range_summary_section.range_pivot(range_summary_section.stack_daily_frames(frames), SUMMARY_MEAL_ORDER, breakdown)
+                breakdown_cols = [c for c in weekly_df.columns if c not in range_summary_section.SUMMARY_FIXED_COLUMNS]
                 weekly_df["Adjustments"] = 0
-                weekly_df = weekly_df[weekly_df["Product name"].isin(SUMMARY_MEAL_ORDER)].copy()
-                weekly_df["meal_order"] = weekly_df["Product name"].apply(
-                    lambda x: SUMMARY_MEAL_ORDER.index(x)
-                )
-                weekly_df = weekly_df.sort_values("meal_order").drop(columns=["meal_order"])
 
                 edited_weekly = st.data_editor(
                     weekly_df,
@@ -764,44 +624,16 @@ with tab3:
                 )
                 edited_weekly["Final Total"] = (edited_weekly["Total"] + edited_weekly["Adjustments"]).clip(lower=0)
 
-                st.dataframe(edited_weekly[["Product name","Already Made","Total","Adjustments","Final Total"]], width='stretch')
+                st.dataframe(edited_weekly[["Product name"]+breakdown_cols+["Already Made","Total","Adjustments","Final Total"]], width='stretch')
 
                 if st.button("Generate & Save Weekly Summary PDF (from selected reports)"):
-                    header_date = f"{week_start.strftime('%d/%m/%Y')}-{week_end.strftime('%d/%m/%Y')}"
-                    pdf = ProductionPDF(header_date_str=header_date)
-                    pdf.set_auto_page_break(False)
-
-                    out_df = edited_weekly[["Product name", "Already Made", "Final Total"]].copy()
+                    out_df = edited_weekly[["Product name"] + breakdown_cols + ["Final Total"]].copy()
                     out_df = out_df.rename(columns={"Final Total": "Total"})
-                    out_df["Already Made"] = pd.to_numeric(out_df["Already Made"], errors="coerce").fillna(0).astype(int)
-                    out_df["Total"] = pd.to_numeric(out_df["Total"], errors="coerce").fillna(0).astype(int)
+                    out_df[breakdown_cols + ["Total"]] = out_df[breakdown_cols + ["Total"]].apply(
+                        pd.to_numeric, errors="coerce"
+                    ).fillna(0).astype(int)
 
-                    title = f"Weekly Meal Summary - {week_start.strftime('%d/%m/%Y')} to {week_end.strftime('%d/%m/%Y')}"
-                    pdf.add_page()
-                    pdf.set_font("Arial", "B", 13)
-                    pdf.cell(0, 9, title, ln=1, align='C')
-                    pdf.ln(2)
-
-                    n_cols = 1 + 2
-                    a4_w = 210
-                    available_w = a4_w - 20
-                    meal_col_w = 80
-                    other_col_w = (available_w - meal_col_w) / (n_cols - 1)
-                    col_widths = [meal_col_w, other_col_w]
-
-                    headers = ["Meal", "Total"]
-                    pdf.set_font("Arial", "B", 9)
-                    for h, w in zip(headers, col_widths):
-                        pdf.cell(w, 7, h, 1, 0, 'C')
-                    pdf.ln(7)
-
-                    pdf.set_font("Arial", "", 8)
-                    for _, row in out_df.iterrows():
-                        pdf.cell(col_widths[0], 6, str(row["Product name"]), 1)
-                        pdf.cell(col_widths[1], 6, str(int(row["Total"])), 1)
-                        pdf.ln(6)
-
-                    pdf_bytes = pdf.output(dest="S").encode("latin1")
+                    pdf_bytes = range_summary_section.build_range_summary_pdf(out_df, week_start, week_end, breakdown_cols + ["Total"])
                     now_local = datetime.now(LOCAL_TZ)
                     fname = f"weekly_summary_{week_start.strftime('%Y-%m-%d')}_to_{week_end.strftime('%Y-%m-%d')}_{now_local.strftime('%H-%M-%S')}.pdf"
                     if push_pdf_to_github(pdf_bytes, fname, weekly=True):
@@ -842,18 +674,11 @@ with tab3:
                 df = df[["Product name","Quantity"]]
                 df["Product name"] = df["Product name"].astype(str).str.strip()
                 df["Quantity"] = pd.to_numeric(df["Quantity"], errors="coerce").fillna(0).astype(int)
-                dfs.append(df)
+                dfs.append((f.name, df.rename(columns={"Quantity": "Total"})))
 
             if dfs:
-                merged = pd.concat(dfs, ignore_index=True)
-                weekly_df = merged.groupby("Product name", as_index=False)["Quantity"].sum().rename(columns={"Quantity":"Total"})
-                weekly_df["Already Made"] = 0
+                weekly_df = range_summary_section.range_pivot(range_summary_section.stack_daily_frames(dfs), SUMMARY_MEAL_ORDER)
                 weekly_df["Adjustments"] = 0
-                weekly_df = weekly_df[weekly_df["Product name"].isin(SUMMARY_MEAL_ORDER)].copy()
-                weekly_df["meal_order"] = weekly_df["Product name"].apply(
-                    lambda x: SUMMARY_MEAL_ORDER.index(x)
-                )
-                weekly_df = weekly_df.sort_values("meal_order").drop(columns=["meal_order"])
 
                 edited_weekly = st.data_editor(
                     weekly_df,
@@ -867,41 +692,11 @@ with tab3:
                 st.dataframe(edited_weekly[["Product name","Already Made","Total","Adjustments","Final Total"]], width='stretch')
 
                 if st.button("Generate & Save Weekly Summary PDF (from uploads)"):
-                    header_date = f"{week_start2.strftime('%d/%m/%Y')}-{week_end2.strftime('%d/%m/%Y')}"
-                    pdf = ProductionPDF(header_date_str=header_date)
-                    pdf.set_auto_page_break(False)
-
-                    out_df = edited_weekly[["Product name", "Already Made", "Final Total"]].copy()
+                    out_df = edited_weekly[["Product name", "Final Total"]].copy()
                     out_df = out_df.rename(columns={"Final Total": "Total"})
-                    out_df["Already Made"] = pd.to_numeric(out_df["Already Made"], errors="coerce").fillna(0).astype(int)
                     out_df["Total"] = pd.to_numeric(out_df["Total"], errors="coerce").fillna(0).astype(int)
 
-                    title = f"Weekly Meal Summary - {week_start2.strftime('%d/%m/%Y')} to {week_end2.strftime('%d/%m/%Y')}"
-                    pdf.add_page()
-                    pdf.set_font("Arial", "B", 13)
-                    pdf.cell(0, 9, title, ln=1, align='C')
-                    pdf.ln(2)
-
-                    n_cols = 1 + 2
-                    a4_w = 210
-                    available_w = a4_w - 20
-                    meal_col_w = 80
-                    other_col_w = (available_w - meal_col_w) / (n_cols - 1)
-                    col_widths = [meal_col_w, other_col_w]
-
-                    headers = ["Meal", "Total"]
-                    pdf.set_font("Arial", "B", 9)
-                    for h, w in zip(headers, col_widths):
-                        pdf.cell(w, 7, h, 1, 0, 'C')
-                    pdf.ln(7)
-
-                    pdf.set_font("Arial", "", 8)
-                    for _, row in out_df.iterrows():
-                        pdf.cell(col_widths[0], 6, str(row["Product name"]), 1)
-                        pdf.cell(col_widths[1], 6, str(int(row["Total"])), 1)
-                        pdf.ln(6)
-
-                    pdf_bytes = pdf.output(dest="S").encode("latin1")
+                    pdf_bytes = range_summary_section.build_range_summary_pdf(out_df, week_start2, week_end2)
                     now_local = datetime.now(LOCAL_TZ)
                     fname = f"weekly_summary_{week_start2.strftime('%Y-%m-%d')}_to_{week_end2.strftime('%Y-%m-%d')}_{now_local.strftime('%H-%M-%S')}.pdf"
                     if push_pdf_to_github(pdf_bytes, fname, weekly=True):
@@ -911,3 +706,165 @@ with tab3:
                     st.download_button("📄 Download Weekly Summary PDF", pdf_bytes, file_name=fname, mime="application/pdf")
         else:
             st.info("Add weekly CSV/XLSX files above, or switch to the 'From existing reports' tab.")
+
+    # ---- Month / quarter rollups ----
+    with tabs_week[2]:
+        st.caption("Per-brand totals for whole months or quarters, from the newest archived report of each day.")
+        kind = st.radio(
+            "Period", list(rollups.PERIOD_KINDS), format_func=lambda k: rollups.PERIOD_KINDS[k],
+            horizontal=True, key="rollup_kind",
+        )
+        index = daily_index()
+        # period -> {day: newest report name}, periods newest first
+        period_days = {}
+        for r in index.latest_per_day():
+            period_days.setdefault(rollups.period_key(r["date"], kind), {})[r["date"]] = r["name"]
+        chosen = st.multiselect(
+            "Periods", options=list(period_days),
+            format_func=lambda k: f"{rollups.period_label(k, kind)} ({len(period_days[k])} days)",
+            key=f"rollup_periods_{kind}",
+        )
+
+        if chosen:
+            missing = []
+
+            def load_frames(names):
+                frames, miss = load_daily_summary_frames([index.by_name[n] for n in names])
+                missing.extend(miss)
+                return frames
+
+            tables = rollups.period_rollups(
+                kind, {k: list(period_days[k].values()) for k in chosen}, load_frames, SUMMARY_MEAL_ORDER
+            )
+            if missing:
+                st.warning("Missing CSV for:\n\n- " + "\n- ".join(missing))
+
+            for key in chosen:
+                label = rollups.period_label(key, kind)
+                table = tables.get(key)
+                if table is None:
+                    st.info(f"{label}: no summary CSVs found.")
+                    continue
+                start, end = rollups.period_bounds(key, kind)
+                value_cols = [c for c in table.columns if c not in ("Product name", "Already Made")]
+                st.markdown(f"**{label}** — {len(period_days[key])} days")
+                st.dataframe(table, hide_index=True, width='stretch')
+                c1, c2 = st.columns(2)
+                with c1:
+                    st.download_button(
+                        "⬇️ CSV", table.to_csv(index=False).encode("utf-8"),
+                        file_name=f"{kind}_rollup_{key}.csv", mime="text/csv", key=f"rollup_csv_{kind}_{key}",
+                    )
+                with c2:
+                    if st.button("Build PDF", key=f"rollup_pdf_{kind}_{key}"):
+                        st.download_button(
+                            "📄 Download PDF",
+                            range_summary_section.build_range_summary_pdf(table, start, end, value_cols),
+                            file_name=f"{kind}_rollup_{key}.pdf", mime="application/pdf",
+                            key=f"rollup_pdf_dl_{kind}_{key}",
+                        )
+
+# ----------------- TAB 4: Procurement Forecast -----------------
+def forecast_view():
+    st.subheader("Procurement Forecast")
+    st.caption("Ingredient, meat and veg demand for every day in a range — from archived daily reports or uploaded future orders — in one calculation.")
+
+    forecast_source = st.radio(
+        "Orders from", ["Existing reports", "Uploaded orders"], horizontal=True, key="forecast_source"
+    )
+    forecast_frames = []
+
+    if forecast_source == "Existing reports":
+        today = date.today()
+        default_start = today - timedelta(days=today.weekday())
+        c1, c2 = st.columns(2)
+        with c1:
+            forecast_start = st.date_input("From", value=default_start, key="forecast_start")
+        with c2:
+            forecast_end = st.date_input("To", value=default_start + timedelta(days=6), key="forecast_end")
+
+        index = daily_index()
+        in_range_sorted = index.in_range(forecast_start, forecast_end)
+
+        preselect_latest("forecast_reports", index, forecast_start, forecast_end)
+
+        st.write(f"**Reports found in range:** {len(in_range_sorted)}")
+        forecast_reports = st.multiselect(
+            "Daily reports to include (the newest of each day is used)",
+            options=[r["name"] for r in in_range_sorted],
+            format_func=lambda n: index.by_name[n]["label"],
+            key="forecast_reports",
+        )
+        forecast_reports = resolve_one_per_day(index, forecast_reports)
+        if forecast_reports:
+            forecast_frames, missing = load_daily_summary_frames([index.by_name[n] for n in forecast_reports])
+            if missing:
+                st.warning("Missing CSV for:\n\n- " + "\n- ".join(missing))
+    else:
+        order_files = st.file_uploader(
+            "Order files (CSV/XLSX with 'Product name' and 'Quantity', one file per day)",
+            type=["csv", "xlsx"], accept_multiple_files=True, key="forecast_files_upload",
+        )
+        for i, f in enumerate(order_files or []):
+            try:
+                df = pd.read_csv(f) if f.name.endswith(".csv") else pd.read_excel(f)
+            except Exception as e:
+                st.error(f"Failed to read {f.name}: {e}")
+                continue
+            df.columns = df.columns.str.strip()
+            if not {"Product name", "Quantity"}.issubset(df.columns):
+                st.warning(f"{f.name}: missing 'Product name' or 'Quantity' — skipped.")
+                continue
+            day = st.date_input(f"Production day for {f.name}", value=date.today() + timedelta(days=i), key=f"forecast_day_{f.file_id}")
+            df = df[["Product name", "Quantity"]].rename(columns={"Quantity": "Total"})
+            df["Total"] = pd.to_numeric(df["Total"], errors="coerce").fillna(0).astype(int)
+            forecast_frames.append((day, df))
+
+    if forecast_frames:
+        forecast = procurement_forecast.forecast_tables(forecast_frames)
+        view = st.radio("Show", ["Per day", "Cumulative"], horizontal=True, key="forecast_view")
+        for key, title in procurement_forecast.FORECAST_TABLES.items():
+            table = forecast[key] if view == "Per day" else procurement_forecast.cumulative(forecast[key])
+            st.markdown(f"**{title}**")
+            st.dataframe(table, hide_index=True, width='stretch')
+
+        forecast_csv = pd.concat(forecast.values(), ignore_index=True).to_csv(index=False).encode("utf-8")
+        st.download_button(
+            "⬇️ Download forecast (CSV)", forecast_csv,
+            file_name=f"procurement_forecast_{datetime.now(LOCAL_TZ).strftime('%Y-%m-%d_%H-%M-%S')}.csv",
+            mime="text/csv",
+        )
+    else:
+        st.info("Pick a date range and the daily reports to include, or upload order files for the days ahead.")
+
+# ---------- Tabs ----------
+# Only the open tab runs (the history and weekly tabs list the archive on
+# GitHub). The daily flow always runs so its uploads and edits keep their state.
+tab1, tab2, tab3, tab4 = st.tabs(
+    ["📥 Upload & Generate", "📄 Document History", "📆 Weekly Summary", "🛒 Procurement Forecast"],
+    key="main_tabs",
+    on_change="rerun",
+)
+with tab1:
+    daily_flow()
+with tab2:
+    if tab2.open:
+        history_view()
+with tab3:
+    if tab3.open:
+        weekly_view()
+with tab4:
+    if tab4.open:
+        forecast_view()
+
+# ---------- Debug ----------
+# ?debug=1: what the deferred imports have cost this server process so far
+if st.query_params.get("debug") == "1":
+    with st.expander("🛠 Import profile"):
+        if IMPORT_PROFILE:
+            lines = ["| Module | First import (ms) | Modules loaded |", "|---|---:|---:|"]
+            lines += [f"| {p['module']} | {p['seconds'] * 1000:.1f} | {p['new_modules']} |" for p in IMPORT_PROFILE]
+            st.markdown("\n".join(lines))
+            st.caption(f"Total: {sum(p['seconds'] for p in IMPORT_PROFILE) * 1000:.1f} ms")
+        pending = [name for name, module in LAZY_MODULES.items() if not module.loaded]
+        st.caption("Not loaded yet: " + (", ".join(pending) if pending else "none"))
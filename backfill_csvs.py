@@ -0,0 +1,316 @@
+"""Backfill the summary CSVs of archived daily reports from their PDFs.
+
+Weekly summaries, rollups and the contents search read the paired CSV of a
+daily report (reports/data); older reports only have the PDF. For every
+daily PDF without a CSV this tool:
+
+- reads the Meal Production Summary table off the PDF's first copy
+- rebuilds the CSV in the current schema: "Product name", one column per
+  brand, "Already Made", "Total" (older reports had no "Already Made": 0)
+- checks the table's column sums against its TOTAL row (the oldest
+  reports have none: there every row's Total must match its brands)
+
+PDFs are parsed in parallel across cores. Only tables that pass the check
+are written, all in one commit (GitHub's git data API), so the archive
+gains them at once.
+
+Usage:
+
+    GITHUB_TOKEN=... python backfill_csvs.py --dry-run
+    GITHUB_TOKEN=... python backfill_csvs.py
+    python backfill_csvs.py --local reports     # a checkout: writes reports/data/*.csv
+
+Needs PyMuPDF (pip install pymupdf) to read the PDFs; the app itself does
+not. GITHUB_REPO, GITHUB_BRANCH and GITHUB_API_URL can be set in the
+environment (GITHUB_API_URL as for the app, see load_test).
+"""
+import argparse
+import base64
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+from report_index import DAILY_PREFIX
+
+GITHUB_REPO = os.environ.get("GITHUB_REPO", "LukeCreativeInd/kitchen_planner_test")
+GITHUB_BRANCH = os.environ.get("GITHUB_BRANCH", "main")
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_DAILY_PDF = "reports"
+GITHUB_DAILY_CSV = "reports/data"
+
+SUMMARY_TITLE = "Meal Production Summary"
+FIXED_COLUMNS = ("Already Made", "Total")
+
+# Table cells as the PDF text prints them ("nan" / "None": empty cells of an edited table)
+NUMBER = re.compile(r"-?\d+(?:\.\d+)?$")
+EMPTY_CELLS = ("nan", "None")
+# A meal name too long for its cell runs into the first quantity: "...Potatoes96"
+NAME_AND_NUMBER = re.compile(r"(.*\D)(-?\d+(?:\.\d+)?)$")
+
+
+def _is_cell(text) -> bool:
+    return bool(NUMBER.match(text)) or text in EMPTY_CELLS
+
+
+def _cell_value(text) -> int:
+    return 0 if text in EMPTY_CELLS else int(round(float(text)))
+
+
+def _summary_lines(doc):
+    """Text lines of the first summary table's page, from the title on."""
+    for page in doc:
+        lines = [line.strip() for line in page.get_text().splitlines() if line.strip()]
+        for i, line in enumerate(lines):
+            if line.startswith(SUMMARY_TITLE):
+                return lines[i + 1:]
+    return None
+
+
+def parse_summary(pdf_bytes) -> dict:
+    """The Meal Production Summary of a daily report PDF.
+
+    {"columns": value column headers (brands, ["Already Made"], "Total"),
+     "rows": [[meal, quantities...]], "total": TOTAL row quantities or None,
+     "complete": the table ended on its page}, or None if the PDF has no
+    summary table.
+    """
+    import pymupdf
+
+    with pymupdf.open(stream=pdf_bytes, filetype="pdf") as doc:
+        lines = _summary_lines(doc)
+    if not lines or "Meal" not in lines:
+        return None
+    j = lines.index("Meal") + 1
+    if "Total" not in lines[j:]:
+        return None
+    end = lines.index("Total", j)
+    columns, j = lines[j:end + 1], end + 1
+    k = len(columns)
+
+    rows, total, complete = [], None, False
+    while j < len(lines):
+        name, cells = lines[j], lines[j + 1:j + 1 + k]
+        step = k + 1
+        if not (len(cells) == k and all(_is_cell(c) for c in cells)):
+            fused = NAME_AND_NUMBER.match(name)
+            cells = lines[j + 1:j + k]
+            if not (fused and len(cells) == k - 1 and all(_is_cell(c) for c in cells)):
+                # first line that is not a table row: the table (without TOTAL row) ended here
+                complete = bool(rows)
+                break
+            name, cells, step = fused.group(1).rstrip(), [fused.group(2)] + cells, k
+        values = [_cell_value(c) for c in cells]
+        if name == "TOTAL":
+            total, complete = values, True
+            break
+        if name not in EMPTY_CELLS:
+            rows.append([name] + values)
+        j += step
+    return {"columns": columns, "rows": rows, "total": total, "complete": complete}
+
+
+def summary_frame(parsed) -> pd.DataFrame:
+    """Parsed summary -> frame in the current CSV schema."""
+    df = pd.DataFrame(parsed["rows"], columns=["Product name"] + parsed["columns"])
+    if "Already Made" not in df.columns:
+        df.insert(len(df.columns) - 1, "Already Made", 0)
+    brands = [c for c in df.columns if c != "Product name" and c not in FIXED_COLUMNS]
+    return df[["Product name"] + brands + list(FIXED_COLUMNS)]
+
+
+def check_summary(parsed, df) -> str:
+    """"" if the table adds up, else what is wrong with it."""
+    if not parsed["rows"]:
+        return "summary table has no rows"
+    if parsed["total"] is not None:
+        sums = [int(df[c].sum()) if c in df else 0 for c in parsed["columns"]]
+        if sums != parsed["total"]:
+            bad = [c for c, s, t in zip(parsed["columns"], sums, parsed["total"]) if s != t]
+            return "column sums differ from the TOTAL row: " + ", ".join(bad)
+        return ""
+    if not parsed["complete"]:
+        return "no TOTAL row and the table runs to the end of the page"
+    brands = [c for c in df.columns if c != "Product name" and c not in FIXED_COLUMNS]
+    expected = (df[brands].sum(axis=1) - df["Already Made"]).clip(lower=0)
+    if not expected.eq(df["Total"]).all():
+        return "no TOTAL row and some row totals differ from their brands"
+    return ""
+
+
+def backfill_one(item) -> dict:
+    """(pdf name, pdf bytes) -> {"name", "csv_name", "rows", "problem", "csv"} (csv: bytes, None if it failed)."""
+    name, pdf_bytes = item
+    result = {"name": name, "csv_name": name[:-len(".pdf")] + ".csv", "rows": 0, "problem": "", "csv": None}
+    try:
+        parsed = parse_summary(pdf_bytes)
+    except Exception as e:
+        result["problem"] = f"unreadable PDF: {e}"
+        return result
+    if parsed is None:
+        result["problem"] = "no Meal Production Summary table"
+        return result
+    df = summary_frame(parsed)
+    result["rows"] = len(df)
+    result["problem"] = check_summary(parsed, df)
+    if not result["problem"]:
+        result["csv"] = df.to_csv(index=False).encode("utf-8")
+    return result
+
+
+# ---------- Archive access ----------
+class LocalArchive:
+    """A checkout's reports folder (PDFs in `folder`, CSVs in `folder`/data)."""
+
+    def __init__(self, folder):
+        self.folder, self.data = folder, os.path.join(folder, "data")
+
+    def missing(self) -> list:
+        csvs = set(os.listdir(self.data)) if os.path.isdir(self.data) else set()
+        return sorted(
+            n for n in os.listdir(self.folder)
+            if n.startswith(DAILY_PREFIX) and n.endswith(".pdf") and n.replace(".pdf", ".csv") not in csvs
+        )
+
+    def read_pdfs(self, names, workers):
+        for n in names:
+            with open(os.path.join(self.folder, n), "rb") as f:
+                yield n, f.read()
+
+    def write(self, files, message):
+        os.makedirs(self.data, exist_ok=True)
+        for name, data in files.items():
+            with open(os.path.join(self.data, name), "wb") as f:
+                f.write(data)
+        return f"{len(files)} files in {self.data} (commit them with git)"
+
+
+class GitHubArchive:
+    """The archive in the GitHub repo the app writes to."""
+
+    def __init__(self, token, repo=GITHUB_REPO, branch=GITHUB_BRANCH, api_url=GITHUB_API_URL):
+        import requests
+
+        self.repo, self.branch, self.api = repo, branch, f"{api_url}/repos/{repo}"
+        self.http = requests.Session()
+        self.http.headers["Authorization"] = f"token {token}"
+        self._urls = {}
+
+    def _call(self, method, path, **kwargs):
+        r = self.http.request(method, f"{self.api}/{path}", timeout=60, **kwargs)
+        if r.status_code >= 300:
+            raise RuntimeError(f"{method} {path}: HTTP {r.status_code} {r.text[:200]}")
+        return r.json()
+
+    def _listing(self, folder, ext):
+        try:
+            items = self._call("GET", f"contents/{folder}", params={"ref": self.branch})
+        except RuntimeError:
+            return {}
+        return {it["name"]: it.get("download_url") for it in items
+                if isinstance(it, dict) and it.get("type") == "file" and it["name"].endswith(ext)}
+
+    def missing(self) -> list:
+        self._urls = self._listing(GITHUB_DAILY_PDF, ".pdf")
+        csvs = self._listing(GITHUB_DAILY_CSV, ".csv")
+        return sorted(n for n in self._urls if n.startswith(DAILY_PREFIX) and n.replace(".pdf", ".csv") not in csvs)
+
+    def _download(self, name):
+        url = self._urls.get(name)
+        if url:
+            r = self.http.get(url, timeout=60)
+            if r.status_code == 200:
+                return name, r.content
+        item = self._call("GET", f"contents/{GITHUB_DAILY_PDF}/{name}", params={"ref": self.branch})
+        return name, base64.b64decode(item.get("content", ""))
+
+    def read_pdfs(self, names, workers):
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            yield from pool.map(self._download, names)
+
+    def write(self, files, message):
+        """One commit adding every file (git data API: tree on the branch head, commit, move the ref)."""
+        head = self._call("GET", f"git/ref/heads/{self.branch}")["object"]["sha"]
+        base_tree = self._call("GET", f"git/commits/{head}")["tree"]["sha"]
+        entries = [
+            {"path": f"{GITHUB_DAILY_CSV}/{name}", "mode": "100644", "type": "blob", "content": data.decode("utf-8")}
+            for name, data in files.items()
+        ]
+        tree = self._call("POST", "git/trees", json={"base_tree": base_tree, "tree": entries})["sha"]
+        commit = self._call("POST", "git/commits", json={"message": message, "tree": tree, "parents": [head]})["sha"]
+        self._call("PATCH", f"git/refs/heads/{self.branch}", json={"sha": commit})
+        return f"commit {commit[:7]} on {self.repo}@{self.branch}"
+
+
+def backfill(archive, workers=None, fetch_workers=8, dry_run=False, limit=None) -> dict:
+    """Backfill every daily PDF of `archive` that has no CSV; returns the summary printed by main."""
+    timings = {}
+    start = time.perf_counter()
+    names = archive.missing()[:limit]
+    timings["list_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(backfill_one, archive.read_pdfs(names, fetch_workers), chunksize=4))
+    timings["fetch_parse_s"] = time.perf_counter() - start
+
+    files = {r["csv_name"]: r["csv"] for r in results if r["csv"] is not None}
+    written = None
+    if files and not dry_run:
+        start = time.perf_counter()
+        written = archive.write(files, f"Backfill {len(files)} daily summary CSVs from archived PDFs")
+        timings["write_s"] = time.perf_counter() - start
+
+    return {
+        "missing": len(names),
+        "backfilled": len(files),
+        "failed": [{"name": r["name"], "problem": r["problem"]} for r in results if r["csv"] is None],
+        "written": written,
+        "dry_run": dry_run,
+        "seconds": {k: round(v, 3) for k, v in timings.items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--local", metavar="DIR", help="a checkout's reports folder instead of GitHub")
+    parser.add_argument("--dry-run", action="store_true", help="parse and check, write nothing")
+    parser.add_argument("--workers", type=int, default=None, help="PDF parsing processes (default: all cores)")
+    parser.add_argument("--fetch-workers", type=int, default=8, help="PDF downloads at the same time")
+    parser.add_argument("--limit", type=int, default=None, help="backfill at most this many reports")
+    parser.add_argument("--json", help="also write the summary to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        import pymupdf  # noqa: F401
+    except ImportError:
+        parser.error("reading the PDFs needs PyMuPDF: pip install pymupdf")
+
+    if args.local:
+        archive = LocalArchive(args.local)
+    else:
+        token = os.environ.get("GITHUB_TOKEN")
+        if not token:
+            parser.error("set GITHUB_TOKEN (or use --local)")
+        archive = GitHubArchive(token)
+
+    summary = backfill(archive, args.workers, args.fetch_workers, args.dry_run, args.limit)
+    print(f"{summary['missing']} daily reports without a CSV, {summary['backfilled']} backfilled"
+          + (" (dry run, nothing written)" if args.dry_run else ""))
+    for row in summary["failed"]:
+        print(f"    ! {row['name']}: {row['problem']}")
+    if summary["written"]:
+        print(f"Wrote {summary['written']}")
+    print("Seconds: " + ", ".join(f"{k} {v:.2f}" for k, v in summary["seconds"].items()))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    return 0 if not summary["failed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""One batch planner for every batch rule in the report.
+
+A rule says how a count of meals turns into a number of batches:
+
+- "divisor": meals (or grams, see "per_meal") per batch; <= 0 means no batching
+- "offset": extra meals added before dividing (chicken mixes)
+- "per_meal": grams per meal, for capacity rules such as rice trays (2kg a tray)
+- "even": round a non-zero batch count up to an even number (gnocchi spinach)
+- "when_empty": batch count to report when there are no meals (None: computed)
+- "no_divisor": batch count to report when there is no divisor
+
+Rules are compiled into arrays once; `BatchPlanner.plan` then evaluates every
+rule for one day (vector) or many days / scenarios (days x meals) at once.
+"""
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from recipe_book import load_recipe_book
+from recipe_matrix import get_bulk_matrix, get_recipe_matrix
+
+RULE_DEFAULTS = {"divisor": 0, "offset": 0, "per_meal": 1, "even": False, "when_empty": None, "no_divisor": 0}
+
+
+def batch_rule(**fields) -> dict:
+    unknown = set(fields) - set(RULE_DEFAULTS)
+    if unknown:
+        raise KeyError(f"Unknown batch rule fields: {', '.join(sorted(unknown))}")
+    return {**RULE_DEFAULTS, **fields}
+
+
+def _apply_rules(base, divisor, offset, per_meal, even, when_empty, no_divisor):
+    """Batches for meal counts `base` (..., rules), all rule fields as per-rule arrays."""
+    quantity = (base + offset) * per_meal
+    safe = np.where(divisor > 0, divisor, 1)
+    batches = np.where(divisor > 0, np.ceil(quantity / safe), no_divisor)
+    batches = np.where(even & (batches > 0), batches + batches % 2, batches)
+    batches = np.where(~np.isnan(when_empty) & (base == 0), when_empty, batches)
+    return batches.astype(np.int64)
+
+
+def batches_for(quantity, **fields):
+    """Batches for a single quantity under one rule (e.g. grams against a capacity)."""
+    rule = batch_rule(**fields)
+    arrays = _rule_arrays([rule])
+    return int(_apply_rules(np.array([float(quantity)]), *arrays)[0])
+
+
+def _rule_arrays(rules):
+    return (
+        np.array([r["divisor"] or 0 for r in rules], dtype=float),
+        np.array([r["offset"] or 0 for r in rules], dtype=float),
+        np.array([r["per_meal"] for r in rules], dtype=float),
+        np.array([bool(r["even"]) for r in rules]),
+        np.array([np.nan if r["when_empty"] is None else r["when_empty"] for r in rules], dtype=float),
+        np.array([r["no_divisor"] for r in rules], dtype=float),
+    )
+
+
+class BatchPlanner:
+    """Every batch rule of the report, keyed by (kind, name).
+
+    Kinds: "recipe" (meal_recipes batch), "bulk" (bulk section batch_size or
+    rice trays), "chicken_mix" and "rice_mix" (Pre-Pack Room), "mix" (meat/veg
+    mix_batch terms). Recipe and mix names are UPPER-CASE meals.
+    """
+
+    def __init__(self, recipe_matrix, bulk_matrix, book=None):
+        rm, bm = recipe_matrix, bulk_matrix
+        book = load_recipe_book() if book is None else book
+        self.meals = rm.meals
+        keys, sources, rules = [], [], []
+
+        def one_meal(meal):
+            row = np.zeros(len(self.meals))
+            i = rm.meal_index.get(meal.upper())
+            if i is None:
+                raise KeyError(f"Batch rule for unknown meal: {meal}")
+            row[i] = 1
+            return row
+
+        def add(key, source, rule):
+            keys.append(key)
+            sources.append(source)
+            rules.append(rule)
+
+        for name, i in rm.recipe_rows.items():
+            add(("recipe", name.upper()), one_meal(name), batch_rule(divisor=rm.batch[i]))
+
+        for s, sec in enumerate(book["bulk_sections"]):
+            membership = bm.membership[s].astype(float)
+            if sec.get("custom_type") == "rice_trays":
+                rule = batch_rule(
+                    divisor=float(sec.get("rice_per_tray", 2000) or 2000),
+                    per_meal=float(sec.get("rice_per_meal", 0) or 0),
+                )
+            else:
+                rule = batch_rule(divisor=bm.batch_size[s])
+            add(("bulk", sec["title"]), membership, rule)
+
+        prepack = book["prepack_room"]
+        for mix in prepack["chicken_mixes"]:
+            add(("chicken_mix", mix["name"]), one_meal(mix["meal"]),
+                batch_rule(divisor=mix["divisor"], offset=mix.get("extra", 0), no_divisor=1))
+        for mix in prepack["rice_mixes"]:
+            add(("rice_mix", mix["title"]), one_meal(mix["meal"]),
+                batch_rule(divisor=mix["batch_size"], when_empty=1))
+
+        for lines in book["meat_veg"].values():
+            for line in lines:
+                for term in line["terms"]:
+                    if term["type"] == "mix_batch" and ("mix", term["meal"].upper()) not in keys:
+                        add(("mix", term["meal"].upper()), one_meal(term["meal"]),
+                            batch_rule(divisor=term["divisor"], even=term.get("even_batches", False)))
+
+        self.keys = tuple(keys)
+        self.index = {k: r for r, k in enumerate(self.keys)}
+        self.rules = tuple(rules)
+        # rules x meals: which meals each rule counts
+        self.source = np.array(sources).reshape(len(keys), len(self.meals))
+        self._arrays = _rule_arrays(rules)
+        self.source.setflags(write=False)
+
+    def meal_counts(self, totals) -> np.ndarray:
+        """Meals counted by every rule: (rules,) for one day, (days, rules) for a matrix."""
+        return np.asarray(totals, dtype=float) @ self.source.T
+
+    def plan(self, totals) -> np.ndarray:
+        """Batches under every rule (aligned with `keys`) for a totals vector or days x meals matrix."""
+        return _apply_rules(self.meal_counts(totals), *self._arrays)
+
+    def plan_dict(self, meal_totals) -> dict:
+        """{(kind, name): batches} for one day's meal_totals dict."""
+        batches = self.plan(np.array([meal_totals.get(m, 0) or 0 for m in self.meals], dtype=float))
+        return {k: int(b) for k, b in zip(self.keys, batches)}
+
+
+@lru_cache(maxsize=8)
+def batch_planner_for(recipe_matrix, bulk_matrix) -> BatchPlanner:
+    """BatchPlanner compiled for these matrices (cached per pair)."""
+    return BatchPlanner(recipe_matrix, bulk_matrix)
+
+
+def get_batch_planner() -> BatchPlanner:
+    """The shared BatchPlanner for the recipe book."""
+    return batch_planner_for(get_recipe_matrix(), get_bulk_matrix())
+
+
+def aligned_to_batches(total, batches):
+    """Total rounded UP to a whole amount per batch, times batches (single batch: unchanged).
+
+    Works elementwise on arrays (one total per day) as well as on numbers.
+    """
+    if np.ndim(total) or np.ndim(batches):
+        batches = np.asarray(batches)
+        safe = np.where(batches > 1, batches, 1)
+        return np.where(batches > 1, np.ceil(np.asarray(total) / safe) * safe, total)
+    if batches > 1:
+        return math.ceil(total / batches) * batches
+    return total
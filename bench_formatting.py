@@ -0,0 +1,59 @@
+"""Benchmark: scalar vs column-wise number formatting (utils).
+
+Formats the same column of quantities with fmt_int_up / fmt_qty one value
+at a time and with fmt_int_up_array / fmt_qty_array, checks both give the
+same strings, and prints the best time of each over --repeat runs.
+
+Usage:
+
+    python bench_formatting.py --values 5000 --repeat 20
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from utils import fmt_int_up, fmt_int_up_array, fmt_qty, fmt_qty_array
+
+
+def best_ms(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--values", type=int, default=5000, help="values per column")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per case (best is reported)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    # Section totals (grams) and per-meal quantities, as printed
+    totals = rng.uniform(0, 50000, args.values)
+    per_meal = np.round(rng.uniform(0, 250, args.values), 3)
+    per_meal[::2] = np.round(per_meal[::2])
+
+    cases = [
+        ("fmt_int_up", totals, lambda v: [fmt_int_up(x) for x in v], fmt_int_up_array),
+        ("fmt_qty", per_meal, lambda v: [fmt_qty(x) for x in v], fmt_qty_array),
+    ]
+    print(f"{'function':<12}{'values':>8}{'scalar ms':>12}{'array ms':>11}{'speed-up':>10}")
+    for name, values, scalar, array in cases:
+        as_list = values.tolist()
+        if scalar(as_list) != array(as_list):
+            print(f"{name}: array and scalar strings differ", file=sys.stderr)
+            return 1
+        scalar_ms = best_ms(lambda: scalar(as_list), args.repeat)
+        array_ms = best_ms(lambda: array(as_list), args.repeat)
+        print(f"{name:<12}{len(values):>8}{scalar_ms:>12.2f}{array_ms:>11.2f}{scalar_ms / array_ms:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
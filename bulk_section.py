@@ -1,98 +1,127 @@
-import math
 from datetime import datetime
-from utils import fmt_int_up, fmt_qty
+import numpy as np
+from utils import fmt_int_up_array, fmt_qty_array
+from recipe_book import load_recipe_book
+from recipe_matrix import get_bulk_matrix
+from batch_planner import get_batch_planner
 
 # --- BULK SECTIONS (match names to uploaded CSV exactly) ---
-bulk_sections = [
-    {"title": "Spaghetti Order", "batch_ingredient": "Spaghetti", "batch_size": 85,
-     "ingredients": {"Spaghetti": 64, "Oil": 0.7},
-     "meals": ["Spaghetti Bolognese"]},
-
-    {"title": "Penne Order", "batch_ingredient": "Penne", "batch_size": 135,
-     "ingredients": {"Penne": 65.26, "Oil": 0.79},
-     "meals": ["Chicken Pesto Pasta", "Chicken and Broccoli Pasta"]},
-
-    # Rice is now steamed in oven trays: 2kg rice + 3kg water per tray
-    {"title": "Rice Order", "custom_type": "rice_trays",
-     "rice_per_meal": 53,
-     "rice_per_tray": 2000,
-     "water_per_tray": 3000,
-     "meals": [
-         "Beef Chow Mein",
-         "Beef Burrito Bowl",
-         "Lebanese Beef Stew",
-         "Mongolian Beef",
-         "Butter Chicken",
-         "Thai Green Chicken Curry",
-         "Bean Nachos with Rice",
-         "Chicken Fajita Bowl"
-     ]},
-
-    {"title": "Moroccan Chicken", "batch_ingredient": "Chicken", "batch_size": 0,
-     "ingredients": {"Chicken": 180, "Oil": 2, "Lemon Juice": 6, "Moroccan Chicken Mix": 4},
-     "meals": ["Moroccan Chicken"]},
-
-    # Supplier provides premixed chicken with oil + seasoning already included.
-    # We hide Oil + Roast Chicken Mix rows, but add their weight into Premixed Chicken totals.
-    {"title": "Premixed Chicken Thigh", "batch_ingredient": "Premixed Chicken Thigh", "batch_size": 0,
- "ingredients": {"Premixed Chicken Thigh": 160},
- "meals": ["Chicken Fajita Bowl", "Roasted Lemon Chicken & Potatoes"]},
-
-    # Updated Steak quantities
-    {"title": "Steak", "batch_ingredient": "Steak", "batch_size": 0,
-     "ingredients": {"Steak": 100, "Oil": 1.6, "Baking Soda": 1},
-     "meals": ["Steak with Mushroom Sauce", "Steak On Its Own"]},
-
-    {"title": "Lamb Marinate", "batch_ingredient": "Lamb Shoulder", "batch_size": 0,
- "ingredients": {"Lamb Shoulder": 148.7, "Oil": 1.8, "Oregano": 1.1, "Baking Soda": 2.4},
- "meals": ["Lamb Souvlaki"]},
-
-    {"title": "Potato Mash", "batch_ingredient": "Potato", "batch_size": 0,
-     "ingredients": {"Potato": 158.40, "Cooking Cream": 21.12, "Butter": 7.39, "Salt": 1.58, "White Pepper": 0.2},
-     "meals": ["Beef Meatballs", "Steak with Mushroom Sauce"]},
-
-    # Custom Sweet Potato Mash logic (different per-meal grams by meal)
-    {"title": "Sweet Potato Mash", "custom_type": "sweet_potato_split",
-     "meals": {
-         "Shepherd's Pie": 197.94,
-         "Chicken with Sweet Potato and Beans": 171.55
-     },
-     # Base seasoning ratios per 200g sweet potato
-     "seasoning_per_200": {"Salt": 1, "White Pepper": 0.2}},
-
-    # Renamed
-    {"title": "Roasted Parma Potatoes", "batch_ingredient": "Roasted Potatoes", "batch_size": 50,
-     "ingredients": {"Roasted Potatoes": 190, "Oil": 1.9, "Spices Mix": 1.9},
-     "meals": ["Naked Chicken Parma", "Lamb Souvlaki"]},
-
-    {"title": "Roasted Lemon Potatoes", "batch_ingredient": "Potatoes", "batch_size": 63,
-     "ingredients": {"Potatoes": 207, "Oil": 2, "Salt": 1.2},
-     "meals": ["Roasted Lemon Chicken & Potatoes"]},
-
-    # Updated salt to 0.5
-    {"title": "Roasted Thai Potatoes", "batch_ingredient": "Potato", "batch_size": 0,
-     "ingredients": {"Potato": 60, "Salt": 0.5},
-     "meals": ["Thai Green Chicken Curry"]},
-
-    {"title": "Lamb Onion Marinated", "batch_ingredient": "Red Onion", "batch_size": 0,
-     "ingredients": {"Red Onion": 30, "Parsley": 1.5, "Paprika": 0.5},
-     "meals": ["Lamb Souvlaki"]},
-
-    {"title": "Green Beans", "batch_ingredient": "Green Beans", "batch_size": 0,
-     "ingredients": {"Green Beans": 60},
-     "meals": [
-         "Chicken with Vegetables",
-         "Chicken with Sweet Potato and Beans",
-         "Steak with Mushroom Sauce"
-     ]},
-
-    # Copied from To Pack In Fridge (kept there as well)
-    {"title": "Beef Burrito Mix", "batch_ingredient": "Salsa", "batch_size": 60,
-     "ingredients": {"Salsa": 43, "Black Beans": 50, "Corn": 50, "Rice": 130},
-     "meals": ["Beef Burrito Bowl"]},
-]
-
-def draw_bulk_section(pdf, meal_totals, xpos, col_w, ch, pad, bottom, start_y=None, header_date=None):
+bulk_sections = load_recipe_book()["bulk_sections"]
+
+BULK_COLUMNS = [("Ingredient", 0.4), ("Qty/Meal", 0.15), ("Meals", 0.15), ("Total", 0.15), ("Batches", 0.15)]
+
+# The row builders below leave Qty/Meal (per-unit, exact) and Total (rounded
+# up) as numbers; calc_bulk_tables formats both columns for every table at once.
+
+
+def _rice_tray_rows(sec, total_meals, trays):
+    rice_per_meal = float(sec.get("rice_per_meal", 0) or 0)
+    rice_per_tray = float(sec.get("rice_per_tray", 2000) or 2000)
+    water_per_tray = float(sec.get("water_per_tray", 3000) or 3000)
+
+    total_rice = rice_per_meal * total_meals
+    rice_per_actual_tray = total_rice / trays if trays else 0
+    total_water = trays * water_per_tray if trays else 0
+
+    def rice_row(label, qty_per, meals_display, total_display, batch_display=""):
+        return [str(label), qty_per, str(meals_display), total_display, str(batch_display)]
+
+    return [
+        rice_row("Rice", rice_per_meal, total_meals, rice_per_actual_tray, trays),
+        rice_row("Water", water_per_tray, trays, total_water, ""),
+        rice_row("Tray Setup", rice_per_tray, trays, total_rice, ""),
+    ]
+
+
+def _sweet_potato_rows(sec, total_potato):
+    # Allocate total_potato by recipe ratios (200 / 1 / 0.5)
+    sweet_qty = 200.0
+    salt_qty = float(sec.get("seasoning_per_200", {}).get("Salt", 0) or 0)
+    pep_qty = float(sec.get("seasoning_per_200", {}).get("White Pepper", 0) or 0)
+    denom = sweet_qty + salt_qty + pep_qty
+
+    def pct(v):
+        return (v / denom) if denom else 0.0
+
+    def ratio_row(label, qty, pct_val, total_alloc):
+        return [str(label), qty, f"{pct_val * 100:.1f}%", total_alloc, ""]
+
+    return [
+        ratio_row("Sweet Potato", sweet_qty, pct(sweet_qty), total_potato * pct(sweet_qty)),
+        ratio_row("Salt", salt_qty, pct(salt_qty), total_potato * pct(salt_qty)),
+        ratio_row("White Pepper", pep_qty, pct(pep_qty), total_potato * pct(pep_qty)),
+    ]
+
+
+def _batched_rows(sec, total_meals, batches):
+    ingredients = sec.get("ingredients", {})
+    hide = set(sec.get("hide_ingredients", []))
+    fold_into = sec.get("fold_hidden_into")
+
+    # Determine visible ingredient lines
+    visible_ings = []
+    for ingr, per in ingredients.items():
+        if ingr in hide:
+            continue
+        visible_ings.append((ingr, per))
+
+    # fold hidden into a single ingredient (e.g. Premixed Chicken)
+    if fold_into and fold_into in ingredients:
+        hidden_sum = sum(v for k, v in ingredients.items() if k in hide)
+        # override displayed per-unit for the folded ingredient to include hidden weights
+        visible_ings = [
+            (fold_into, ingredients[fold_into] + hidden_sum)
+        ] + [(k, v) for k, v in visible_ings if k != fold_into]
+
+    rows = []
+    for ingr, per in visible_ings:
+        qty = per * total_meals
+        adj = (qty / batches) if batches else qty
+        lbl = str(batches) if ingr == sec.get('batch_ingredient') else ""
+        rows.append([str(ingr), per, str(total_meals), adj, lbl])
+    return rows
+
+
+def calc_bulk_tables(meal_totals, only=None):
+    """Bulk Raw Ingredients to Cook, as printed: one table per bulk section.
+
+    Each table is {"title", "columns": [(label, fraction)], "rows": [[cell text]], "clip"}
+    where "clip" is the max printed length of the first column. With `only`
+    (a set of section titles) just those tables are calculated.
+    """
+    # Meals feeding every section in one product over the compiled bulk matrix,
+    # and every section's batches (or rice trays) from the batch planner
+    bm = get_bulk_matrix()
+    totals = bm.totals_vector(meal_totals).astype(np.int64)
+    section_meals = bm.section_meals(totals)
+    planner = get_batch_planner()
+    plan = planner.plan(totals)
+
+    tables = []
+    for s, sec in enumerate(bulk_sections):
+        if only is not None and sec["title"] not in only:
+            continue
+        total_meals = int(section_meals[s])
+        batches = int(plan[planner.index[("bulk", sec["title"])]])
+        if sec.get("custom_type") == "rice_trays":
+            rows = _rice_tray_rows(sec, total_meals, batches)
+        elif sec.get("custom_type") == "sweet_potato_split":
+            # Hidden correct total potato grams from per-meal values per meal
+            rows = _sweet_potato_rows(sec, bm.column_total(sec["title"], "Sweet Potato", totals))
+        else:
+            rows = _batched_rows(sec, total_meals, batches)
+        tables.append({"title": sec["title"], "columns": BULK_COLUMNS, "rows": rows, "clip": 20})
+
+    # per-unit exact, totals rounded up: each column formatted in one pass
+    rows = [row for table in tables for row in table["rows"]]
+    qty_col = fmt_qty_array([row[1] for row in rows])
+    total_col = fmt_int_up_array([row[3] for row in rows])
+    for row, qty, total in zip(rows, qty_col, total_col):
+        row[1], row[3] = qty, total
+    return tables
+
+
+def draw_bulk_section(pdf, meal_totals, xpos, col_w, ch, pad, bottom, start_y=None, header_date=None, tables=None):
     title1 = "Bulk Raw Ingredients to Cook"
     if start_y is None:
         pdf.add_page()
@@ -125,141 +154,30 @@ def draw_bulk_section(pdf, meal_totals, xpos, col_w, ch, pad, bottom, start_y=No
                 col = 0
         return heights, col
 
-    def table_headers(x):
+    def table_headers(x, cols):
         pdf.set_x(x)
         pdf.set_font("Arial", "B", 8)
-        for h, w in [("Ingredient", 0.4), ("Qty/Meal", 0.15), ("Meals", 0.15), ("Total", 0.15), ("Batches", 0.15)]:
+        for h, w in cols:
             pdf.cell(col_w * w, ch, h, 1)
         pdf.ln(ch)
         pdf.set_font("Arial", "", 8)
 
-    for sec in bulk_sections:
-        # Custom Rice Tray rendering
-        if sec.get("custom_type") == "rice_trays":
-            # rows: title + headers + 3 lines (Rice, Water, Tray Setup)
-            block_h = (2 + 3) * ch + pad
-            heights, col = ensure_space(heights, block_h, title1)
-            x, y = xpos[col], heights[col]
-            pdf.set_xy(x, y)
-            pdf.set_font("Arial", "B", 11)
-            pdf.set_fill_color(230, 230, 230)
-            pdf.cell(col_w, ch, sec["title"], ln=1, fill=True)
-
-            table_headers(x)
-
-            total_meals = sum(int(meal_totals.get(m.upper(), 0) or 0) for m in sec.get("meals", []))
-
-            rice_per_meal = float(sec.get("rice_per_meal", 0) or 0)
-            rice_per_tray = float(sec.get("rice_per_tray", 2000) or 2000)
-            water_per_tray = float(sec.get("water_per_tray", 3000) or 3000)
-
-            total_rice = rice_per_meal * total_meals
-            trays = math.ceil(total_rice / rice_per_tray) if total_rice > 0 else 0
-            rice_per_actual_tray = total_rice / trays if trays else 0
-            total_water = trays * water_per_tray if trays else 0
-
-            def rice_row(label, qty_per, meals_display, total_display, batch_display=""):
-                pdf.set_x(x)
-                pdf.cell(col_w * 0.4, ch, str(label)[:20], 1)
-                pdf.cell(col_w * 0.15, ch, fmt_qty(qty_per), 1)
-                pdf.cell(col_w * 0.15, ch, str(meals_display), 1)
-                pdf.cell(col_w * 0.15, ch, fmt_int_up(total_display), 1)
-                pdf.cell(col_w * 0.15, ch, str(batch_display), 1)
-                pdf.ln(ch)
-
-            rice_row("Rice", rice_per_meal, total_meals, rice_per_actual_tray, trays)
-            rice_row("Water", water_per_tray, trays, total_water, "")
-            rice_row("Tray Setup", rice_per_tray, trays, total_rice, "")
-
-            heights[col] = pdf.get_y() + pad
-            continue
-
-        # Custom Sweet Potato Mash rendering
-        if sec.get("custom_type") == "sweet_potato_split":
-            # rows: title + headers + 3 lines (Sweet Potato, Salt, White Pepper)
-            block_h = (2 + 3) * ch + pad
-            heights, col = ensure_space(heights, block_h, title1)
-            x, y = xpos[col], heights[col]
-            pdf.set_xy(x, y)
-            pdf.set_font("Arial", "B", 11)
-            pdf.set_fill_color(230, 230, 230)
-            pdf.cell(col_w, ch, sec["title"], ln=1, fill=True)
-
-            table_headers(x)
-
-            # Hidden correct total potato grams from per-meal values per meal
-            total_potato = 0
-            for meal_name, per_meal in sec["meals"].items():
-                n = int(meal_totals.get(meal_name.upper(), 0) or 0)
-                total_potato += (per_meal or 0) * n
-
-            # Allocate total_potato by recipe ratios (200 / 1 / 0.5)
-            sweet_qty = 200.0
-            salt_qty = float(sec.get("seasoning_per_200", {}).get("Salt", 0) or 0)
-            pep_qty = float(sec.get("seasoning_per_200", {}).get("White Pepper", 0) or 0)
-            denom = sweet_qty + salt_qty + pep_qty
-
-            def pct(v):
-                return (v / denom) if denom else 0.0
-
-            def ratio_row(label, qty, pct_val, total_alloc):
-                pdf.set_x(x)
-                pdf.cell(col_w * 0.4, ch, str(label)[:20], 1)
-                pdf.cell(col_w * 0.15, ch, fmt_qty(qty), 1)
-                pdf.cell(col_w * 0.15, ch, f"{pct_val * 100:.1f}%", 1)
-                pdf.cell(col_w * 0.15, ch, fmt_int_up(total_alloc), 1)
-                pdf.cell(col_w * 0.15, ch, "", 1)
-                pdf.ln(ch)
-
-            ratio_row("Sweet Potato", sweet_qty, pct(sweet_qty), total_potato * pct(sweet_qty))
-            ratio_row("Salt", salt_qty, pct(salt_qty), total_potato * pct(salt_qty))
-            ratio_row("White Pepper", pep_qty, pct(pep_qty), total_potato * pct(pep_qty))
-
-            heights[col] = pdf.get_y() + pad
-            continue
-        ingredients = sec.get("ingredients", {})
-        hide = set(sec.get("hide_ingredients", []))
-        fold_into = sec.get("fold_hidden_into")
-
-        # Determine number of visible ingredient lines
-        visible_ings = []
-        for ingr, per in ingredients.items():
-            if ingr in hide:
-                continue
-            visible_ings.append((ingr, per))
-
-        # fold hidden into a single ingredient (e.g. Premixed Chicken)
-        if fold_into and fold_into in ingredients:
-            hidden_sum = sum(v for k, v in ingredients.items() if k in hide)
-            # override displayed per-unit for the folded ingredient to include hidden weights
-            visible_ings = [
-                (fold_into, ingredients[fold_into] + hidden_sum)
-            ] + [(k, v) for k, v in visible_ings if k != fold_into]
-
-        block_h = (len(visible_ings) + 2) * ch + pad
+    for table in tables if tables is not None else calc_bulk_tables(meal_totals):
+        # rows: title + headers + ingredient lines
+        block_h = (len(table["rows"]) + 2) * ch + pad
         heights, col = ensure_space(heights, block_h, title1)
         x, y = xpos[col], heights[col]
         pdf.set_xy(x, y)
         pdf.set_font("Arial", "B", 11)
         pdf.set_fill_color(230, 230, 230)
-        pdf.cell(col_w, ch, sec['title'], ln=1, fill=True)
-
-        table_headers(x)
-
-        total_meals = sum(int(meal_totals.get(m.upper(), 0) or 0) for m in sec.get('meals', []))
-        batches = math.ceil(total_meals / sec.get('batch_size', 0)) if sec.get('batch_size', 0) > 0 else 0
+        pdf.cell(col_w, ch, table["title"], ln=1, fill=True)
 
-        for ingr, per in visible_ings:
-            qty = per * total_meals
-            adj = (qty / batches) if batches else qty
-            lbl = str(batches) if ingr == sec.get('batch_ingredient') else ""
+        table_headers(x, table["columns"])
 
+        for row in table["rows"]:
             pdf.set_x(x)
-            pdf.cell(col_w * 0.4, ch, str(ingr)[:20], 1)
-            pdf.cell(col_w * 0.15, ch, fmt_qty(per), 1)  # per-unit exact
-            pdf.cell(col_w * 0.15, ch, str(total_meals), 1)
-            pdf.cell(col_w * 0.15, ch, fmt_int_up(adj), 1)  # totals rounded
-            pdf.cell(col_w * 0.15, ch, lbl, 1)
+            for i, (value, (_label, w)) in enumerate(zip(row, table["columns"])):
+                pdf.cell(col_w * w, ch, value[:table["clip"]] if i == 0 else value, 1)
             pdf.ln(ch)
 
         heights[col] = pdf.get_y() + pad
@@ -1,6 +1,10 @@
 import math
 
 from utils import fmt_int_up, fmt_weight
+from recipe_book import load_recipe_book
+
+# Same mixes as the Pre-Pack Room "Chicken to Mix" group
+CHICKEN_MIXES = load_recipe_book()["prepack_room"]["chicken_mixes"]
 
 def draw_chicken_mixing_section(pdf, meal_totals, xpos, col_w, ch, pad, bottom, start_y=None):
     """
@@ -17,14 +21,6 @@ def draw_chicken_mixing_section(pdf, meal_totals, xpos, col_w, ch, pad, bottom,
     heights = [pdf.get_y(), pdf.get_y()]
     col = 0
 
-    mixes = [
-        ("Pesto", [("Chicken", 107), ("Sauce", 80)], "CHICKEN PESTO PASTA", 50, 1),
-        ("Butter Chicken", [("Chicken", 123), ("Sauce", 90)], "BUTTER CHICKEN", 50, 2),
-        ("Broccoli Pasta", [("Chicken", 102), ("Sauce", 100)], "CHICKEN AND BROCCOLI PASTA", 50, 1),
-        ("Thai", [("Chicken", 115.36), ("Sauce", 92.7)], "THAI GREEN CHICKEN CURRY", 50, 1),
-        ("Gnocchi", [("Gnocchi", 147), ("Chicken", 80), ("Sauce", 200), ("Spinach", 25)], "CREAMY CHICKEN & MUSHROOM GNOCCHI", 36, 1),
-    ]
-
     def next_pos(heights, col, block_h):
         # balance columns first
         col = 0 if heights[0] <= heights[1] else 1
@@ -44,7 +40,9 @@ def draw_chicken_mixing_section(pdf, meal_totals, xpos, col_w, ch, pad, bottom,
 
         return heights, col
 
-    for name, ingredients, meal_key, divisor, extra in mixes:
+    for mix in CHICKEN_MIXES:
+        name, ingredients, meal_key = mix["name"], mix["ingredients"], mix["meal"]
+        divisor, extra = mix["divisor"], mix.get("extra", 0)
         block_h = (2 + len(ingredients)) * ch + pad
         heights, col = next_pos(heights, col, block_h)
 
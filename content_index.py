@@ -0,0 +1,201 @@
+"""Index of the quantities inside archived daily reports.
+
+Every paired summary CSV (reports/data) becomes long rows of
+(report, date, product, column, qty), where column is a brand, "Already
+Made" or "Total". CONTENT_INDEX is shared by every session and kept in step
+with the report listing by `sync`: only reports it has not seen are fetched,
+and deleted ones are dropped, so a query never reads the CSVs again.
+
+Queries are masks over the one consolidated frame:
+
+    CONTENT_INDEX.query(product="Butter Chicken", column="Total", op=">", value=100)
+    CONTENT_INDEX.query(**parse_query("Lamb Souvlaki in August", products, columns))
+"""
+import calendar
+import operator
+import re
+import threading
+from datetime import date
+
+import pandas as pd
+
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+ROW_COLUMNS = ["report", "date", "product", "column", "qty"]
+
+_MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+_MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_abbr) if name})
+
+_COMPARISON = re.compile(r"(>=|<=|!=|==|>|<|=)\s*(\d+)")
+_ISO_DATE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+_IN_MONTH = re.compile(r"\bin\s+([a-z]+)(?:\s+(\d{4}))?\b")
+
+
+def report_rows(name, day, df) -> pd.DataFrame:
+    """Long rows of one report's summary frame, zero quantities included."""
+    value_cols = [c for c in df.columns if c != "Product name"]
+    rows = df.melt(id_vars="Product name", value_vars=value_cols, var_name="column", value_name="qty")
+    rows["qty"] = pd.to_numeric(rows["qty"], errors="coerce").fillna(0).astype(int)
+    rows = rows.rename(columns={"Product name": "product"})
+    rows["product"] = rows["product"].astype(str).str.strip()
+    rows.insert(0, "report", name)
+    rows.insert(1, "date", pd.Timestamp(day) if day else pd.NaT)
+    return rows[ROW_COLUMNS]
+
+
+class ContentIndex:
+    """Long rows of every indexed report, consolidated on first query after a change."""
+
+    def __init__(self):
+        self._rows = {}
+        self._missing = set()
+        self._frame = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def missing(self) -> set:
+        """Reports whose CSV was missing (retried on `sync(..., retry_missing=True)`)."""
+        return set(self._missing)
+
+    def sync(self, records, load_frames, retry_missing=False) -> int:
+        """Index the daily `records` not indexed yet, drop the ones no longer listed.
+
+        `load_frames(records)` returns ([(report name, summary_df)], [missing
+        csv names]). Returns how many reports were added.
+        """
+        with self._lock:
+            listed = {r["name"]: r for r in records if r.get("csv_path")}
+            if retry_missing:
+                self._missing.clear()
+            gone = [n for n in self._rows if n not in listed]
+            todo = [r for n, r in listed.items() if n not in self._rows and n not in self._missing]
+            for n in gone:
+                del self._rows[n]
+            self._missing &= set(listed)
+
+            added = 0
+            if todo:
+                frames, _ = load_frames(todo)
+                for name, df in frames:
+                    self._rows[name] = report_rows(name, listed[name]["date"], df)
+                    added += 1
+                loaded = {name for name, _ in frames}
+                self._missing.update(r["name"] for r in todo if r["name"] not in loaded)
+            if gone or added:
+                self._frame = None
+            return added
+
+    def frame(self) -> pd.DataFrame:
+        with self._lock:
+            if self._frame is None:
+                parts = [rows for rows in self._rows.values() if not rows.empty]
+                frame = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=ROW_COLUMNS)
+                frame["date"] = pd.to_datetime(frame["date"])
+                frame["qty"] = frame["qty"].astype(int)
+                frame["product"] = frame["product"].astype("category")
+                frame["column"] = frame["column"].astype("category")
+                self._frame = frame
+            return self._frame
+
+    def products(self) -> list:
+        return sorted(self.frame()["product"].unique())
+
+    def columns(self) -> list:
+        return sorted(self.frame()["column"].unique())
+
+    def query(self, product=None, column="Total", op=None, value=None, start=None, end=None) -> pd.DataFrame:
+        """Rows matching every given filter, newest first.
+
+        `product` and `column` match case-insensitively; `op`/`value` compare
+        the quantity, and without them only days the product was ordered
+        (qty > 0) match. A product listed in a report's CSV has a row even at
+        0, so an explicit "= 0" finds the days it was not ordered.
+        `start`/`end` bound the report date (inclusive).
+        """
+        frame = self.frame()
+        mask = pd.Series(True, index=frame.index)
+        if product:
+            mask &= frame["product"].str.lower() == product.lower()
+        if column:
+            mask &= frame["column"].str.lower() == column.lower()
+        if op is not None and value is not None:
+            mask &= OPERATORS[op](frame["qty"], value)
+        else:
+            mask &= frame["qty"] > 0
+        if start is not None:
+            mask &= frame["date"] >= pd.Timestamp(start)
+        if end is not None:
+            mask &= frame["date"] <= pd.Timestamp(end)
+        return frame[mask].sort_values(["date", "report"], ascending=False).reset_index(drop=True)
+
+
+CONTENT_INDEX = ContentIndex()
+
+
+def _longest_match(text, names):
+    found = [n for n in names if n.lower() in text]
+    return max(found, key=len) if found else None
+
+
+def _month_range(month, year=None, today=None):
+    # Without a year: the latest such month that has started
+    today = today or date.today()
+    if year is None:
+        year = today.year if month <= today.month else today.year - 1
+    start = date(year, month, 1)
+    return start, date(year, month, calendar.monthrange(year, month)[1])
+
+
+def parse_query(text, products, columns, today=None):
+    """Query filters (keyword arguments of ContentIndex.query) for a search text, None if it names no product.
+
+    Understands a product name, optionally a brand / "total" / "already
+    made", a comparison ("> 100", "<= 5", "= 0"), and a date: "in August",
+    "in Aug 2025", one yyyy-mm-dd day or two (a range).
+    """
+    text = " ".join(text.lower().split())
+    product = _longest_match(text, products)
+    if product is None:
+        return None
+    rest = text.replace(product.lower(), " ")
+    query = {"product": product, "column": _longest_match(rest, columns) or "Total"}
+
+    comparison = _COMPARISON.search(rest)
+    if comparison:
+        query["op"], query["value"] = comparison.group(1), int(comparison.group(2))
+
+    days = []
+    for y, m, d in _ISO_DATE.findall(rest):
+        try:
+            days.append(date(int(y), int(m), int(d)))
+        except ValueError:
+            pass
+    if days:
+        query["start"], query["end"] = min(days), max(days)
+    else:
+        in_month = _IN_MONTH.search(rest)
+        if in_month and in_month.group(1) in _MONTHS:
+            year = int(in_month.group(2)) if in_month.group(2) else None
+            query["start"], query["end"] = _month_range(_MONTHS[in_month.group(1)], year, today)
+    return query
+
+
+def describe_query(query) -> str:
+    """Short label of parsed filters, e.g. "Butter Chicken · Total > 100 · 01/08/2025 - 31/08/2025"."""
+    parts = [query["product"], query["column"]]
+    if query.get("op"):
+        parts[-1] += f" {query['op']} {query['value']}"
+    if query.get("start"):
+        parts.append(f"{query['start'].strftime('%d/%m/%Y')} - {query['end'].strftime('%d/%m/%Y')}")
+    return " · ".join(parts)
@@ -1,5 +1,8 @@
 import math
 from utils import fmt_int_up, fmt_weight
+from recipe_book import load_recipe_book
+
+FRIDGE = load_recipe_book()["fridge"]
 
 def draw_fridge_section(pdf, meal_totals, xpos, col_w, ch, pad, bottom, start_y=None):
     left_x = xpos[0]
@@ -24,16 +27,9 @@ def draw_fridge_section(pdf, meal_totals, xpos, col_w, ch, pad, bottom, start_y=
     pdf.ln(ch)
 
     pdf.set_font("Arial", "", 8)
-    sauces = [
-        ("MONGOLIAN", 70, "MONGOLIAN BEEF"),
-        ("MEATBALLS", 120, "BEEF MEATBALLS"),
-        ("LEMON", 50, "ROASTED LEMON CHICKEN & POTATOES"),
-        ("MUSHROOM", 100, "STEAK WITH MUSHROOM SAUCE"),
-        ("FAJITA SAUCE", 33, "CHICKEN FAJITA BOWL"),
-        ("BURRITO SAUCE", 43, "BEEF BURRITO BOWL"),
-    ]
-    for sauce, qty, meal_key in sauces:
-        amt = meal_totals.get(meal_key.upper(), 0)
+    for item in FRIDGE["sauces"]:
+        sauce, qty = item["name"], item["qty"]
+        amt = meal_totals.get(item["meal"].upper(), 0)
         total = qty * amt
         pdf.set_x(left_x)
         pdf.cell(col_w * 0.4, ch, sauce, 1)
@@ -56,10 +52,11 @@ def draw_fridge_section(pdf, meal_totals, xpos, col_w, ch, pad, bottom, start_y=
     pdf.ln(ch)
 
     pdf.set_font("Arial", "", 8)
-    amt = meal_totals.get("BEEF BURRITO BOWL", 0)
-    batches = math.ceil(amt / 60) if amt else 1
+    burrito_mix = FRIDGE["burrito_mix"]
+    amt = meal_totals.get(burrito_mix["meal"].upper(), 0)
+    batches = math.ceil(amt / burrito_mix["batch_size"]) if amt else 1
 
-    for ing, qty in [("Salsa", 43), ("Black Beans", 50), ("Corn", 50), ("Rice", 130)]:
+    for ing, qty in burrito_mix["ingredients"]:
         total = qty * amt
         total_per_batch = math.ceil(total / batches) if batches else total
         pdf.set_x(right_x)
@@ -85,9 +82,9 @@ def draw_fridge_section(pdf, meal_totals, xpos, col_w, ch, pad, bottom, start_y=
     pdf.ln(ch)
 
     pdf.set_font("Arial", "", 8)
-    parma_amt = meal_totals.get("NAKED CHICKEN PARMA", 0)
+    parma_amt = meal_totals.get(FRIDGE["parma_mix"]["meal"].upper(), 0)
 
-    for ing, qty in [("Napoli Sauce", 50), ("Mozzarella Cheese", 40)]:
+    for ing, qty in FRIDGE["parma_mix"]["ingredients"]:
         total = qty * parma_amt
         pdf.set_x(left_x)
         pdf.cell(col_w * 0.4, ch, ing, 1)
@@ -112,12 +109,13 @@ def draw_fridge_section(pdf, meal_totals, xpos, col_w, ch, pad, bottom, start_y=
     pdf.ln(ch)
 
     pdf.set_font("Arial", "", 8)
-    pesto_meals = meal_totals.get("CHICKEN PESTO PASTA", 0)
-    sundried_qty = 24
+    pesto = FRIDGE["pesto_sundried"]
+    pesto_meals = meal_totals.get(pesto["meal"].upper(), 0)
+    sundried_qty = pesto["qty"]
     sundried_total = sundried_qty * pesto_meals
 
     pdf.set_x(left_x)
-    pdf.cell(col_w * 0.4, ch, "Sundried Tomatos", 1)
+    pdf.cell(col_w * 0.4, ch, pesto["ingredient"], 1)
     pdf.cell(col_w * 0.2, ch, fmt_int_up(sundried_qty), 1)
     pdf.cell(col_w * 0.2, ch, str(int(pesto_meals)), 1)
     pdf.cell(col_w * 0.2, ch, fmt_int_up(sundried_total), 1)
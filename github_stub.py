@@ -0,0 +1,215 @@
+"""In-memory stand-in for the GitHub endpoints app.py uses (for load tests).
+
+One local HTTP server answers both hosts the app talks to, so point
+GITHUB_API_URL and GITHUB_RAW_URL at `stub.url`:
+
+- GET    /repos/{owner}/{repo}/contents/{path}  folder listing or file (base64)
+- PUT    /repos/{owner}/{repo}/contents/{path}  create / update (sha required to update)
+- DELETE /repos/{owner}/{repo}/contents/{path}  delete (sha required)
+- GET    /{owner}/{repo}/{branch}/{path}        raw file, like raw.githubusercontent.com
+- git data API, enough for a commit of several files: GET git/ref/heads/{branch},
+  GET git/commits/{sha}, POST git/trees (inline "content" entries on a
+  base_tree), POST git/commits, PATCH git/refs/heads/{branch}
+
+API responses carry X-RateLimit-Remaining, counting down from `rate_limit`
+(403 once it is spent). `latency` seconds are slept before every answer to
+stand in for the network round trip.
+"""
+import base64
+import hashlib
+import json
+import posixpath
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+
+def blob_sha(data: bytes) -> str:
+    """Git blob sha of `data`, like the contents API reports."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class GitHubStub:
+    def __init__(self, repo="owner/repo", branch="main", latency=0.0, rate_limit=5000, host="127.0.0.1", port=0):
+        self.repo, self.branch, self.latency = repo, branch, latency
+        self.files = {}
+        self.rate_limit_remaining = rate_limit
+        # (method, status) -> count
+        self.calls = {}
+        # git data: sha -> {path: bytes} (trees: changes on top of the branch files) / {"tree", "parents", "message"}
+        self.trees, self.commits = {}, {}
+        self.head = blob_sha(b"initial commit")
+        self.commits[self.head] = {"tree": None, "parents": [], "message": "initial commit"}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "GitHubStub":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="github-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def seed(self, path, data: bytes):
+        with self._lock:
+            self.files[path] = data
+
+    # ----- request handling -----
+    def _entry(self, path, data=None):
+        name = posixpath.basename(path)
+        entry = {"name": name, "path": path, "type": "file" if data is not None else "dir"}
+        if data is not None:
+            entry.update(sha=blob_sha(data), size=len(data),
+                         download_url=f"{self.url}/{self.repo}/{self.branch}/{path}")
+        return entry
+
+    def _listing(self, folder):
+        prefix = folder.rstrip("/") + "/"
+        files, dirs = [], set()
+        for path, data in self.files.items():
+            if not path.startswith(prefix):
+                continue
+            rest = path[len(prefix):]
+            if "/" in rest:
+                dirs.add(prefix + rest.split("/", 1)[0])
+            else:
+                files.append(self._entry(path, data))
+        if not files and not dirs:
+            return None
+        return sorted([self._entry(d) for d in dirs] + files, key=lambda e: e["name"])
+
+    def contents(self, method, path, body):
+        """(status, JSON payload) for a contents API request."""
+        with self._lock:
+            data = self.files.get(path)
+            if method == "GET":
+                if data is not None:
+                    entry = self._entry(path, data)
+                    entry.update(content=base64.b64encode(data).decode(), encoding="base64")
+                    return 200, entry
+                listing = self._listing(path)
+                return (200, listing) if listing is not None else (404, {"message": "Not Found"})
+            if method == "PUT":
+                if data is not None and body.get("sha") != blob_sha(data):
+                    return (409 if body.get("sha") else 422), {"message": "sha does not match"}
+                new = base64.b64decode(body.get("content", ""))
+                self.files[path] = new
+                return (200 if data is not None else 201), {"content": self._entry(path, new)}
+            if method == "DELETE":
+                if data is None:
+                    return 404, {"message": "Not Found"}
+                if body.get("sha") != blob_sha(data):
+                    return 409, {"message": "sha does not match"}
+                del self.files[path]
+                return 200, {"content": None}
+        return 405, {"message": "Method Not Allowed"}
+
+    def git(self, method, path, body):
+        """(status, JSON payload) for a git data API request."""
+        with self._lock:
+            if method == "GET" and path == f"ref/heads/{self.branch}":
+                return 200, {"ref": f"refs/heads/{self.branch}", "object": {"sha": self.head, "type": "commit"}}
+            if method == "GET" and path.startswith("commits/"):
+                commit = self.commits.get(path[len("commits/"):])
+                if commit is None:
+                    return 404, {"message": "Not Found"}
+                return 200, {"sha": path[len("commits/"):], "tree": {"sha": commit["tree"] or "base"},
+                             "message": commit["message"]}
+            if method == "POST" and path == "trees":
+                changes = {e["path"]: e.get("content", "").encode("utf-8") for e in body.get("tree", [])}
+                sha = blob_sha(json.dumps([body.get("base_tree"), sorted(changes)]).encode() + b"".join(changes.values()))
+                self.trees[sha] = changes
+                return 201, {"sha": sha}
+            if method == "POST" and path == "commits":
+                if body.get("tree") not in self.trees:
+                    return 422, {"message": "tree not found"}
+                sha = blob_sha(json.dumps(body, sort_keys=True).encode())
+                self.commits[sha] = {"tree": body["tree"], "parents": body.get("parents", []),
+                                     "message": body.get("message", "")}
+                return 201, {"sha": sha}
+            if method == "PATCH" and path == f"refs/heads/{self.branch}":
+                commit = self.commits.get(body.get("sha"))
+                if commit is None:
+                    return 422, {"message": "commit not found"}
+                if self.head not in commit["parents"]:
+                    return 422, {"message": "Update is not a fast forward"}
+                self.files.update(self.trees[commit["tree"]])
+                self.head = body["sha"]
+                return 200, {"object": {"sha": self.head}}
+        return 404, {"message": "Not Found"}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, status, payload, headers=None):
+                body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(body)
+                with stub._lock:
+                    key = (self.command, status)
+                    stub.calls[key] = stub.calls.get(key, 0) + 1
+
+            def _handle(self):
+                if stub.latency:
+                    time.sleep(stub.latency)
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                path = unquote(urlsplit(self.path).path)
+
+                api_prefix = f"/repos/{stub.repo}/contents/"
+                git_prefix = f"/repos/{stub.repo}/git/"
+                if path.startswith(api_prefix) or path.startswith(git_prefix):
+                    with stub._lock:
+                        if stub.rate_limit_remaining <= 0:
+                            status, payload = 403, {"message": "API rate limit exceeded"}
+                        else:
+                            stub.rate_limit_remaining -= 1
+                            status, payload = None, None
+                        remaining = stub.rate_limit_remaining
+                    if status is None:
+                        try:
+                            body = json.loads(raw) if raw else {}
+                        except ValueError:
+                            body = {}
+                        if path.startswith(git_prefix):
+                            status, payload = stub.git(self.command, path[len(git_prefix):].strip("/"), body)
+                        else:
+                            status, payload = stub.contents(self.command, path[len(api_prefix):].strip("/"), body)
+                    self._send(status, payload, {"Content-Type": "application/json",
+                                                 "X-RateLimit-Remaining": str(remaining)})
+                    return
+
+                raw_prefix = f"/{stub.repo}/{stub.branch}/"
+                if self.command == "GET" and path.startswith(raw_prefix):
+                    with stub._lock:
+                        data = stub.files.get(path[len(raw_prefix):])
+                    if data is not None:
+                        self._send(200, data, {"Content-Type": "text/plain; charset=utf-8"})
+                    else:
+                        self._send(404, b"404: Not Found")
+                    return
+                self._send(404, {"message": "Not Found"})
+
+            do_GET = do_PUT = do_DELETE = do_POST = do_PATCH = _handle
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,38 @@
+import re
+
+from recipe_book import UNIT_GRAMS, load_recipe_book
+
+# --- CANONICAL INGREDIENTS ---
+# One entry per purchasable item, from the recipe book's "ingredients".
+# Recipe and bulk data keep their own spelling (it is what gets printed);
+# every spelling listed in "aliases" resolves here. "unit" is the purchase
+# unit, "category" the prep station that handles it.
+INGREDIENTS = load_recipe_book()["ingredients"]
+
+
+def _slug(name) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", str(name).lower()).strip("_")
+
+
+# Every known spelling (case-insensitive) -> canonical id
+_ALIASES = {}
+for _cid, _info in INGREDIENTS.items():
+    for _spelling in [_info["name"], *_info["aliases"]]:
+        _ALIASES[_spelling.lower()] = _cid
+
+
+def resolve(name) -> str:
+    """Canonical id for an ingredient name as written in the recipe data.
+
+    Unknown names resolve to a slug of themselves, so new ingredients still
+    aggregate (just without merging spellings) until they are registered.
+    """
+    return _ALIASES.get(str(name).strip().lower()) or _slug(name)
+
+
+def ingredient_info(cid) -> dict:
+    """Registry entry for a canonical id (unregistered ids get a generic entry)."""
+    info = INGREDIENTS.get(cid)
+    if info is None:
+        return {"name": cid.replace("_", " ").title(), "aliases": [], "unit": "kg", "category": "other"}
+    return info
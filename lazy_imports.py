@@ -0,0 +1,63 @@
+"""Modules loaded on first use, with an import-time profile.
+
+app.py runs top to bottom on every rerun, but most sessions start on the
+upload page or only browse history, which need neither pandas nor the report
+sections (whose recipe tables are built when they are imported). Binding
+such a module with `lazy_module` defers the import to the first attribute
+access, and records how long it took in IMPORT_PROFILE (per process, like
+the imports themselves).
+"""
+import importlib
+import sys
+import time
+
+# First import of each lazy module in this process, in load order:
+# {"module", "seconds" (including everything it imported), "new_modules"}
+IMPORT_PROFILE = []
+
+# name -> LazyModule, every module bound with lazy_module
+LAZY_MODULES = {}
+
+
+def profiled_import(name):
+    """Import `name`, recording the time taken if this is its first import."""
+    if name in sys.modules:
+        # may still be initialising in another session's thread: import_module
+        # waits for that import to finish instead of returning a partial module
+        return importlib.import_module(name)
+    before = len(sys.modules)
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    IMPORT_PROFILE.append({
+        "module": name,
+        "seconds": time.perf_counter() - start,
+        "new_modules": len(sys.modules) - before,
+    })
+    return module
+
+
+class LazyModule:
+    """Stand-in for a module that imports it on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None or self._name in sys.modules
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = profiled_import(self._name)
+        return getattr(self._module, attr)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_module(name) -> LazyModule:
+    if name not in LAZY_MODULES:
+        LAZY_MODULES[name] = LazyModule(name)
+    return LAZY_MODULES[name]
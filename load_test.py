@@ -0,0 +1,230 @@
+"""Load test: N simulated supervisor sessions against a local GitHub stub.
+
+Every session runs the real app (Streamlit's AppTest) through the morning
+workflow:
+
+- upload: three brand order files (random quantities)
+- edit: tick a bulk toggle and open the live preview
+- generate: build and save the daily report (PDF + CSV to the stub); a
+  failed upload counts as an error even though the app doesn't show it
+- history: open Document History
+- weekly: pick this week's daily reports and generate the weekly summary
+
+Usage:
+
+    python load_test.py --sessions 20 --concurrency 5 --latency-ms 80
+
+Prints throughput, latency percentiles and error rates per step, and the
+stub's request counts by method and status (--json writes them to a file).
+
+AppTest swaps process-wide Streamlit state on every run, so concurrent
+sessions run in `--concurrency` worker processes, all against the one stub.
+A Streamlit server runs every session in one process, so compare with a
+`--concurrency 1` run: its per-step latencies are the CPU cost one session
+adds to that process.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+from github_stub import GitHubStub
+from recipe_book import load_recipe_book
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+BRAND_UPLOADS = {"clean_eats": "Clean Eats", "made_active": "Made Active", "elite_meals": "Elite Meals"}
+STEPS = ("upload", "edit", "generate", "history", "weekly")
+
+
+def order_csv(rng, meals) -> bytes:
+    lines = ["Product name,Quantity"]
+    lines += [f'"{meal}",{rng.randint(0, 120)}' for meal in meals if rng.random() < 0.8]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def seed_history(stub, days, rng, meals):
+    """Archived daily reports (PDF placeholder + summary CSV) for the `days` before today."""
+    for d in range(1, days + 1):
+        day = date.today() - timedelta(days=d)
+        base = f"daily_production_report_{day.isoformat()}_06-00-00"
+        rows = ["Product name,Clean Eats,Already Made,Total"]
+        for meal in meals:
+            qty = rng.randint(0, 120)
+            rows.append(f'"{meal}",{qty},0,{qty}')
+        stub.seed(f"reports/{base}.pdf", b"%PDF-1.3 placeholder")
+        stub.seed(f"reports/data/{base}.csv", ("\n".join(rows) + "\n").encode("utf-8"))
+
+
+def _check(at, step, expect=None):
+    if at.exception:
+        raise RuntimeError(f"{step}: {at.exception[0].value}")
+    errors = [e.value for e in at.error]
+    if errors:
+        raise RuntimeError(f"{step}: {errors[0]}")
+    if expect is not None and not expect(at):
+        warnings = [w.value for w in at.warning]
+        raise RuntimeError(f"{step}: " + (warnings[0] if warnings else "expected result not shown"))
+
+
+def _failed_uploads() -> int:
+    import metrics
+    return sum(v for k, v in metrics.UPLOADS.values.items() if dict(k)["result"] == "failed")
+
+
+def _button(at, label_start):
+    return next(b for b in at.button if b.label.startswith(label_start))
+
+
+def run_session(n, meals, timeout) -> list:
+    """[(step, seconds, error or None)] for one simulated session (stops at the first failed step)."""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(n)
+    results = []
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.secrets["GITHUB_TOKEN"] = "load-test"
+
+    def upload():
+        at.run()
+        for key in BRAND_UPLOADS:
+            at.file_uploader(key=key).set_value((f"{key}_{n}.csv", order_csv(rng, meals), "text/csv"))
+        at.run()
+        _check(at, "upload", lambda a: any(b.label.startswith("Generate & Save Production") for b in a.button))
+
+    def edit():
+        at.checkbox(key=f"bulk_{rng.choice(['Spaghetti Bolognese', 'Beef Chow Mein'])}").check().run()
+        at.toggle(key="live_preview").set_value(True).run()
+        _check(at, "edit")
+
+    def generate():
+        # the app doesn't report a failed CSV push, so count failures in its metrics
+        failed_before = _failed_uploads()
+        _button(at, "Generate & Save Production").click().run()
+        _check(at, "generate", lambda a: any(e.label == "Performance" for e in a.expander))
+        if _failed_uploads() > failed_before:
+            raise RuntimeError("generate: upload to GitHub failed (not shown in the app)")
+
+    def history():
+        at.session_state["main_tabs"] = "📄 Document History"
+        at.run()
+        _check(at, "history", lambda a: len(a.get("link_button")) > 0)
+
+    def weekly():
+        at.session_state["main_tabs"] = "📆 Weekly Summary"
+        at.run()
+        choice = at.multiselect(key="weekly_existing_choice")
+        choice.set_value(choice.options[:5]).run()
+        _button(at, "Generate & Save Weekly Summary PDF (from selected").click().run()
+        _check(at, "weekly", lambda a: len(a.success) > 0)
+
+    for step, fn in zip(STEPS, (upload, edit, generate, history, weekly)):
+        start = time.perf_counter()
+        try:
+            fn()
+            results.append((step, time.perf_counter() - start, None))
+        except Exception as e:
+            msg = str(e) or traceback.format_exception_only(type(e), e)[-1].strip()
+            results.append((step, time.perf_counter() - start, msg))
+            break
+    return results
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+def summarize(results, wall) -> dict:
+    steps = {}
+    for session in results:
+        for step, seconds, error in session:
+            row = steps.setdefault(step, {"seconds": [], "errors": []})
+            row["seconds"].append(seconds)
+            if error:
+                row["errors"].append(error)
+    completed = sum(1 for session in results if len(session) == len(STEPS) and not session[-1][2])
+    summary = {
+        "sessions": len(results),
+        "completed": completed,
+        "wall_seconds": round(wall, 3),
+        "sessions_per_second": round(completed / wall, 3) if wall else 0,
+        "steps_per_second": round(sum(len(s) for s in results) / wall, 3) if wall else 0,
+        "steps": {},
+    }
+    for step in STEPS:
+        if step not in steps:
+            continue
+        seconds, errors = steps[step]["seconds"], steps[step]["errors"]
+        summary["steps"][step] = {
+            "count": len(seconds),
+            "error_rate": round(len(errors) / len(seconds), 4),
+            **{f"p{p}_ms": round(percentile(seconds, p) * 1000, 1) for p in (50, 90, 99)},
+            "max_ms": round(max(seconds) * 1000, 1),
+            "errors": sorted(set(errors))[:5],
+        }
+    return summary
+
+
+def print_summary(summary, stub_calls):
+    print(
+        f"{summary['completed']}/{summary['sessions']} sessions completed in {summary['wall_seconds']:.1f} s "
+        f"({summary['sessions_per_second']:.2f} sessions/s, {summary['steps_per_second']:.2f} steps/s)"
+    )
+    print(f"{'step':<10}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for step, row in summary["steps"].items():
+        print(
+            f"{step:<10}{row['count']:>7}{row['error_rate']:>8.1%}"
+            f"{row['p50_ms']:>10.0f}{row['p90_ms']:>10.0f}{row['p99_ms']:>10.0f}{row['max_ms']:>10.0f}"
+        )
+        for error in row["errors"]:
+            print(f"    ! {error}")
+    print("GitHub stub requests: " + ", ".join(f"{m} {s}: {c}" for (m, s), c in sorted(stub_calls.items())))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=10, help="simulated sessions in total")
+    parser.add_argument("--concurrency", type=int, default=5, help="sessions running at the same time")
+    parser.add_argument("--latency-ms", type=float, default=50, help="stub GitHub round-trip time")
+    parser.add_argument("--history-days", type=int, default=60, help="archived daily reports to seed")
+    parser.add_argument("--timeout", type=float, default=120, help="per-run timeout of one app rerun (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the summary to this file")
+    args = parser.parse_args(argv)
+
+    stub = GitHubStub(repo="LukeCreativeInd/kitchen_planner_test", latency=args.latency_ms / 1000).start()
+    os.environ["GITHUB_API_URL"] = os.environ["GITHUB_RAW_URL"] = stub.url
+    meals = list(load_recipe_book()["meal_recipes"])
+    seed_history(stub, args.history_days, random.Random(args.seed), meals)
+
+    # Submitted by module name: a session leaves the worker's __main__ set to
+    # the app script, so "__main__.run_session" would not resolve there
+    from load_test import run_session as session
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [
+            pool.submit(session, args.seed * 100000 + n, meals, args.timeout) for n in range(args.sessions)
+        ]
+        results = [f.result() for f in futures]
+    wall = time.perf_counter() - start
+    stub.stop()
+
+    summary = summarize(results, wall)
+    summary["stub_calls"] = {f"{m} {s}": c for (m, s), c in sorted(stub.calls.items())}
+    print_summary(summary, stub.calls)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    return 0 if summary["completed"] == summary["sessions"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,185 @@
-import math
+from functools import lru_cache
+
+import numpy as np
+
 from utils import fmt_int_up
+from recipe_book import load_recipe_book
+from recipe_matrix import matrices_for
+from batch_planner import aligned_to_batches, batch_planner_for
+
+MEAT_VEG = load_recipe_book()["meat_veg"]
+
+# Tables as printed, left to right
+MEAT_VEG_TABLES = ("veg_prep", "meat_order")
+
+VEG_PREP_COLUMNS = [("Veg Prep", 0.7), ("Amount (g)", 0.3)]
+MEAT_ORDER_COLUMNS = [("Meat Type", 0.6), ("Amount (g)", 0.4)]
+
+
+class MeatVegPlan:
+    """Veg Prep / Meat Order lines compiled against the recipe and bulk matrices.
+
+    Every term is resolved to matrix indices (meal row, canonical ingredient
+    column, bulk section) once; `evaluate_days` then derives every line for
+    every day of a days x meals matrix in one traversal, and `evaluate` is the
+    single-day case.
+    """
+
+    def __init__(self, lines, recipe_matrix, bulk_matrix):
+        self.rm, self.bm = recipe_matrix, bulk_matrix
+        self.planner = batch_planner_for(recipe_matrix, bulk_matrix)
+        self.lines = {
+            table: tuple((line["name"], tuple(self._compile(term) for term in line["terms"])) for line in table_lines)
+            for table, table_lines in lines.items()
+        }
+
+    def _compile(self, term):
+        rm, bm = self.rm, self.bm
+        kind = term["type"]
+
+        def cell(recipe, ingredient):
+            i = rm.meal_index.get(recipe.upper())
+            c = rm.canonical_column(ingredient)
+            return None if i is None or c is None else (i, c)
+
+        if kind == "recipe":
+            return kind, cell(term["recipe"], term["ingredient"]), term.get("sub_section", False)
+        if kind == "recipe_batch":
+            rule = self.planner.index.get(("recipe", term["recipe"].upper()))
+            return kind, cell(term["recipe"], term["ingredient"]), rule
+        if kind == "recipes":
+            return kind, tuple(cell(rec, term["ingredient"]) for rec in term["recipes"])
+        if kind == "meals":
+            return kind, tuple(rm.meal_index.get(rec.upper()) for rec in term["recipes"]), term["per_meal"]
+        if kind in ("bulk", "bulk_batch"):
+            title, ingredient = term["bulk"], term["ingredient"]
+            s = bm.section_index.get(title)
+            # Sweet Potato Mash uses meal-specific per-meal grams
+            if kind == "bulk_batch" and (title, "Sweet Potato") in bm.column_index and ingredient == "Sweet Potato":
+                return "bulk_split", title, ingredient
+            return kind, s, (bm.qty(title, ingredient) if s is not None else 0), self.planner.index.get(("bulk", title))
+        if kind == "mix_batch":
+            return kind, term["meal"].upper(), term["per_meal"], self.planner.index[("mix", term["meal"].upper())]
+        raise KeyError(f"Unknown meat/veg term type: {kind}")
+
+    def evaluate_days(self, totals, prepared=None, only=None):
+        """{"veg_prep": (names, amounts), "meat_order": ...} for a days x meals matrix (unrounded).
+
+        `amounts` is days x lines: every line for every day in one pass, with
+        the batch counts of all days planned at once. With `only` (a set of
+        (table, line name) pairs) just those lines are evaluated and returned.
+        """
+        rm, bm = self.rm, self.bm
+        T = np.atleast_2d(np.asarray(totals, dtype=float))
+        # Meals whose recipes are already prepared contribute no recipe amounts
+        T_recipe = T * rm.keep_mask(prepared) if prepared else T
+        section_meals = T @ bm.membership.T
+        plan = self.planner.plan(T)
+        zero = np.zeros(len(T))
+
+        def amount(ic, sub_section=False):
+            if ic is None:
+                return zero
+            i, c = ic
+            return (rm.sub_canonical if sub_section else rm.main_canonical)[i, c] * T_recipe[:, i]
+
+        def batches(rule):
+            return zero if rule is None else plan[:, rule]
+
+        def term_total(term):
+            kind = term[0]
+            if kind == "recipe":
+                return amount(term[1], term[2])
+            if kind == "recipe_batch":
+                return aligned_to_batches(amount(term[1]), batches(term[2]))
+            if kind == "recipes":
+                total = 0
+                for ic in term[1]:
+                    total += amount(ic)
+                return total
+            if kind == "meals":
+                meals = zero
+                for i in term[1]:
+                    if i is not None:
+                        meals = meals + T[:, i]
+                return meals * term[2]
+            if kind == "bulk":
+                _kind, s, qty, _rule = term
+                return zero if s is None else qty * section_meals[:, s]
+            if kind == "bulk_batch":
+                _kind, s, qty, rule = term
+                return zero if s is None else aligned_to_batches(qty * section_meals[:, s], batches(rule))
+            if kind == "bulk_split":
+                k = bm.column(term[1], term[2])
+                return zero if k is None else np.sum(bm.per_meal[:, k] * T, axis=1)
+            # mix_batch, e.g. Spinach for Gnocchi (forced even batch count like production)
+            _kind, meal, qty, rule = term
+            i = rm.meal_index.get(meal)
+            return aligned_to_batches(qty * (zero if i is None else T[:, i]), batches(rule))
+
+        result = {}
+        for table, lines in self.lines.items():
+            if only is not None:
+                lines = [(name, terms) for name, terms in lines if (table, name) in only]
+            columns = []
+            for _name, terms in lines:
+                total = zero
+                for term in terms:
+                    total = total + term_total(term)
+                columns.append(total)
+            names = tuple(name for name, _terms in lines)
+            result[table] = (names, np.array(columns).T.reshape(len(T), len(names)))
+        return result
+
+    def evaluate(self, meal_totals, prepared=None, only=None):
+        """{"veg_prep": [(name, amount)], "meat_order": [(name, amount)]} for one day (unrounded)."""
+        days = self.evaluate_days(self.rm.totals_vector(meal_totals), prepared, only)
+        return {
+            table: [(name, float(amt)) for name, amt in zip(names, amounts[0])]
+            for table, (names, amounts) in days.items()
+        }
+
+
+@lru_cache(maxsize=8)
+def meat_veg_plan(recipe_matrix, bulk_matrix) -> MeatVegPlan:
+    """The recipe book's meat/veg lines compiled for these matrices (cached per pair)."""
+    return MeatVegPlan(MEAT_VEG, recipe_matrix, bulk_matrix)
+
+
+def _rows(lines):
+    """[name, amount rounded UP] rows."""
+    return [[name, fmt_int_up(amt)] for name, amt in lines]
+
+
+def calc_meat_veg_tables(meal_totals, meal_recipes, bulk_sections, prepared=None, only=None):
+    """Meat Order and Veg Prep, as printed: [Veg Prep table, Meat Order table].
+
+    All amounts are rounded UP to whole grams. Recipes in `prepared` (already
+    prepared in bulk) contribute no recipe ingredients. With `only` (a set of
+    (table, line name) pairs, tables as in MEAT_VEG_TABLES) the tables hold
+    just those lines.
+    """
+    result = meat_veg_plan(*matrices_for(meal_recipes, bulk_sections)).evaluate(meal_totals, prepared, only)
+
+    return [
+        {
+            "title": "Veg Prep",
+            "columns": VEG_PREP_COLUMNS,
+            "rows": _rows(result["veg_prep"]),
+            "clip": None,
+        },
+        {
+            "title": "Meat Order",
+            "columns": MEAT_ORDER_COLUMNS,
+            "rows": _rows(result["meat_order"]),
+            "clip": None,
+        },
+    ]
+
 
 def draw_meat_veg_section(
-    pdf, meal_totals, meal_recipes, bulk_sections, xpos, col_w, ch, pad, bottom, start_y=None
+    pdf, meal_totals, meal_recipes, bulk_sections, xpos, col_w, ch, pad, bottom, start_y=None, prepared=None,
+    tables=None,
 ):
     """Meat Order + Veg Prep
 
@@ -48,186 +225,21 @@ def draw_meat_veg_section(
             pdf.cell(col_w * f, ch, str(v), 1)
         return y + ch
 
-    # ---------- calculations ----------
-    def get_total_recipe_ingredient(recipe, ingredient):
-        data = meal_recipes.get(recipe, {})
-        meals = meal_totals.get(recipe.upper(), 0)
-        qty = data.get("ingredients", {}).get(ingredient, 0)
-        return qty * meals
-
-    def get_total_bulk_ingredient(bulk_title, ingredient):
-        section = next((b for b in bulk_sections if b.get("title") == bulk_title), None)
-        if not section:
-            return 0
-        total_meals = sum(meal_totals.get(m.upper(), 0) for m in section.get("meals", []))
-        qty = section.get("ingredients", {}).get(ingredient, 0)
-        return qty * total_meals
-
-    def sum_totals_recipe_ingredients(recipe_list, ingredient, ingredient_override=None, multiplier=None):
-        if multiplier is not None:
-            total_meals = sum(meal_totals.get(rec.upper(), 0) for rec in recipe_list)
-            return total_meals * multiplier
-
-        total = 0
-        for rec in recipe_list:
-            data = meal_recipes.get(rec, {})
-            meals = meal_totals.get(rec.upper(), 0)
-            ing = ingredient_override if ingredient_override else ingredient
-            qty = data.get("ingredients", {}).get(ing, 0)
-            total += qty * meals
-        return total
-
-    def get_batch_total(recipe, ingredient):
-        data = meal_recipes.get(recipe, {})
-        meals = meal_totals.get(recipe.upper(), 0)
-        qty = data.get("ingredients", {}).get(ingredient, 0)
-        batch_size = data.get("batch", 0)
-
-        batches = math.ceil(meals / batch_size) if batch_size and batch_size > 0 else 1
-        total = qty * meals
-
-        # Keep totals aligned to full batches, and round UP to whole numbers.
-        if batches > 1:
-            per_batch = math.ceil(total / batches) if batches else total
-            return per_batch * batches
-        return total
-
-    def get_bulk_total(bulk_title, ingredient):
-        section = next((b for b in bulk_sections if b.get("title") == bulk_title), None)
-        if not section:
-            return 0
-
-        # Handle custom bulk sections (Sweet Potato Mash uses meal-specific per-meal grams)
-        if section.get("custom_type") == "sweet_potato_split" and ingredient == "Sweet Potato":
-            total = 0
-            for meal_name, per in section.get("meals", {}).items():
-                total += (per or 0) * (meal_totals.get(meal_name.upper(), 0) or 0)
-            return total
-
-        total_meals = sum(meal_totals.get(m.upper(), 0) for m in section.get("meals", []))
-        qty = section.get("ingredients", {}).get(ingredient, 0)
-        batch_size = section.get("batch_size", 0)
-
-        batches = math.ceil(total_meals / batch_size) if batch_size and batch_size > 0 else 1
-        total = qty * total_meals
-
-        if batches > 1:
-            per_batch = math.ceil(total / batches) if batches else total
-            return per_batch * batches
-        return total
-
-    def get_total_from_chicken_mixing():
-        # Spinach for Gnocchi (force even batch count like production)
-        meals = meal_totals.get("CREAMY CHICKEN & MUSHROOM GNOCCHI".upper(), 0)
-        qty = 25
-        divisor = 36
-
-        raw_batches = math.ceil(meals / divisor) if divisor and divisor > 0 else 0
-        batches = raw_batches + (raw_batches % 2) if raw_batches > 0 else 0
-
-        total = qty * meals
-        if batches > 1:
-            per_batch = math.ceil(total / batches)
-            return per_batch * batches
-        return total
-
-    # ---------- Meat Order (RIGHT column) ----------
-    meat_order = [
-        ("CHUCK ROLL (LEBO)", get_total_recipe_ingredient("Lebanese Beef Stew", "Chuck Diced")),
-        ("BEEF TOPSIDE (MONG)", get_total_recipe_ingredient("Mongolian Beef", "Topside Steak")),
-        (
-            "MINCE",
-            sum_totals_recipe_ingredients(
-                ["Spaghetti Bolognese", "Shepherd's Pie", "Beef Chow Mein", "Beef Burrito Bowl"],
-                "Beef Mince",
-            )
-            + sum_totals_recipe_ingredients(["Beef Meatballs"], "Mince"),
-        ),
-        (
-            "TOPSIDE STEAK",
-            get_total_bulk_ingredient("Steak", "Steak")
-            + get_total_recipe_ingredient("Steak On Its Own", "Topside Steak"),
-        ),
-        ("LAMB SHOULDER", get_total_bulk_ingredient("Lamb Marinate", "Lamb Shoulder")),
-        ("MORROCAN CHICKEN", get_total_bulk_ingredient("Moroccan Chicken", "Chicken")),
-        (
-            "ITALIAN CHICKEN",
-            sum_totals_recipe_ingredients(
-                ["Chicken With Vegetables", "Chicken with Sweet Potato and Beans", "Naked Chicken Parma", "Chicken On Its Own"],
-                "Chicken",
-                multiplier=153,
-            ),
-        ),
-        (
-            "NORMAL CHICKEN",
-            sum_totals_recipe_ingredients(
-                ["Chicken Pesto Pasta", "Chicken and Broccoli Pasta", "Butter Chicken", "Thai Green Chicken Curry", "Creamy Chicken & Mushroom Gnocchi"],
-                "Chicken",
-                multiplier=130,
-            ),
-        ),
-        ("PREMIXED CHICKEN", get_total_bulk_ingredient("Premixed Chicken Thigh", "Premixed Chicken Thigh")),
-    ]
-
-    # ---------- Veg Prep (LEFT column) ----------
-    veg_prep = [
-        ("10MM DICED CARROT", get_batch_total("Lebanese Beef Stew", "Carrot")),
-        ("10MM DICED POTATO (LEBO)", get_batch_total("Lebanese Beef Stew", "Potato")),
-        (
-            "10MM DICED ZUCCHINI",
-            meal_recipes.get("Moroccan Chicken", {}).get("sub_section", {}).get("ingredients", {}).get("Zucchini", 0)
-            * meal_totals.get("MOROCCAN CHICKEN".upper(), 0),
-        ),
-        ("5MM DICED CABBAGE", get_batch_total("Beef Chow Mein", "Cabbage")),
-        (
-            "5MM DICED CAPSICUM",
-            get_batch_total("Shepherd's Pie", "Capsicum")
-            + get_batch_total("Beef Burrito Bowl", "Capsicum")
-            + (
-                meal_recipes.get("Moroccan Chicken", {}).get("sub_section", {}).get("ingredients", {}).get("Red Capsicum", 0)
-                * meal_totals.get("MOROCCAN CHICKEN".upper(), 0)
-            ),
-        ),
-        ("5MM DICED CARROTS", get_batch_total("Shepherd's Pie", "Carrots") + get_batch_total("Beef Chow Mein", "Carrot")),
-        ("5MM DICED CELERY", get_batch_total("Beef Chow Mein", "Celery")),
-        ("5MM DICED MUSHROOMS", get_batch_total("Shepherd's Pie", "Mushroom")),
-        (
-            "5MM DICED ONION",
-            get_batch_total("Spaghetti Bolognese", "Onion")
-            + get_batch_total("Beef Chow Mein", "Onion")
-            + get_batch_total("Shepherd's Pie", "Onion")
-            + get_batch_total("Beef Burrito Bowl", "Onion")
-            + get_batch_total("Beef Meatballs", "Onion")
-            + get_batch_total("Lebanese Beef Stew", "Onion")
-            + (
-                meal_recipes.get("Moroccan Chicken", {}).get("sub_section", {}).get("ingredients", {}).get("Onion", 0)
-                * meal_totals.get("MOROCCAN CHICKEN".upper(), 0)
-            )
-            + get_batch_total("Bean Nachos with Rice", "Onion"),
-        ),
-        ("5MM MONGOLIAN CAPSICUM", get_batch_total("Mongolian Beef", "Capsicum") + get_batch_total("Chicken Fajita Bowl", "Capsicum")),
-        ("5MM MONGOLIAN ONION", get_batch_total("Mongolian Beef", "Onion") + get_batch_total("Chicken Fajita Bowl", "Red Onion")),
-        ("BROCCOLI", get_batch_total("Chicken and Broccoli Pasta", "Broccoli") + get_batch_total("Chicken With Vegetables", "Broccoli")),
-        ("CRATED CARROTS", get_batch_total("Spaghetti Bolognese", "Carrot") + get_batch_total("Bean Nachos with Rice", "Carrot")),
-        ("CRATED ZUCCHINI", get_batch_total("Spaghetti Bolognese", "Zucchini")),
-        ("LEMON POTATO", get_bulk_total("Roasted Lemon Potatoes", "Potatoes")),
-        ("ROASTED PARMA POTATO", get_bulk_total("Roasted Parma Potatoes", "Roasted Potatoes")),
-        ("THAI POTATOS", get_bulk_total("Roasted Thai Potatoes", "Potato")),
-        ("POTATO MASH", get_bulk_total("Potato Mash", "Potato")),
-        ("SWEET POTATO MASH", get_bulk_total("Sweet Potato Mash", "Sweet Potato")),
-        ("SPINACH", get_total_from_chicken_mixing()),
-        ("RED ONION", get_bulk_total("Lamb Onion Marinated", "Red Onion")),
-        ("PARSLEY", get_bulk_total("Lamb Onion Marinated", "Parsley")),
-    ]
+    # `tables` lets a caller printing several copies calculate once
+    if tables is None:
+        tables = calc_meat_veg_tables(meal_totals, meal_recipes, bulk_sections, prepared)
+    veg_table, meat_table = tables
 
     # Render Veg (left)
-    y_left = draw_table_header(left_x, y0, "Veg Prep", [("Veg Prep", 0.7), ("Amount (g)", 0.3)])
-    for name, amt in veg_prep:
-        y_left = draw_row(left_x, y_left, [name, fmt_int_up(amt)], [0.7, 0.3])
+    y_left = draw_table_header(left_x, y0, veg_table["title"], veg_table["columns"])
+    fracs = [f for _label, f in veg_table["columns"]]
+    for row in veg_table["rows"]:
+        y_left = draw_row(left_x, y_left, row, fracs)
 
     # Render Meat (right)
-    y_right = draw_table_header(right_x, y0, "Meat Order", [("Meat Type", 0.6), ("Amount (g)", 0.4)])
-    for name, amt in meat_order:
-        y_right = draw_row(right_x, y_right, [name, fmt_int_up(amt)], [0.6, 0.4])
+    y_right = draw_table_header(right_x, y0, meat_table["title"], meat_table["columns"])
+    fracs = [f for _label, f in meat_table["columns"]]
+    for row in meat_table["rows"]:
+        y_right = draw_row(right_x, y_right, row, fracs)
 
     return max(y_left, y_right) + pad
@@ -0,0 +1,222 @@
+"""Operational metrics in the Prometheus text exposition format.
+
+The metrics are fed from the timing spans (see perf_trace), so anything that
+is timed is also counted:
+
+- "report" spans: reports generated (by cache result), render duration,
+  and the report cache hit ratio
+- "pdf.output": pages per report
+- "github.upload": upload duration and uploads by result, so failed
+  uploads show up even where the caller ignores the result
+- "github": API calls by method and status, latency, and the remaining
+  rate-limit budget from GitHub's X-RateLimit-Remaining header
+
+Exposed (per process) when configured through the environment:
+
+- METRICS_PORT: serve GET /metrics on this port from a background thread
+- METRICS_PATH: rewrite this text file after every report and upload
+  (e.g. for node_exporter's textfile collector)
+"""
+import os
+import threading
+
+from perf_trace import SPAN_LISTENERS
+
+METRICS_PATH = os.environ.get("METRICS_PATH", "")
+
+# Histogram buckets (upper bounds, +Inf is implied)
+SECONDS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+PAGES_BUCKETS = (1, 5, 10, 15, 20, 25, 30, 40, 60, 80)
+
+_lock = threading.Lock()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _series(name, labels, value) -> str:
+    if labels:
+        inner = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+        name = f"{name}{{{inner}}}"
+    return f"{name} {value!r}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self.values = {}
+
+    def _key(self, labels) -> tuple:
+        # Label values are text in the exposition format; keeping them as str
+        # also keeps the keys sortable (a status of 200 and "error" in one metric)
+        return tuple((n, str(labels[n])) for n in self.labelnames)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self.values.items()):
+            lines.append(_series(self.name, key, value))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        self.values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        counts, total, n = self.values.get(key, ((0,) * len(self.buckets), 0.0, 0))
+        counts = tuple(c + (value <= bound) for c, bound in zip(counts, self.buckets))
+        self.values[key] = (counts, total + value, n + 1)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, (counts, total, n) in sorted(self.values.items()):
+            for bound, count in zip(self.buckets, counts):
+                lines.append(_series(f"{self.name}_bucket", key + (("le", f"{bound:g}"),), count))
+            lines.append(_series(f"{self.name}_bucket", key + (("le", "+Inf"),), n))
+            lines.append(_series(f"{self.name}_sum", key, float(total)))
+            lines.append(_series(f"{self.name}_count", key, n))
+        return lines
+
+
+REPORTS = Counter(
+    "production_reports_total", "Daily reports requested, by scope (all / some sections) and report cache result.",
+    ("scope", "cache"),
+)
+REPORT_CACHE_HIT_RATIO = Gauge("production_report_cache_hit_ratio", "Share of report requests served from the report cache.")
+RENDER_SECONDS = Histogram(
+    "production_report_render_seconds", "Time to calculate and draw a report PDF (cache misses).", SECONDS_BUCKETS,
+    ("scope",),
+)
+PAGES = Histogram("production_report_pages", "Pages per rendered report PDF.", PAGES_BUCKETS)
+UPLOADS = Counter("github_uploads_total", "Files pushed to GitHub, by folder and result.", ("folder", "result"))
+UPLOAD_SECONDS = Histogram(
+    "github_upload_seconds", "Time to push one file to GitHub (sha lookup + PUT).", SECONDS_BUCKETS, ("folder",)
+)
+API_CALLS = Counter("github_api_calls_total", "GitHub requests, by method and HTTP status.", ("method", "status"))
+API_SECONDS = Histogram("github_api_call_seconds", "GitHub request latency.", SECONDS_BUCKETS, ("method",))
+RATE_LIMIT_REMAINING = Gauge(
+    "github_rate_limit_remaining", "Requests left in the current GitHub rate-limit window (last response seen)."
+)
+
+METRICS = (
+    REPORTS, REPORT_CACHE_HIT_RATIO, RENDER_SECONDS, PAGES,
+    UPLOADS, UPLOAD_SECONDS, API_CALLS, API_SECONDS, RATE_LIMIT_REMAINING,
+)
+
+
+def render_metrics() -> str:
+    """Every metric in the Prometheus text format."""
+    with _lock:
+        lines = [line for metric in METRICS for line in metric.render()]
+    return "\n".join(lines) + "\n"
+
+
+def observe_span(record):
+    """perf_trace listener: update the metrics a finished span feeds."""
+    name = record["span"]
+    if name not in ("report", "pdf.output", "github.upload", "github"):
+        return
+    seconds = record["ms"] / 1000
+    with _lock:
+        if name == "report":
+            scope = "all" if record.get("sections") == "all" else "sections"
+            REPORTS.inc(scope=scope, cache=record.get("cache", "miss"))
+            if record.get("cache") == "miss":
+                RENDER_SECONDS.observe(seconds, scope=scope)
+            hits = sum(v for k, v in REPORTS.values.items() if dict(k)["cache"] == "hit")
+            REPORT_CACHE_HIT_RATIO.set(hits / sum(REPORTS.values.values()))
+        elif name == "pdf.output":
+            PAGES.observe(record.get("pages", 0))
+        elif name == "github.upload":
+            folder = record.get("path", "").rsplit("/", 1)[0]
+            UPLOADS.inc(folder=folder, result="ok" if record.get("ok") else "failed")
+            UPLOAD_SECONDS.observe(seconds, folder=folder)
+        else:
+            API_CALLS.inc(method=record.get("method", ""), status=record.get("status", "error"))
+            API_SECONDS.observe(seconds, method=record.get("method", ""))
+            if record.get("rate_limit_remaining") is not None:
+                RATE_LIMIT_REMAINING.set(record["rate_limit_remaining"])
+    if METRICS_PATH and name in ("report", "github.upload"):
+        write_metrics_file(METRICS_PATH)
+
+
+def write_metrics_file(path):
+    """Write the metrics to `path` atomically (scrapers never see half a file)."""
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(render_metrics())
+        os.replace(tmp, path)
+    except Exception:
+        pass  # metrics must never break a report
+
+
+_server = None
+_env_checked = False
+
+
+def start_metrics_server(port, addr="0.0.0.0"):
+    """Serve GET /metrics on `port` from a daemon thread (once per process)."""
+    global _server
+    with _lock:
+        if _server is not None:
+            return _server
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render_metrics().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        _server = ThreadingHTTPServer((addr, port), Handler)
+        threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+        return _server
+
+
+def start_from_env():
+    """Start the /metrics endpoint if METRICS_PORT is set (safe to call on every rerun)."""
+    global _env_checked
+    if _env_checked:
+        return
+    _env_checked = True
+    port = os.environ.get("METRICS_PORT")
+    if port:
+        try:
+            start_metrics_server(int(port))
+        except OSError:
+            pass  # port taken (e.g. a second app process): metrics file / other process still serve
+
+
+SPAN_LISTENERS.append(observe_span)
@@ -0,0 +1,103 @@
+"""Timing spans for report generation and GitHub calls.
+
+Wrap a step in `span(name, **attrs)`; when it finishes, one JSON line is
+appended to the file named by the PERF_LOG_PATH environment variable:
+
+    {"span": "section.draw", "section": "bulk", "copy": 1, "ms": 12.4,
+     "depth": 1, "ts": 1760850000.0}
+
+No file is written unless PERF_LOG_PATH is set. Once the file reaches
+PERF_LOG_MAX_BYTES it is moved to "<path>.1" (replacing the previous one).
+
+`depth` is how many spans were open around it (0 for a top-level step). The
+yielded dict takes extra attributes known only at the end (e.g. an HTTP
+status). `collect_spans` gathers the spans finished inside a block, for the
+Performance panel shown after generating a report, and every function in
+SPAN_LISTENERS is called with each finished span (see metrics).
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# JSON lines log, off unless a path is given
+PERF_LOG_PATH = os.environ.get("PERF_LOG_PATH", "")
+PERF_LOG_MAX_BYTES = int(os.environ.get("PERF_LOG_MAX_BYTES", 10 * 1024 * 1024))
+
+# Called with every finished span record, in the thread that finished it
+SPAN_LISTENERS = []
+
+_local = threading.local()
+_log_lock = threading.Lock()
+
+
+def _state():
+    if not hasattr(_local, "depth"):
+        _local.depth = 0
+        _local.collectors = []
+    return _local
+
+
+def _emit(record):
+    for spans in _state().collectors:
+        spans.append(record)
+    for listener in SPAN_LISTENERS:
+        try:
+            listener(record)
+        except Exception:
+            pass  # a listener must never break a report
+    if not PERF_LOG_PATH:
+        return
+    line = json.dumps(record, default=str)
+    try:
+        with _log_lock:
+            if os.path.exists(PERF_LOG_PATH) and os.path.getsize(PERF_LOG_PATH) >= PERF_LOG_MAX_BYTES:
+                os.replace(PERF_LOG_PATH, PERF_LOG_PATH + ".1")
+            with open(PERF_LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    except OSError:
+        pass  # timing must never break a report
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time the block as one span named `name`."""
+    state = _state()
+    record = {"span": name, **attrs}
+    state.depth += 1
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["ms"] = round((time.perf_counter() - start) * 1000, 3)
+        state.depth -= 1
+        record["depth"] = state.depth
+        record["ts"] = round(time.time(), 3)
+        _emit(record)
+
+
+@contextmanager
+def collect_spans():
+    """List of the spans finished inside the block (this thread), in finishing order."""
+    spans = []
+    collectors = _state().collectors
+    collectors.append(spans)
+    try:
+        yield spans
+    finally:
+        collectors.remove(spans)
+
+
+def summarize_spans(spans) -> list:
+    """[{"span", "count", "total_ms", "max_ms"}] per span name, slowest total first."""
+    by_name = {}
+    for record in spans:
+        row = by_name.setdefault(record["span"], {"span": record["span"], "count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        row["count"] += 1
+        row["total_ms"] += record["ms"]
+        row["max_ms"] = max(row["max_ms"], record["ms"])
+    rows = sorted(by_name.values(), key=lambda r: r["total_ms"], reverse=True)
+    for row in rows:
+        row["total_ms"] = round(row["total_ms"], 3)
+    return rows
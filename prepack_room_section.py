@@ -1,8 +1,229 @@
 import math
-from utils import fmt_int_up, fmt_qty
+from utils import fmt_int_up_array, fmt_qty_array
+from recipe_book import load_recipe_book
+from batch_planner import batches_for, get_batch_planner
 
 
-def draw_prepack_room_section(pdf, meal_totals, xpos, col_w, ch, pad, bottom, start_y=None):
+PREPACK_ROOM = load_recipe_book()["prepack_room"]
+
+SAUCE_PREPARE_COLUMNS = [("Ingredient", 0.3), ("Meal Amount", 0.2), ("Total Meals", 0.2), ("Required", 0.3)]
+SAUCE_READY_COLUMNS = [("Sauce", 0.4), ("Qty", 0.2), ("Amt", 0.2), ("Total", 0.2)]
+MEAT_READY_COLUMNS = [("Meat Mix", 0.4), ("Qty", 0.2), ("Amount", 0.2), ("Total", 0.2)]
+CHICKEN_MIX_COLUMNS = [("Ingredient", 0.22), ("Qty/Batch", 0.18), ("Amount", 0.18), ("Total", 0.21), ("Batches", 0.21)]
+RICE_MIX_COLUMNS = [("Ingredient", 0.23), ("Qty", 0.17), ("Amt", 0.17), ("Total", 0.21), ("Batches", 0.22)]
+COOKED_CHECK_COLUMNS = [("Description", 0.44), ("Meals", 0.18), ("Qty (g)", 0.18), ("Total (g)", 0.20)]
+LAMB_RECIPE_COLUMNS = [("Description", 0.28), ("Qty (g)", 0.20), ("%", 0.15), ("Total (g)", 0.20), ("Times", 0.17)]
+
+# Group headings, in print order
+PREPARE_HEADING = "Sauces/Mixes to Prepare"
+GET_READY_HEADING = "Sauces/Mixes to Get Ready"
+INGREDIENTS_HEADING = "Ingredients to Get Ready"
+CHICKEN_MIX_HEADING = "Chicken to Mix"
+RICE_MIX_HEADING = "Rice to Mix"
+CHECKS_HEADING = "Prepack Cooked Ingredient Checks"
+
+SAUCES_READY_TITLE = "Sauces to Get Ready"
+MEAT_READY_TITLE = "Meat to Get Ready"
+
+
+def _table(title, columns, rows, clip=20, total_row=None):
+    return {"title": title, "columns": columns, "rows": rows, "clip": clip, "total_row": total_row}
+
+
+def calc_prepack_room_groups(meal_totals, only=None):
+    """Pre-Pack Room, as printed: a list of {"heading", "tables"} groups.
+
+    Tables follow the same shape as bulk_section.calc_bulk_tables; cooked check
+    tables may also carry a bold "total_row". With `only` (a set of
+    (heading, title) pairs) just those tables are calculated; every group is
+    still returned, holding the requested tables only.
+    """
+    groups = []
+
+    def wanted(heading, title):
+        return only is None or (heading, title) in only
+
+    # Per-unit quantities (exact) and totals (rounded up) are collected as
+    # (row, column, value) and formatted for the whole section at once
+    qty_cells, total_cells = [], []
+
+    def row(cells, qty=None, total=None):
+        for i, value in (qty or {}).items():
+            qty_cells.append((cells, i, value))
+        for i, value in (total or {}).items():
+            total_cells.append((cells, i, value))
+        return cells
+    # Chicken and rice mix batches come from the batch planner
+    batches_by_rule = get_batch_planner().plan_dict(meal_totals)
+
+    def meals_for(meal_key):
+        return meal_totals.get(meal_key.upper(), 0) or 0
+
+    # -------------------
+    # Sauces/Mixes to Prepare
+    # -------------------
+    prepare_tables = []
+    for sauce in PREPACK_ROOM["sauces_to_prepare"]:
+        if not wanted(PREPARE_HEADING, sauce["title"]):
+            continue
+        tm = meals_for(sauce["meal"])
+        rows = [row([str(ing), None, str(int(tm)), None], {1: am}, {3: am * tm}) for ing, am in sauce["ingredients"]]
+        prepare_tables.append(_table(sauce["title"], SAUCE_PREPARE_COLUMNS, rows))
+
+    groups.append({"heading": PREPARE_HEADING, "tables": prepare_tables})
+
+    # -------------------
+    # Sauces/Mixes to Get Ready
+    # -------------------
+    ready_tables = []
+    if wanted(GET_READY_HEADING, SAUCES_READY_TITLE):
+        sauce_rows = []
+        for sauce in PREPACK_ROOM["sauces_to_get_ready"]:
+            if "per_meal" in sauce:
+                # Combined row (e.g. Chunky Salsa = Fajita + Burrito sauce): Qty blank,
+                # Amt = combined meals, Total = sum of qty * meals per meal
+                amt = sum(meals_for(m) for m in sauce["per_meal"])
+                total = sum(qty * meals_for(m) for m, qty in sauce["per_meal"].items())
+                sauce_rows.append(row([sauce["name"], "", str(int(amt)), None], total={3: total}))
+                continue
+
+            amt = meals_for(sauce["meal"])
+            sauce_rows.append(row([sauce["name"], None, str(int(amt)), None], {1: sauce["qty"]}, {3: sauce["qty"] * amt}))
+        ready_tables.append(_table(SAUCES_READY_TITLE, SAUCE_READY_COLUMNS, sauce_rows, clip=None))
+
+    if wanted(GET_READY_HEADING, MEAT_READY_TITLE):
+        meat_rows = []
+        for meat_mix in PREPACK_ROOM["meat_to_get_ready"]:
+            amt = meals_for(meat_mix["meal"])
+            meat_rows.append(row([meat_mix["name"], None, str(int(amt)), None], {1: meat_mix["qty"]}, {3: meat_mix["qty"] * amt}))
+        ready_tables.append(_table(MEAT_READY_TITLE, MEAT_READY_COLUMNS, meat_rows))
+
+    groups.append({"heading": GET_READY_HEADING, "tables": ready_tables})
+
+    # -------------------
+    # Ingredients to Get Ready
+    # -------------------
+    ingredient_tables = []
+    for item in PREPACK_ROOM["ingredients_to_get_ready"]:
+        if not wanted(INGREDIENTS_HEADING, item["title"]):
+            continue
+        amt = meals_for(item["meal"])
+        ingredient_tables.append(_table(
+            item["title"],
+            [("Ingredient", 0.4), ("Qty", 0.2), (item.get("meals_label", "Amt"), 0.2), ("Total", 0.2)],
+            [row([ing, None, str(int(amt)), None], {1: qty}, {3: qty * amt}) for ing, qty in item["ingredients"]],
+            clip=item.get("clip", 20),
+        ))
+
+    groups.append({"heading": INGREDIENTS_HEADING, "tables": ingredient_tables})
+
+    # -------------------
+    # Chicken to Mix
+    # -------------------
+    mix_tables = []
+    for mix in PREPACK_ROOM["chicken_mixes"]:
+        if not wanted(CHICKEN_MIX_HEADING, mix["name"]):
+            continue
+        amt = meals_for(mix["meal"])
+        batches = batches_by_rule[("chicken_mix", mix["name"])]
+
+        rows = []
+        for ing, qty in mix["ingredients"]:
+            total = qty * amt
+            total_per_batch = math.ceil(total / batches) if batches else total
+            rows.append(row([str(ing), None, str(int(amt)), None, str(int(batches))], {1: qty}, {3: total_per_batch}))
+
+        mix_tables.append(_table(mix["name"], CHICKEN_MIX_COLUMNS, rows))
+
+    groups.append({"heading": CHICKEN_MIX_HEADING, "tables": mix_tables})
+
+    # -------------------
+    # Rice to Mix
+    # -------------------
+    rice_tables = []
+    for mix in PREPACK_ROOM["rice_mixes"]:
+        if not wanted(RICE_MIX_HEADING, mix["title"]):
+            continue
+        meals = meals_for(mix["meal"])
+        batches = batches_by_rule[("rice_mix", mix["title"])]
+        rows = []
+        for ing, qty in mix["ingredients"]:
+            total = qty * meals
+            total_per_batch = math.ceil(total / batches) if batches else total
+            rows.append(row([ing, None, str(int(meals)), None, str(int(batches))], {1: qty}, {3: total_per_batch}))
+        rice_tables.append(_table(mix["title"], RICE_MIX_COLUMNS, rows))
+
+    groups.append({"heading": RICE_MIX_HEADING, "tables": rice_tables})
+
+    # -------------------
+    # Prepack Cooked Ingredient Checks
+    # -------------------
+    def get_meals(meal_keys):
+        """Return the first matching meal total from the supplied possible meal keys."""
+        for meal_key in meal_keys:
+            total = meal_totals.get(meal_key.upper(), None)
+            if total is not None:
+                return total or 0
+        return 0
+
+    check_tables = []
+    row_totals = {}
+    for check in PREPACK_ROOM["cooked_checks"]:
+        # Row totals are always needed (they feed the lamb recipe); the table may not be
+        keep = wanted(CHECKS_HEADING, check["title"])
+        table_total = 0
+        out_rows = []
+        for check_row in check["rows"]:
+            meals, qty = get_meals(check_row["meals"]), check_row["qty"]
+            total = (meals or 0) * (qty or 0)
+            table_total += total
+            row_totals[(check["title"], check_row["label"])] = total
+            if keep:
+                out_rows.append(row([str(check_row["label"]), str(int(meals or 0)), None, None], {2: qty or 0}, {3: total}))
+
+        if keep:
+            check_tables.append(_table(
+                check["title"],
+                COOKED_CHECK_COLUMNS,
+                out_rows,
+                clip=26,
+                total_row=row(["", "", "TOTAL", None], total={3: table_total}) if check.get("total") else None,
+            ))
+
+    # Lamb Recipe Cooked
+    # Feeds from a cooked check row (the Lamb row of the Meat table). Each
+    # seasoning is a share of the lamb weight, with batches kept around batch_g each.
+    lamb = PREPACK_ROOM["lamb_recipe"]
+    if wanted(CHECKS_HEADING, lamb["title"]):
+        lamb_total = row_totals[(lamb["base"]["check"], lamb["base"]["row"])]
+        lamb_recipe_rows = [(lamb["base"]["row"], lamb_total)]
+        lamb_recipe_rows += [(desc, lamb_total * share) for desc, share in lamb["seasoning"]]
+
+        lamb_recipe_total = lamb_total
+        for _desc, qty_total in lamb_recipe_rows[1:]:
+            lamb_recipe_total += qty_total
+        lamb_recipe_batches = batches_for(lamb_recipe_total, divisor=lamb["batch_g"], when_empty=1)
+
+        rows = []
+        for idx, (desc, qty_total) in enumerate(lamb_recipe_rows):
+            pct = (qty_total / lamb_recipe_total) if lamb_recipe_total else 0
+            qty_per_batch = math.ceil(qty_total / lamb_recipe_batches) if lamb_recipe_batches else qty_total
+            rows.append(row(
+                [desc, None, f"{pct:.2%}", None, str(int(lamb_recipe_batches)) if idx == 0 else ""],
+                total={1: qty_total, 3: qty_per_batch},
+            ))
+
+        check_tables.append(_table(lamb["title"], LAMB_RECIPE_COLUMNS, rows))
+
+    groups.append({"heading": CHECKS_HEADING, "tables": check_tables})
+
+    for cells, formatter in ((qty_cells, fmt_qty_array), (total_cells, fmt_int_up_array)):
+        for (cells_row, i, _value), text in zip(cells, formatter([value for _row, _i, value in cells])):
+            cells_row[i] = text
+    return groups
+
+
+def draw_prepack_room_section(pdf, meal_totals, xpos, col_w, ch, pad, bottom, start_y=None, groups=None):
     """
     Pre-Pack Room (combined section)
 
@@ -83,441 +304,40 @@ def draw_prepack_room_section(pdf, meal_totals, xpos, col_w, ch, pad, bottom, st
     def end_group(heights):
         pdf.set_y(max(heights) + pad)
 
-    # -------------------
-    # Sauces/Mixes to Prepare
-    # -------------------
-    draw_group_heading("Sauces/Mixes to Prepare")
-    heights = group_init_heights()
-
-    # Lamb Sauce
-    lamb = {
-        "title": "Lamb Sauce",
-        "meal_key": "Lamb Souvlaki",
-        "ingredients": [("Greek Yogurt", 20), ("Garlic", 1), ("Salt", 0.2)],
-    }
-
-    block_h = (2 + len(lamb["ingredients"])) * ch + pad
-    heights, col = ensure_space_in_group(heights, block_h, "Sauces/Mixes to Prepare")
-    x = xpos[col]
-    y = heights[col]
-    pdf.set_xy(x, y)
-    table_title(x, lamb["title"])
-    table_headers(x, [("Ingredient", 0.3), ("Meal Amount", 0.2), ("Total Meals", 0.2), ("Required", 0.3)])
-
-    tm = meal_totals.get(lamb["meal_key"].upper(), 0) or 0
-    for ing, am in lamb["ingredients"]:
-        req = (am * tm)
-        pdf.set_x(x)
-        pdf.cell(col_w * 0.3, ch, str(ing)[:20], 1)
-        pdf.cell(col_w * 0.2, ch, fmt_qty(am), 1)          # exact
-        pdf.cell(col_w * 0.2, ch, str(int(tm)), 1)
-        pdf.cell(col_w * 0.3, ch, fmt_int_up(req), 1)       # totals rounded up
-        pdf.ln(ch)
-
-    heights[col] = pdf.get_y() + pad
-    end_group(heights)
-
-    # -------------------
-    # Sauces/Mixes to Get Ready
-    # -------------------
-    draw_group_heading("Sauces/Mixes to Get Ready")
-    heights = group_init_heights()
-
-    # NOTE:
-    # Fajita Sauce + Burrito Sauce are the same sauce (Chunky Salsa).
-    # We hide them from print, but we still calculate their totals.
-    fajita_meals = meal_totals.get("CHICKEN FAJITA BOWL", 0) or 0
-    burrito_meals = meal_totals.get("BEEF BURRITO BOWL", 0) or 0
-    chunky_salsa_amt = int(fajita_meals + burrito_meals)
-    chunky_salsa_total = (35 * fajita_meals) + (45 * burrito_meals)
-
-    sauces_to_get_ready = [
-        ("Mongolian", 70, "MONGOLIAN BEEF"),
-        ("Meatballs", 120, "BEEF MEATBALLS"),
-        ("Lemon", 50, "ROASTED LEMON CHICKEN & POTATOES"),
-        ("Mushroom", 100, "STEAK WITH MUSHROOM SAUCE"),
-        ("Napoli Sauce", 40, "NAKED CHICKEN PARMA"),
-        # removed from print: ("Fajita Sauce", 33, "Chicken Fajita Bowl"),
-        # removed from print: ("Burrito Sauce", 43, "BEEF BURRITO BOWL"),
-        # printed combined row:
-        ("Chunky Salsa", None, None),
-    ]
-
-    block_h = (2 + len(sauces_to_get_ready)) * ch + pad
-    heights, col = ensure_space_in_group(heights, block_h, "Sauces/Mixes to Get Ready")
-    x = xpos[col]
-    y = heights[col]
-    pdf.set_xy(x, y)
-    table_title(x, "Sauces to Get Ready")
-    table_headers(x, [("Sauce", 0.4), ("Qty", 0.2), ("Amt", 0.2), ("Total", 0.2)])
-
-    for sauce, qty, meal_key in sauces_to_get_ready:
-        if sauce == "Chunky Salsa":
-            # Qty blank, Amt = combined meals, Total = (33*fajita) + (43*burrito)
-            pdf.set_x(x)
-            pdf.cell(col_w * 0.4, ch, "Chunky Salsa", 1)
-            pdf.cell(col_w * 0.2, ch, "", 1)  # qty blank
-            pdf.cell(col_w * 0.2, ch, str(int(chunky_salsa_amt)), 1)
-            pdf.cell(col_w * 0.2, ch, fmt_int_up(chunky_salsa_total), 1)
-            pdf.ln(ch)
-            continue
-
-        amt = meal_totals.get(meal_key.upper(), 0) or 0
-        total = qty * amt
-        pdf.set_x(x)
-        pdf.cell(col_w * 0.4, ch, sauce, 1)
-        pdf.cell(col_w * 0.2, ch, fmt_qty(qty), 1)          # exact
-        pdf.cell(col_w * 0.2, ch, str(int(amt)), 1)
-        pdf.cell(col_w * 0.2, ch, fmt_int_up(total), 1)     # totals rounded up
-        pdf.ln(ch)
-
-    heights[col] = pdf.get_y() + pad
-
-    # NEW: Meat to Get Ready table
-    meat_to_get_ready = [
-        ("Spaghetti Bolognese", 230, "SPAGHETTI BOLOGNESE"),
-        ("Chow Mein", 230, "BEEF CHOW MEIN"),
-        ("Shepherd's Pie", 210, "SHEPHERD'S PIE"),
-        ("Burrito Bowl", 130, "BEEF BURRITO BOWL"),
-    ]
-
-    block_h = (2 + len(meat_to_get_ready)) * ch + pad
-    heights, col = ensure_space_in_group(heights, block_h, "Sauces/Mixes to Get Ready")
-    x = xpos[col]
-    y = heights[col]
-    pdf.set_xy(x, y)
-    table_title(x, "Meat to Get Ready")
-    table_headers(x, [("Meat Mix", 0.4), ("Qty", 0.2), ("Amount", 0.2), ("Total", 0.2)])
-
-    for meat_mix, qty, meal_key in meat_to_get_ready:
-        amt = meal_totals.get(meal_key.upper(), 0) or 0
-        total = qty * amt
-        pdf.set_x(x)
-        pdf.cell(col_w * 0.4, ch, meat_mix[:20], 1)
-        pdf.cell(col_w * 0.2, ch, fmt_qty(qty), 1)          # exact
-        pdf.cell(col_w * 0.2, ch, str(int(amt)), 1)
-        pdf.cell(col_w * 0.2, ch, fmt_int_up(total), 1)     # totals rounded up
-        pdf.ln(ch)
-
-    heights[col] = pdf.get_y() + pad
-    end_group(heights)
-
-    # -------------------
-    # Ingredients to Get Ready
-    # -------------------
-    draw_group_heading("Ingredients to Get Ready")
-    heights = group_init_heights()
-
-    # Parma Cheese (cheese only)
-    parma_meals = meal_totals.get("NAKED CHICKEN PARMA", 0) or 0
-    parma_rows = [("Mozzarella Cheese", 40, parma_meals)]
-
-    block_h = (2 + len(parma_rows)) * ch + pad
-    heights, col = ensure_space_in_group(heights, block_h, "Ingredients to Get Ready")
-    x = xpos[col]
-    y = heights[col]
-    pdf.set_xy(x, y)
-    table_title(x, "Parma Cheese")
-    table_headers(x, [("Ingredient", 0.4), ("Qty", 0.2), ("Amt", 0.2), ("Total", 0.2)])
-
-    for ing, qty, amt in parma_rows:
-        total = qty * amt
-        pdf.set_x(x)
-        pdf.cell(col_w * 0.4, ch, ing[:20], 1)
-        pdf.cell(col_w * 0.2, ch, fmt_qty(qty), 1)
-        pdf.cell(col_w * 0.2, ch, str(int(amt)), 1)
-        pdf.cell(col_w * 0.2, ch, fmt_int_up(total), 1)
-        pdf.ln(ch)
-
-    heights[col] = pdf.get_y() + pad
-
-    # Chicken Pesto Sundried
-    pesto_meals = meal_totals.get("CHICKEN PESTO PASTA", 0) or 0
-    sundried_qty = 20
-    sundried_total = sundried_qty * pesto_meals
-
-    block_h = (2 + 1) * ch + pad
-    heights, col = ensure_space_in_group(heights, block_h, "Ingredients to Get Ready")
-    x = xpos[col]
-    y = heights[col]
-    pdf.set_xy(x, y)
-    table_title(x, "Chicken Pesto Sundried")
-    table_headers(x, [("Ingredient", 0.4), ("Qty", 0.2), ("Meals", 0.2), ("Total", 0.2)])
-
-    pdf.set_x(x)
-    pdf.cell(col_w * 0.4, ch, "Sundried Tomatos", 1)
-    pdf.cell(col_w * 0.2, ch, fmt_qty(sundried_qty), 1)
-    pdf.cell(col_w * 0.2, ch, str(int(pesto_meals)), 1)
-    pdf.cell(col_w * 0.2, ch, fmt_int_up(sundried_total), 1)
-    pdf.ln(ch)
-
-    heights[col] = pdf.get_y() + pad
-    end_group(heights)
-
-    # -------------------
-    # Chicken to Mix
-    # -------------------
-    draw_group_heading("Chicken to Mix")
-    heights = group_init_heights()
-
-    mixes = [
-        ("Pesto", [("Chicken", 107), ("Sauce", 80)], "Chicken Pesto Pasta", 50, 1),
-        ("Butter Chicken", [("Chicken", 123), ("Sauce", 90)], "Butter Chicken", 50, 2),
-        ("Broccoli Pasta", [("Chicken", 102), ("Sauce", 100)], "CHICKEN AND BROCCOLI PASTA", 50, 1),
-        ("Thai", [("Chicken", 115.36), ("Sauce", 92.7)], "THAI GREEN CHICKEN CURRY", 50, 1),
-        ("Gnocchi", [("Gnocchi", 147), ("Chicken", 80), ("Sauce", 200), ("Spinach", 25)], "CREAMY CHICKEN & MUSHROOM GNOCCHI", 36, 1),
-    ]
-
-    for name, ingredients, meal_key, divisor, extra in mixes:
-        block_h = (2 + len(ingredients)) * ch + pad
-        heights, col = ensure_space_in_group(heights, block_h, "Chicken to Mix")
-        x = xpos[col]
-        y = heights[col]
-        pdf.set_xy(x, y)
-
-        amt = meal_totals.get(meal_key.upper(), 0) or 0
-        batches = math.ceil((amt + extra) / divisor) if divisor else 1
-
-        table_title(x, name)
-        table_headers(x, [("Ingredient", 0.22), ("Qty/Batch", 0.18), ("Amount", 0.18), ("Total", 0.21), ("Batches", 0.21)])
-
-        for ing, qty in ingredients:
-            total = qty * amt
-            total_per_batch = math.ceil(total / batches) if batches else total
-
-            pdf.set_x(x)
-            pdf.cell(col_w * 0.22, ch, str(ing)[:20], 1)
-            pdf.cell(col_w * 0.18, ch, fmt_qty(qty), 1)
-            pdf.cell(col_w * 0.18, ch, str(int(amt)), 1)
-            pdf.cell(col_w * 0.21, ch, fmt_int_up(total_per_batch), 1)
-            pdf.cell(col_w * 0.21, ch, str(int(batches)), 1)
-            pdf.ln(ch)
-
-        heights[col] = pdf.get_y() + pad
-
-    end_group(heights)
-
-    # -------------------
-    # Rice to Mix
-    # -------------------
-    draw_group_heading("Rice to Mix")
-    heights = group_init_heights()
-
-    amt = meal_totals.get("BEEF BURRITO BOWL", 0) or 0
-    batches = math.ceil(amt / 60) if amt else 1
-    burrito_ings = [("Salsa", 43), ("Black Beans", 50), ("Corn", 50), ("Rice", 130)]
-
-    block_h = (2 + len(burrito_ings)) * ch + pad
-    heights, col = ensure_space_in_group(heights, block_h, "Rice to Mix")
-    x = xpos[col]
-    y = heights[col]
-    pdf.set_xy(x, y)
-
-    table_title(x, "Beef Burrito")
-    table_headers(x, [("Ingredient", 0.23), ("Qty", 0.17), ("Amt", 0.17), ("Total", 0.21), ("Batches", 0.22)])
-
-    for ing, qty in burrito_ings:
-        total = qty * amt
-        total_per_batch = math.ceil(total / batches) if batches else total
-        pdf.set_x(x)
-        pdf.cell(col_w * 0.23, ch, ing[:20], 1)
-        pdf.cell(col_w * 0.17, ch, fmt_qty(qty), 1)
-        pdf.cell(col_w * 0.17, ch, str(int(amt)), 1)
-        pdf.cell(col_w * 0.21, ch, fmt_int_up(total_per_batch), 1)
-        pdf.cell(col_w * 0.22, ch, str(int(batches)), 1)
-        pdf.ln(ch)
-
-    heights[col] = pdf.get_y() + pad
-
-    bc_meals = meal_totals.get("BUTTER CHICKEN", 0) or 0
-    bc_batches = math.ceil(bc_meals / 70) if bc_meals else 1
-    bc_ings = [("Peas", 40), ("Rice", 130)]
-
-    block_h = (2 + len(bc_ings)) * ch + pad
-    heights, col = ensure_space_in_group(heights, block_h, "Rice to Mix")
-    x = xpos[col]
-    y = heights[col]
-    pdf.set_xy(x, y)
-
-    table_title(x, "Butter Chicken")
-    table_headers(x, [("Ingredient", 0.23), ("Qty", 0.17), ("Amt", 0.17), ("Total", 0.21), ("Batches", 0.22)])
-
-    for ing, qty in bc_ings:
-        total = qty * bc_meals
-        total_per_batch = math.ceil(total / bc_batches) if bc_batches else total
-        pdf.set_x(x)
-        pdf.cell(col_w * 0.23, ch, ing[:20], 1)
-        pdf.cell(col_w * 0.17, ch, fmt_qty(qty), 1)
-        pdf.cell(col_w * 0.17, ch, str(int(bc_meals)), 1)
-        pdf.cell(col_w * 0.21, ch, fmt_int_up(total_per_batch), 1)
-        pdf.cell(col_w * 0.22, ch, str(int(bc_batches)), 1)
-        pdf.ln(ch)
-
-    heights[col] = pdf.get_y() + pad
-    end_group(heights)
-
-    # -------------------
-    # Prepack Cooked Ingredient Checks
-    # -------------------
-    draw_group_heading("Prepack Cooked Ingredient Checks")
-    heights = group_init_heights()
-
-    def get_meals(*meal_keys):
-        """Return the first matching meal total from the supplied possible meal keys."""
-        for meal_key in meal_keys:
-            total = meal_totals.get(meal_key.upper(), None)
-            if total is not None:
-                return total or 0
-        return 0
-
-    def draw_cooked_check_table(title, rows, include_total=False):
-        block_rows = len(rows) + (1 if include_total else 0)
-        block_h = (2 + block_rows) * ch + pad
-
-        nonlocal heights
-        heights, col = ensure_space_in_group(heights, block_h, "Prepack Cooked Ingredient Checks")
-        x = xpos[col]
-        y = heights[col]
-        pdf.set_xy(x, y)
-
-        table_title(x, title)
-        table_headers(x, [("Description", 0.44), ("Meals", 0.18), ("Qty (g)", 0.18), ("Total (g)", 0.20)])
-
-        table_total = 0
-        for desc, meals, qty in rows:
-            total = (meals or 0) * (qty or 0)
-            table_total += total
-
-            pdf.set_x(x)
-            pdf.cell(col_w * 0.44, ch, str(desc)[:26], 1)
-            pdf.cell(col_w * 0.18, ch, str(int(meals or 0)), 1)
-            pdf.cell(col_w * 0.18, ch, fmt_qty(qty or 0), 1)
-            pdf.cell(col_w * 0.20, ch, fmt_int_up(total), 1)
-            pdf.ln(ch)
-
-        if include_total:
-            pdf.set_x(x)
-            pdf.cell(col_w * 0.44, ch, "", 1)
-            pdf.cell(col_w * 0.18, ch, "", 1)
-            pdf.set_font("Arial", "B", 8)
-            pdf.cell(col_w * 0.18, ch, "TOTAL", 1)
-            pdf.cell(col_w * 0.20, ch, fmt_int_up(table_total), 1)
-            pdf.set_font("Arial", "", 8)
-            pdf.ln(ch)
-
-        heights[col] = pdf.get_y() + pad
-
-    # Potatoes Cooked
-    parma_meals = get_meals("Naked Chicken Parma")
-    lamb_souvlaki_meals = get_meals("Lamb Souvlaki")
-    lemon_meals = get_meals("ROASTED LEMON CHICKEN & POTATOES", "ROASTED LEMON CHICKEN AND POTATOES")
-
-    draw_cooked_check_table(
-        "Potatoes Cooked",
-        [
-            ("Naked Chicken Parma", parma_meals, 150),
-            ("Lamb Souvlaki", lamb_souvlaki_meals, 140),
-            ("Roasted Lemon Chicken", lemon_meals, 160),
-        ],
-        include_total=True,
-    )
-
-    # Italian Chicken
-    draw_cooked_check_table(
-        "Italian Chicken",
-        [
-            ("Naked Chicken Parma", parma_meals, 120),
-            ("Chicken With Vegetables", get_meals("Chicken With Vegetables"), 120),
-            ("Chicken Sweet Potato", get_meals("CHICKEN WITH SWEET POTATO AND BEANS"), 120),
-        ],
-        include_total=True,
-    )
-
-    # Normal Chicken
-    draw_cooked_check_table(
-        "Normal Chicken",
-        [
-            ("Butter Chicken", get_meals("Butter Chicken"), 123),
-            ("Chicken Broccoli Pasta", get_meals("CHICKEN AND BROCCOLI PASTA"), 102),
-            ("Chicken Mushroom Gnocchi", get_meals("CREAMY CHICKEN & MUSHROOM GNOCCHI", "CREAMY CHICKEN AND MUSHROOM GNOCCHI"), 80),
-            ("Chicken Pesto Pasta", get_meals("Chicken Pesto Pasta"), 107),
-            ("Thai Green Curry", get_meals("THAI GREEN CHICKEN CURRY", "THAI GREEN CURRY CHICKEN"), 115.36),
-        ],
-        include_total=True,
-    )
-
-    # Chicken Thigh
-    draw_cooked_check_table(
-        "Chicken Thigh",
-        [
-            ("Chicken Fajita Bowl", get_meals("Chicken Fajita Bowl"), 120),
-            ("Roasted Lemon Chicken", lemon_meals, 130),
-        ],
-        include_total=True,
-    )
-
-    # Meat
-    lamb_meals = get_meals("Lamb Souvlaki")
-    lamb_total = lamb_meals * 114
-
-    draw_cooked_check_table(
-        "Meat",
-        [
-            ("Lamb", lamb_meals, 114),
-            ("Mongolian", get_meals("MONGOLIAN BEEF"), 100),
-            ("Steak", get_meals("STEAK WITH MUSHROOM SAUCE"), 80),
-        ],
-        include_total=False,
-    )
-
-    # Pre Cooked
-    moroccan_meals = get_meals("Moroccan Chicken", "MORROCAN CHICKEN", "Moroccan", "MORROCAN")
-
-    draw_cooked_check_table(
-        "Pre Cooked",
-        [
-            ("Moroccan", moroccan_meals, 180),
-            ("Moroccan Chicken", moroccan_meals, 140),
-        ],
-        include_total=False,
-    )
-
-    # Lamb Recipe Cooked
-    # Feeds from the Lamb row in the Meat table above. Salt = 0.5% of lamb,
-    # oregano = 0.75% of lamb, with batches kept around 10kg each.
-    salt_total = lamb_total * 0.005
-    oregano_total = lamb_total * 0.0075
-    lamb_recipe_total = lamb_total + salt_total + oregano_total
-    lamb_recipe_batches = math.ceil(lamb_recipe_total / 10000) if lamb_recipe_total else 1
-
-    lamb_recipe_rows = [
-        ("Lamb", lamb_total),
-        ("Salt", salt_total),
-        ("Oregano", oregano_total),
-    ]
-
-    block_h = (2 + len(lamb_recipe_rows)) * ch + pad
-    heights, col = ensure_space_in_group(heights, block_h, "Prepack Cooked Ingredient Checks")
-    x = xpos[col]
-    y = heights[col]
-    pdf.set_xy(x, y)
-
-    table_title(x, "Lamb Recipe Cooked")
-    table_headers(x, [("Description", 0.28), ("Qty (g)", 0.20), ("%", 0.15), ("Total (g)", 0.20), ("Times", 0.17)])
-
-    for idx, (desc, qty_total) in enumerate(lamb_recipe_rows):
-        pct = (qty_total / lamb_recipe_total) if lamb_recipe_total else 0
-        qty_per_batch = math.ceil(qty_total / lamb_recipe_batches) if lamb_recipe_batches else qty_total
-
-        pdf.set_x(x)
-        pdf.cell(col_w * 0.28, ch, desc[:20], 1)
-        pdf.cell(col_w * 0.20, ch, fmt_int_up(qty_total), 1)
-        pdf.cell(col_w * 0.15, ch, f"{pct:.2%}", 1)
-        pdf.cell(col_w * 0.20, ch, fmt_int_up(qty_per_batch), 1)
-        pdf.cell(col_w * 0.17, ch, str(int(lamb_recipe_batches)) if idx == 0 else "", 1)
-        pdf.ln(ch)
-
-    heights[col] = pdf.get_y() + pad
-    end_group(heights)
+    for group in groups if groups is not None else calc_prepack_room_groups(meal_totals):
+        draw_group_heading(group["heading"])
+        heights = group_init_heights()
+
+        for table in group["tables"]:
+            total_row = table["total_row"]
+            block_rows = len(table["rows"]) + (1 if total_row else 0)
+            block_h = (2 + block_rows) * ch + pad
+
+            heights, col = ensure_space_in_group(heights, block_h, group["heading"])
+            x = xpos[col]
+            y = heights[col]
+            pdf.set_xy(x, y)
+            table_title(x, table["title"])
+            table_headers(x, table["columns"])
+
+            clip = table["clip"]
+            for row in table["rows"]:
+                pdf.set_x(x)
+                for i, (value, (_label, frac)) in enumerate(zip(row, table["columns"])):
+                    pdf.cell(col_w * frac, ch, value[:clip] if i == 0 and clip else value, 1)
+                pdf.ln(ch)
+
+            if total_row:
+                pdf.set_x(x)
+                for i, (value, (_label, frac)) in enumerate(zip(total_row, table["columns"])):
+                    if i == 2:
+                        pdf.set_font("Arial", "B", 8)
+                    pdf.cell(col_w * frac, ch, value, 1)
+                pdf.set_font("Arial", "", 8)
+                pdf.ln(ch)
+
+            heights[col] = pdf.get_y() + pad
+
+        end_group(heights)
 
     return pdf.get_y()
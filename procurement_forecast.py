@@ -0,0 +1,93 @@
+"""Procurement forecast: ingredient and meat-order demand for a range of days.
+
+Every day's meal totals are stacked into one days x meals matrix, so a week
+of demand is one matrix product (ingredients, see IngredientMatrix.totals)
+and one pass of the meat/veg plan (Meat Order / Veg Prep, see
+MeatVegPlan.evaluate_days) instead of one report per day.
+"""
+import numpy as np
+import pandas as pd
+
+from ingredient_registry import ingredient_info
+from recipe_book import UNIT_GRAMS
+from recipe_matrix import get_bulk_matrix, get_ingredient_matrix, get_recipe_matrix
+from meat_veg_section import meat_veg_plan
+from range_summary_section import stack_daily_frames
+
+# Forecast tables in display order: key -> title
+FORECAST_TABLES = {
+    "ingredients": "Ingredients",
+    "meat_order": "Meat Order",
+    "veg_prep": "Veg Prep",
+}
+
+# Columns of every forecast table besides the per-day columns and "Total"
+FORECAST_LABEL_COLUMNS = ("Item", "Category", "Unit")
+
+
+def day_label(day) -> str:
+    return day.strftime("%a %d/%m") if hasattr(day, "strftime") else str(day)
+
+
+def daily_meal_totals(frames):
+    """(day, summary_df) pairs -> (days, days x meals matrix on the shared meal axis).
+
+    Several reports for the same day add up; products that are not meals are ignored.
+    """
+    meals = get_recipe_matrix().meals
+    stacked = stack_daily_frames(frames)
+    stacked["Meal"] = stacked["Product name"].astype(str).str.strip().str.upper()
+    by_day = stacked.pivot_table(index="Day", columns="Meal", values="Total", aggfunc="sum", fill_value=0)
+    days = sorted(by_day.index)
+    return days, by_day.reindex(index=days, columns=list(meals), fill_value=0).to_numpy(dtype=float)
+
+
+def _table(items, labels, amounts):
+    """Forecast frame: label columns, one column per day, then "Total"."""
+    out = pd.DataFrame(items, columns=list(FORECAST_LABEL_COLUMNS))
+    days = pd.DataFrame(amounts, columns=labels)
+    out = pd.concat([out, days], axis=1)
+    out["Total"] = days.sum(axis=1)
+    return out
+
+
+def forecast_tables(frames, prepared=None):
+    """Per-day purchase quantities for every day in `frames`: {key: DataFrame} (see FORECAST_TABLES).
+
+    Ingredients are in their purchase units (kg / L / g) and only those used
+    in the range are listed. Meat Order and Veg Prep are grams rounded UP per
+    day, exactly as each day's report would print them.
+    """
+    days, T = daily_meal_totals(frames)
+    labels = [day_label(d) for d in days]
+
+    im = get_ingredient_matrix()
+    grams = im.totals(T, prepared)
+    used = np.flatnonzero(grams.sum(axis=0) > 0)
+    infos = [ingredient_info(im.ids[c]) for c in used]
+    order = sorted(range(len(used)), key=lambda k: (infos[k]["category"], infos[k]["name"]))
+    per_unit = np.array([UNIT_GRAMS.get(info["unit"], 1) for info in infos], dtype=float)
+    amounts = (grams[:, used] / per_unit).T.round(3) if len(used) else np.zeros((0, len(days)))
+    tables = {
+        "ingredients": _table(
+            [(infos[k]["name"], infos[k]["category"], infos[k]["unit"]) for k in order],
+            labels,
+            amounts[order],
+        )
+    }
+
+    meat_veg = meat_veg_plan(get_recipe_matrix(), get_bulk_matrix()).evaluate_days(T, prepared)
+    for key in ("meat_order", "veg_prep"):
+        names, line_amounts = meat_veg[key]
+        # Rounded like fmt_int_up: up for positives, down for negatives
+        rounded = np.where(line_amounts >= 0, np.ceil(line_amounts), np.floor(line_amounts))
+        tables[key] = _table([(name, FORECAST_TABLES[key], "g") for name in names], labels, rounded.T.astype(np.int64))
+    return tables
+
+
+def cumulative(table: pd.DataFrame) -> pd.DataFrame:
+    """Running totals across the day columns: what has to be bought by the end of each day."""
+    day_cols = [c for c in table.columns if c not in FORECAST_LABEL_COLUMNS and c != "Total"]
+    out = table.drop(columns="Total")
+    out[day_cols] = out[day_cols].cumsum(axis=1)
+    return out
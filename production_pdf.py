@@ -0,0 +1,109 @@
+from fpdf import FPDF
+
+# ---------- PDF Header (HACCP) ----------
+# These are intentionally static and only change when HACCP docs are reviewed.
+HACCP_LATEST_ISSUE_DATE = "13/01/24"
+HACCP_PREVIOUS_ISSUE_DATE = "28/10/23"
+HACCP_APPROVED_BY = "T. Fadlallah"
+HACCP_PREPARED_BY = "C. Guzzardi"
+
+
+class ProductionPDF(FPDF):
+    """
+    FPDF with a fixed HACCP header rendered on every page.
+
+    Important:
+    - fpdf (classic) is latin-1 only. Any unicode (e.g. “–”, “—”, smart quotes) will crash output().
+    - We defensively coerce ALL text going into cell/multi_cell into latin-1 (with replacement)
+      so a single bad character can’t break the whole report.
+    """
+
+    def __init__(self, *args, header_date_str: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.header_date_str = header_date_str
+
+        # Header layout constants (mm)
+        self._hdr_x = 10
+        self._hdr_y = 10
+        self._hdr_w = 210 - 20
+        # Row heights: main title, date/page, HACCP title, issue row, approved/prepared row
+        self._hdr_rows = [12, 10, 8, 6, 6]
+        self._hdr_h = sum(self._hdr_rows)
+        self._hdr_gap = 6  # space below header before page content starts
+
+        # Copy label (set by report_builder while rendering sections)
+        self.copy_no = 1
+        self.copy_total = 1
+
+    # --- latin-1 safety ---
+    @staticmethod
+    def _latin1(txt) -> str:
+        if txt is None:
+            return ""
+        s = str(txt)
+        # Replace unsupported characters rather than throwing UnicodeEncodeError
+        return s.encode("latin-1", "replace").decode("latin-1")
+
+    # Override core text writers so all downstream sections are protected
+    def cell(self, w, h=0, txt="", border=0, ln=0, align="", fill=False, link=""):
+        return super().cell(w, h, self._latin1(txt), border, ln, align, fill, link)
+
+    def multi_cell(self, w, h, txt="", border=0, align="J", fill=False):
+        return super().multi_cell(w, h, self._latin1(txt), border, align, fill)
+
+    def header(self):
+        # Outer box
+        x0, y0, w = self._hdr_x, self._hdr_y, self._hdr_w
+        r1, r2, r3, r4, r5 = self._hdr_rows
+        self.set_line_width(0.4)
+        self.rect(x0, y0, w, self._hdr_h)
+
+        # Row 1: main title
+        self.set_xy(x0, y0)
+        self.set_font("Arial", "B", 18)
+        self.cell(w, r1, "Production Schedule Report", border=0, ln=1, align="C")
+
+        # Row 2: date and page  (IMPORTANT: use ASCII hyphen, not unicode en dash)
+        self.set_xy(x0, y0 + r1)
+        self.set_font("Arial", "B", 14)
+        self.cell(
+            w,
+            r2,
+            f"{self.header_date_str} - Page {self.page_no()}   Copy {self.copy_no}/{self.copy_total}",
+            border=0,
+            ln=1,
+            align="C",
+        )
+
+        # Horizontal lines between rows
+        y = y0 + r1
+        self.line(x0, y, x0 + w, y)
+        y = y0 + r1 + r2
+        self.line(x0, y, x0 + w, y)
+        y = y0 + r1 + r2 + r3
+        self.line(x0, y, x0 + w, y)
+        y = y0 + r1 + r2 + r3 + r4
+        self.line(x0, y, x0 + w, y)
+
+        # Row 3: HACCP title
+        self.set_xy(x0, y0 + r1 + r2)
+        self.set_font("Arial", "B", 13)
+        self.cell(w, r3, "Clean Eats Australia - HACCP FSP Section F - Form 1", border=0, ln=1, align="C")
+
+        # Row 4: issue dates (2 columns)
+        half = w / 2
+        self.set_font("Arial", "", 9)
+        self.set_xy(x0, y0 + r1 + r2 + r3)
+        self.cell(half, r4, f"Latest Issue Date: {HACCP_LATEST_ISSUE_DATE}", border=0, align="C")
+        self.cell(half, r4, f"Previous Issue Date: {HACCP_PREVIOUS_ISSUE_DATE}", border=0, ln=1, align="C")
+        # vertical split line
+        self.line(x0 + half, y0 + r1 + r2 + r3, x0 + half, y0 + r1 + r2 + r3 + r4)
+
+        # Row 5: approved / prepared (2 columns)
+        self.set_xy(x0, y0 + r1 + r2 + r3 + r4)
+        self.cell(half, r5, f"Approved by: {HACCP_APPROVED_BY}", border=0, align="C")
+        self.cell(half, r5, f"Prepared by: {HACCP_PREPARED_BY}", border=0, ln=1, align="C")
+        self.line(x0 + half, y0 + r1 + r2 + r3 + r4, x0 + half, y0 + self._hdr_h)
+
+        # Move cursor below header so subsequent content starts in the right place
+        self.set_y(y0 + self._hdr_h + self._hdr_gap)
@@ -0,0 +1,133 @@
+import pandas as pd
+
+from production_pdf import ProductionPDF
+
+# Columns every archived daily summary CSV carries besides its brand columns
+SUMMARY_FIXED_COLUMNS = ("Product name", "Already Made", "Total")
+
+BREAKDOWNS = {
+    None: "Totals only",
+    "day": "Per day",
+    "brand": "Per brand",
+}
+
+# Widest matrix printed side by side; wider ones continue in another table below
+MAX_VALUE_COLUMNS = 8
+
+
+def range_title(start, end) -> str:
+    days = (end - start).days + 1
+    if days <= 7:
+        kind = "Weekly"
+    elif days <= 14:
+        kind = "Fortnightly"
+    elif days <= 31:
+        kind = "Monthly"
+    else:
+        kind = "Range"
+    return f"{kind} Meal Summary - {start.strftime('%d/%m/%Y')} to {end.strftime('%d/%m/%Y')}"
+
+
+def stack_daily_frames(frames) -> pd.DataFrame:
+    """Stack (day_label, summary_df) pairs into one frame with a "Day" column.
+
+    Brand columns missing from some days come through as 0.
+    """
+    stacked = pd.concat(
+        [df.assign(Day=day) for day, df in frames],
+        ignore_index=True,
+    )
+    value_cols = [c for c in stacked.columns if c not in ("Product name", "Day")]
+    stacked[value_cols] = stacked[value_cols].apply(pd.to_numeric, errors="coerce").fillna(0)
+    if "Already Made" not in stacked.columns:
+        stacked["Already Made"] = 0
+    return stacked
+
+
+def range_pivot(stacked: pd.DataFrame, meal_order, breakdown=None) -> pd.DataFrame:
+    """Range summary computed in one pass over the stacked frame.
+
+    Returns one row per meal (in `meal_order`, other products dropped) with
+    "Product name", the breakdown columns (days or brands, if any), then
+    "Already Made" and "Total".
+    """
+    totals = stacked.groupby("Product name")[["Already Made", "Total"]].sum()
+
+    if breakdown == "day":
+        matrix = stacked.pivot_table(
+            index="Product name", columns="Day", values="Total", aggfunc="sum", fill_value=0
+        )
+        matrix = matrix[sorted(matrix.columns)]
+        # Day labels are dates: keep them chronological, print them short
+        matrix.columns = [d.strftime("%d/%m") if hasattr(d, "strftime") else str(d) for d in matrix.columns]
+        out = matrix.join(totals)
+    elif breakdown == "brand":
+        brand_cols = [c for c in stacked.columns if c not in SUMMARY_FIXED_COLUMNS and c != "Day"]
+        out = stacked.groupby("Product name")[brand_cols + ["Already Made", "Total"]].sum()
+    else:
+        out = totals
+
+    out = out.reindex(meal_order).dropna(how="all").fillna(0).astype(int)
+    out.columns = [str(c) for c in out.columns]
+    return out.reset_index().rename(columns={"index": "Product name"})
+
+
+def draw_range_summary_section(pdf, df, title, value_columns):
+    """Meal table for a date range: Meal + `value_columns` (the last is usually Total).
+
+    Matrices wider than MAX_VALUE_COLUMNS continue in further tables below,
+    each repeating the Meal column.
+    """
+    a4_w, a4_h = 210, 297
+    available_w = a4_w - 20
+    bottom = a4_h - 17
+    meal_col_w = 80 if len(value_columns) <= 1 else 56
+
+    names = df["Product name"].astype(str).tolist()
+    # Format every printed value in one go rather than per row
+    values = df[value_columns].astype(int).astype(str)
+
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 13)
+    pdf.cell(0, 9, title, ln=1, align='C')
+    pdf.ln(2)
+
+    for start in range(0, len(value_columns), MAX_VALUE_COLUMNS):
+        chunk = value_columns[start:start + MAX_VALUE_COLUMNS]
+        other_col_w = (available_w - meal_col_w) / len(chunk)
+        headers = ["Meal"] + list(chunk)
+        col_widths = [meal_col_w] + [other_col_w] * len(chunk)
+        cells = values[chunk].to_numpy().tolist()
+
+        def table_headers():
+            pdf.set_font("Arial", "B", 9)
+            for h, w in zip(headers, col_widths):
+                pdf.cell(w, 7, h, 1, 0, 'C')
+            pdf.ln(7)
+            pdf.set_font("Arial", "", 8)
+
+        if start and pdf.get_y() + 7 + 6 * len(names) > bottom:
+            pdf.add_page()
+        elif start:
+            pdf.ln(4)
+        table_headers()
+
+        for name, row in zip(names, cells):
+            if pdf.get_y() + 6 > bottom:
+                pdf.add_page()
+                table_headers()
+            pdf.cell(col_widths[0], 6, name, 1)
+            for w, v in zip(col_widths[1:], row):
+                pdf.cell(w, 6, v, 1)
+            pdf.ln(6)
+
+    return pdf.get_y()
+
+
+def build_range_summary_pdf(df, start, end, value_columns=("Total",)) -> bytes:
+    """Render a week/fortnight/month summary PDF and return its bytes."""
+    header_date = f"{start.strftime('%d/%m/%Y')}-{end.strftime('%d/%m/%Y')}"
+    pdf = ProductionPDF(header_date_str=header_date)
+    pdf.set_auto_page_break(False)
+    draw_range_summary_section(pdf, df, range_title(start, end), list(value_columns))
+    return pdf.output(dest="S").encode("latin1")
@@ -0,0 +1,375 @@
+"""The recipe book: every quantity the report prints, loaded from recipe_book.json.
+
+The file is read, validated and cached once per process; the section modules
+index into it at import time. Every quantity lives here: edit recipe_book.json,
+not the section modules, to change a recipe, bulk section or printed line.
+
+Top-level keys:
+
+- "ingredients": canonical ingredient registry (see ingredient_registry)
+- "meal_recipes": per-meal recipes (recipes_section)
+- "bulk_sections": bulk cooking sections (bulk_section)
+- "prepack_room": sauces, mixes and cooked checks (prepack_room_section)
+- "meat_veg": Veg Prep / Meat Order lines as sums of terms (meat_veg_section)
+- "fridge", "sauces": data for the legacy fridge and sauces sheets
+
+Any object may carry a free-text "note" for whoever edits the file.
+
+The loaded book is frozen (read-only mappings and tuples) and shared by every
+session in the process; per-report changes such as the bulk "already
+prepared" toggles are applied as masks at calculation time, never by copying.
+"""
+import hashlib
+import json
+import os
+from functools import lru_cache
+from types import MappingProxyType
+
+RECIPE_BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recipe_book.json")
+
+# Purchase units allowed in the ingredient registry -> grams per unit
+# (recipe quantities are grams; liquids are ml, taken as grams)
+UNIT_GRAMS = {"kg": 1000, "L": 1000, "g": 1}
+
+BULK_CUSTOM_TYPES = {"rice_trays", "sweet_potato_split"}
+
+# Meat/Veg line terms: type -> required keys
+MEAT_VEG_TERMS = {
+    "recipe": ("recipe", "ingredient"),
+    "recipe_batch": ("recipe", "ingredient"),
+    "recipes": ("recipes", "ingredient"),
+    "meals": ("recipes", "ingredient", "per_meal"),
+    "bulk": ("bulk", "ingredient"),
+    "bulk_batch": ("bulk", "ingredient"),
+    "mix_batch": ("meal", "ingredient", "per_meal", "divisor"),
+}
+
+
+class RecipeBookError(ValueError):
+    """The recipe book file is missing, unreadable or fails validation."""
+
+
+def _is_qty(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+
+
+def _is_name(value) -> bool:
+    return isinstance(value, str) and bool(value.strip())
+
+
+def _check_qty(errors, where, value, positive=False):
+    if not _is_qty(value) or (positive and value == 0):
+        errors.append(f"{where}: must be a number {'> 0' if positive else '>= 0'}, got {value!r}")
+
+
+def _check_qty_map(errors, where, mapping):
+    if not isinstance(mapping, dict):
+        errors.append(f"{where}: expected an object of ingredient -> quantity")
+        return False
+    for ing, qty in mapping.items():
+        if not _is_qty(qty):
+            errors.append(f"{where}.{ing}: quantity must be a number >= 0, got {qty!r}")
+    return True
+
+
+def _check_qty_pairs(errors, where, pairs):
+    if not isinstance(pairs, list) or not pairs:
+        errors.append(f"{where}: expected a non-empty list of [ingredient, quantity]")
+        return
+    for i, pair in enumerate(pairs):
+        if not (isinstance(pair, list) and len(pair) == 2 and isinstance(pair[0], str) and _is_qty(pair[1])):
+            errors.append(f"{where}[{i}]: expected [ingredient, quantity >= 0], got {pair!r}")
+
+
+def _check_list(errors, where, value, what="objects"):
+    if not isinstance(value, list):
+        errors.append(f"{where}: expected a list of {what}")
+        return []
+    return value
+
+
+def _check_keys(errors, where, obj, required):
+    if not isinstance(obj, dict):
+        errors.append(f"{where}: expected an object")
+        return False
+    missing = [k for k in required if k not in obj]
+    if missing:
+        errors.append(f"{where}: missing {', '.join(missing)}")
+    return not missing
+
+
+def _check_meals(errors, where, names, meals):
+    """`names` must be a non-empty list of meals in `meals` (UPPER-CASE)."""
+    if not isinstance(names, list) or not names or not all(_is_name(n) for n in names):
+        errors.append(f"{where}: expected meal names, got {names!r}")
+        return
+    for name in names:
+        if name.upper() not in meals:
+            errors.append(f"{where}: unknown meal {name!r}")
+
+
+def _check_registered(errors, where, names, spellings):
+    for name in names:
+        if str(name).strip().lower() not in spellings:
+            errors.append(f"{where}: ingredient {name!r} is not in the ingredient registry")
+
+
+def validate_recipe_book(book) -> list:
+    """Return a list of problems with `book` (empty when it is valid).
+
+    Every key the section modules and matrix compilers read is checked for
+    presence and type, and every meal, recipe, bulk section and ingredient
+    a term or mix names must exist.
+    """
+    errors = []
+    if not _check_keys(errors, "recipe book", book,
+                       ("ingredients", "meal_recipes", "bulk_sections", "prepack_room", "meat_veg", "fridge", "sauces")):
+        return errors
+
+    # Ingredient registry
+    spellings = {}
+    registry = book["ingredients"]
+    if not isinstance(registry, dict):
+        errors.append("ingredients: expected an object of id -> ingredient")
+        registry = {}
+    for cid, info in registry.items():
+        where = f"ingredients.{cid}"
+        if not _check_keys(errors, where, info, ("name", "aliases", "unit", "category")):
+            continue
+        if not isinstance(info["unit"], str) or info["unit"] not in UNIT_GRAMS:
+            errors.append(f"{where}: unit must be one of {sorted(UNIT_GRAMS)}, got {info['unit']!r}")
+        if not _is_name(info["category"]):
+            errors.append(f"{where}.category: expected a name")
+        names = [info["name"]]
+        if isinstance(info["aliases"], list):
+            names += info["aliases"]
+        else:
+            errors.append(f"{where}.aliases: expected a list of spellings")
+        for spelling in names:
+            if not _is_name(spelling):
+                errors.append(f"{where}: spelling must be a non-empty string, got {spelling!r}")
+                continue
+            other = spellings.setdefault(spelling.strip().lower(), cid)
+            if other != cid:
+                errors.append(f"{where}: '{spelling}' is already a spelling of {other}")
+
+    # Meal recipes
+    recipes = book["meal_recipes"]
+    if not isinstance(recipes, dict):
+        errors.append("meal_recipes: expected an object of meal -> recipe")
+        recipes = {}
+    for name, data in recipes.items():
+        where = f"meal_recipes.{name}"
+        if not _check_keys(errors, where, data, ("ingredients",)):
+            continue
+        if _check_qty_map(errors, f"{where}.ingredients", data["ingredients"]):
+            _check_registered(errors, f"{where}.ingredients", data["ingredients"], spellings)
+        if not _is_qty(data.get("batch", 0) or 0):
+            errors.append(f"{where}.batch: must be a number >= 0")
+        if "sub_section" in data and _check_keys(errors, f"{where}.sub_section", data["sub_section"], ("title", "ingredients")):
+            if _check_qty_map(errors, f"{where}.sub_section.ingredients", data["sub_section"]["ingredients"]):
+                _check_registered(errors, f"{where}.sub_section.ingredients", data["sub_section"]["ingredients"], spellings)
+    recipe_names = {n.upper() for n in recipes}
+
+    def canonical(name):
+        return spellings.get(name.strip().lower(), name.strip().lower())
+
+    # Bulk sections (they also name the meals that have no recipe)
+    sections = {}
+    meals = set(recipe_names)
+    for i, sec in enumerate(_check_list(errors, "bulk_sections", book["bulk_sections"])):
+        where = f"bulk_sections[{i}]"
+        if not _check_keys(errors, where, sec, ("title", "meals")):
+            continue
+        if not _is_name(sec["title"]):
+            errors.append(f"{where}.title: expected a name")
+            continue
+        where = f"bulk_sections.{sec['title']}"
+        if sec["title"] in sections:
+            errors.append(f"{where}: duplicate title")
+        kind = sec.get("custom_type")
+        if kind is not None and (not isinstance(kind, str) or kind not in BULK_CUSTOM_TYPES):
+            errors.append(f"{where}.custom_type: unknown type {kind!r}")
+        if kind == "sweet_potato_split":
+            if not _check_qty_map(errors, f"{where}.meals", sec["meals"]):
+                continue
+            if "seasoning_per_200" in sec:
+                _check_qty_map(errors, f"{where}.seasoning_per_200", sec["seasoning_per_200"])
+            columns = ["Sweet Potato"]
+        elif not isinstance(sec["meals"], list) or not all(_is_name(m) for m in sec["meals"]):
+            errors.append(f"{where}.meals: expected a list of meal names")
+            continue
+        elif kind == "rice_trays":
+            if _check_keys(errors, where, sec, ("rice_per_meal",)):
+                _check_qty(errors, f"{where}.rice_per_meal", sec["rice_per_meal"])
+            for key in ("rice_per_tray", "water_per_tray"):
+                if key in sec:
+                    _check_qty(errors, f"{where}.{key}", sec[key], positive=True)
+            columns = ["Rice"]
+        else:
+            if not _check_qty_map(errors, f"{where}.ingredients", sec.get("ingredients")):
+                continue
+            columns = list(sec["ingredients"])
+            _check_registered(errors, f"{where}.ingredients", columns, spellings)
+            _check_qty(errors, f"{where}.batch_size", sec.get("batch_size", 0) or 0)
+            hidden = _check_list(errors, f"{where}.hide_ingredients", sec.get("hide_ingredients", []), "ingredients")
+            for ing in [*hidden, *([sec["fold_hidden_into"]] if "fold_hidden_into" in sec else [])]:
+                if ing not in columns:
+                    errors.append(f"{where}: {ing!r} is not one of its ingredients")
+        sections[sec["title"]] = {canonical(ing) for ing in columns}
+        meals.update(m.upper() for m in sec["meals"])
+
+    # Pre-Pack Room
+    prepack = book["prepack_room"]
+    if _check_keys(errors, "prepack_room", prepack, (
+        "sauces_to_prepare", "sauces_to_get_ready", "meat_to_get_ready", "ingredients_to_get_ready",
+        "chicken_mixes", "rice_mixes", "cooked_checks", "lamb_recipe",
+    )):
+        for key, required in (
+            ("sauces_to_prepare", ("title", "meal", "ingredients")),
+            ("ingredients_to_get_ready", ("title", "meal", "ingredients")),
+            ("chicken_mixes", ("name", "meal", "divisor", "ingredients")),
+            ("rice_mixes", ("title", "meal", "batch_size", "ingredients")),
+        ):
+            for i, item in enumerate(_check_list(errors, f"prepack_room.{key}", prepack[key])):
+                where = f"prepack_room.{key}[{i}]"
+                if not _check_keys(errors, where, item, required):
+                    continue
+                if not _is_name(item[required[0]]):
+                    errors.append(f"{where}.{required[0]}: expected a name")
+                _check_meals(errors, where, [item["meal"]], meals)
+                _check_qty_pairs(errors, f"{where}.ingredients", item["ingredients"])
+                if key == "chicken_mixes":
+                    _check_qty(errors, f"{where}.divisor", item["divisor"])
+                    _check_qty(errors, f"{where}.extra", item.get("extra", 0))
+                if key == "rice_mixes":
+                    _check_qty(errors, f"{where}.batch_size", item["batch_size"])
+        for key in ("sauces_to_get_ready", "meat_to_get_ready"):
+            for i, item in enumerate(_check_list(errors, f"prepack_room.{key}", prepack[key])):
+                where = f"prepack_room.{key}[{i}]"
+                if isinstance(item, dict) and "per_meal" in item:
+                    if _check_keys(errors, where, item, ("name",)) and _check_qty_map(errors, f"{where}.per_meal", item["per_meal"]):
+                        _check_meals(errors, f"{where}.per_meal", list(item["per_meal"]), meals)
+                elif _check_keys(errors, where, item, ("name", "qty", "meal")):
+                    _check_qty(errors, f"{where}.qty", item["qty"])
+                    _check_meals(errors, where, [item["meal"]], meals)
+        checks = {}
+        for i, check in enumerate(_check_list(errors, "prepack_room.cooked_checks", prepack["cooked_checks"])):
+            where = f"prepack_room.cooked_checks[{i}]"
+            if not _check_keys(errors, where, check, ("title", "rows")):
+                continue
+            # Rows list every spelling a meal may be ordered under, so their meals are not cross-checked
+            rows = _check_list(errors, f"{where}.rows", check["rows"])
+            labels = checks.setdefault(str(check["title"]), set())
+            for j, row in enumerate(rows):
+                if _check_keys(errors, f"{where}.rows[{j}]", row, ("label", "meals", "qty")):
+                    labels.add(str(row["label"]))
+                    if not isinstance(row["meals"], list) or not all(_is_name(m) for m in row["meals"]):
+                        errors.append(f"{where}.rows[{j}].meals: expected a list of meal names")
+                    _check_qty(errors, f"{where}.rows[{j}].qty", row["qty"])
+        lamb = prepack["lamb_recipe"]
+        if _check_keys(errors, "prepack_room.lamb_recipe", lamb, ("title", "base", "seasoning", "batch_g")):
+            base = lamb["base"]
+            if not isinstance(base, dict) or str(base.get("row")) not in checks.get(str(base.get("check")), ()):
+                errors.append(f"prepack_room.lamb_recipe.base: no cooked check row {base!r}")
+            _check_qty_pairs(errors, "prepack_room.lamb_recipe.seasoning", lamb["seasoning"])
+            _check_qty(errors, "prepack_room.lamb_recipe.batch_g", lamb["batch_g"], positive=True)
+
+    # Meat / Veg lines: every referenced recipe, meal, bulk section and ingredient must exist
+    tables = book["meat_veg"]
+    if _check_keys(errors, "meat_veg", tables, ("veg_prep", "meat_order")):
+        for table, lines in tables.items():
+            for i, line in enumerate(_check_list(errors, f"meat_veg.{table}", lines, "lines")):
+                if not _check_keys(errors, f"meat_veg.{table}[{i}]", line, ("name", "terms")):
+                    continue
+                where = f"meat_veg.{table}.{line['name']}"
+                terms = _check_list(errors, f"{where}.terms", line["terms"], "terms")
+                if isinstance(line["terms"], list) and not terms:
+                    errors.append(f"{where}.terms: expected at least one term")
+                for term in terms:
+                    if not isinstance(term, dict):
+                        errors.append(f"{where}: expected a term object, got {term!r}")
+                        continue
+                    required = MEAT_VEG_TERMS.get(str(term.get("type")))
+                    if required is None:
+                        errors.append(f"{where}: unknown term type {term.get('type')!r}")
+                        continue
+                    if not _check_keys(errors, where, term, required):
+                        continue
+                    if not _is_name(term["ingredient"]):
+                        errors.append(f"{where}.ingredient: expected an ingredient name")
+                        continue
+                    _check_registered(errors, where, [term["ingredient"]], spellings)
+                    if "recipe" in term:
+                        _check_meals(errors, where, [term["recipe"]], recipe_names)
+                    if "recipes" in term:
+                        _check_meals(errors, where, term["recipes"], recipe_names if term["type"] == "recipes" else meals)
+                    if "meal" in term:
+                        _check_meals(errors, where, [term["meal"]], meals)
+                    if "per_meal" in term:
+                        _check_qty(errors, f"{where}.per_meal", term["per_meal"])
+                    if "divisor" in term:
+                        _check_qty(errors, f"{where}.divisor", term["divisor"])
+                    if "bulk" in term:
+                        columns = sections.get(str(term["bulk"]))
+                        if columns is None:
+                            errors.append(f"{where}: unknown bulk section {term['bulk']!r}")
+                        elif canonical(term["ingredient"]) not in columns:
+                            errors.append(f"{where}: bulk section {term['bulk']!r} has no {term['ingredient']!r}")
+
+    # Legacy fridge and sauces sheets
+    fridge = book["fridge"]
+    if _check_keys(errors, "fridge", fridge, ("sauces", "burrito_mix", "parma_mix", "pesto_sundried")):
+        for i, item in enumerate(_check_list(errors, "fridge.sauces", fridge["sauces"])):
+            if _check_keys(errors, f"fridge.sauces[{i}]", item, ("name", "qty", "meal")):
+                _check_qty(errors, f"fridge.sauces[{i}].qty", item["qty"])
+        for key, required in (("burrito_mix", ("meal", "batch_size", "ingredients")), ("parma_mix", ("meal", "ingredients"))):
+            if _check_keys(errors, f"fridge.{key}", fridge[key], required):
+                _check_qty_pairs(errors, f"fridge.{key}.ingredients", fridge[key]["ingredients"])
+                if key == "burrito_mix":
+                    _check_qty(errors, "fridge.burrito_mix.batch_size", fridge[key]["batch_size"], positive=True)
+        if _check_keys(errors, "fridge.pesto_sundried", fridge["pesto_sundried"], ("meal", "ingredient", "qty")):
+            _check_qty(errors, "fridge.pesto_sundried.qty", fridge["pesto_sundried"]["qty"])
+    for i, item in enumerate(_check_list(errors, "sauces", book["sauces"])):
+        if _check_keys(errors, f"sauces[{i}]", item, ("title", "meal", "ingredients")):
+            if not _is_name(item["title"]):
+                errors.append(f"sauces[{i}].title: expected a name")
+            _check_qty_pairs(errors, f"sauces[{i}].ingredients", item["ingredients"])
+
+    return errors
+
+
+def _freeze(value):
+    """Read-only view of parsed JSON: objects -> MappingProxyType, arrays -> tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+@lru_cache(maxsize=None)
+def _read_recipe_book(path) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            book = json.load(f)
+    except (OSError, ValueError) as e:
+        raise RecipeBookError(f"Cannot read recipe book {path}: {e}") from e
+
+    errors = validate_recipe_book(book)
+    if errors:
+        raise RecipeBookError(f"Invalid recipe book {path}:\n- " + "\n- ".join(errors))
+    return book
+
+
+@lru_cache(maxsize=None)
+def load_recipe_book(path=RECIPE_BOOK_PATH):
+    """Read, validate and freeze the recipe book once per process (per path)."""
+    return _freeze(_read_recipe_book(path))
+
+
+@lru_cache(maxsize=None)
+def recipe_book_version(path=RECIPE_BOOK_PATH) -> str:
+    """Hash of the loaded recipe book: changes whenever any quantity changes."""
+    blob = json.dumps(_read_recipe_book(path), sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
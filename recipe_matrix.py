@@ -0,0 +1,377 @@
+"""Recipe data compiled into dense NumPy matrices.
+
+Rows are meals (keyed by UPPER-CASE name, like meal_totals), columns are
+ingredients. With a meal-totals vector `t`:
+
+- raw ingredient requirements for a day are `t @ matrix`
+- several days / scenarios stacked as rows of `T` are `T @ matrix`
+- per-meal, per-ingredient amounts (the recipe tables) are `matrix * t[:, None]`
+
+Ingredient names are resolved through the ingredient registry when the data
+is compiled, so "Carrot"/"Carrots" etc. land on one canonical column.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from ingredient_registry import ingredient_info, resolve, UNIT_GRAMS
+from recipe_book import load_recipe_book
+
+
+def _projection(names):
+    """(canonical ids, 0/1 matrix names x ids) folding every spelling onto its canonical id."""
+    canonical = [resolve(n) for n in names]
+    ids = tuple(dict.fromkeys(canonical))
+    index = {cid: c for c, cid in enumerate(ids)}
+    proj = np.zeros((len(names), len(ids)))
+    for j, cid in enumerate(canonical):
+        proj[j, index[cid]] = 1
+    return tuple(canonical), ids, proj
+
+
+class RecipeMatrix:
+    """meal_recipes as matrices: main ingredients, sub-section ingredients and batch sizes."""
+
+    def __init__(self, recipes, meals=None):
+        self.meals = tuple(meals) if meals is not None else tuple(n.upper() for n in recipes)
+        self.meal_index = {m: i for i, m in enumerate(self.meals)}
+        # Row of each recipe, in recipe order (meals without a recipe stay all-zero)
+        self.recipe_rows = {name: self.meal_index[name.upper()] for name in recipes}
+
+        ingredients = []
+        for data in recipes.values():
+            ingredients += data["ingredients"]
+            ingredients += data.get("sub_section", {}).get("ingredients", {})
+        self.ingredients = tuple(dict.fromkeys(ingredients))
+        self.ingredient_index = {ing: j for j, ing in enumerate(self.ingredients)}
+
+        shape = (len(self.meals), len(self.ingredients))
+        self.main = np.zeros(shape)
+        self.sub = np.zeros(shape)
+        self.batch = np.zeros(len(self.meals))
+        for name, data in recipes.items():
+            i = self.recipe_rows[name]
+            self.batch[i] = data.get("batch", 0) or 0
+            for ing, qty in data["ingredients"].items():
+                self.main[i, self.ingredient_index[ing]] = qty
+            for ing, qty in data.get("sub_section", {}).get("ingredients", {}).items():
+                self.sub[i, self.ingredient_index[ing]] = qty
+
+        # Same matrices with ingredient spellings merged onto canonical ids
+        self.canonical, self.canonical_ids, proj = _projection(self.ingredients)
+        self.canonical_index = {cid: c for c, cid in enumerate(self.canonical_ids)}
+        self.main_canonical = self.main @ proj
+        self.sub_canonical = self.sub @ proj
+
+        for arr in (self.main, self.sub, self.batch, self.main_canonical, self.sub_canonical):
+            arr.setflags(write=False)
+
+    def totals_vector(self, meal_totals) -> np.ndarray:
+        return totals_vector(meal_totals, self.meals)
+
+    def keep_mask(self, prepared=None) -> np.ndarray:
+        """1.0 per meal, 0.0 for recipes marked as already prepared (the bulk toggles)."""
+        keep = np.ones(len(self.meals))
+        for name in prepared or ():
+            i = self.meal_index.get(name.upper())
+            if i is not None:
+                keep[i] = 0.0
+        return keep
+
+    def amounts(self, totals, canonical=False, prepared=None):
+        """Per-meal amounts (main, sub) for one day: qty/meal * meals, elementwise.
+
+        With `canonical=True` the columns are canonical ingredient ids
+        (see `canonical_column`) instead of the spellings in the recipe data.
+        Recipes in `prepared` contribute nothing (their rows are masked out).
+        """
+        t = np.asarray(totals, dtype=float)
+        if prepared:
+            t = t * self.keep_mask(prepared)
+        t = t[:, None]
+        if canonical:
+            return self.main_canonical * t, self.sub_canonical * t
+        return self.main * t, self.sub * t
+
+    def canonical_column(self, ingredient):
+        """Column of any spelling of `ingredient` in the canonical matrices (None if unused)."""
+        return self.canonical_index.get(resolve(ingredient))
+
+    def qty(self, meal_name, ingredient, sub_section=False) -> float:
+        i = self.meal_index.get(meal_name.upper())
+        j = self.ingredient_index.get(ingredient)
+        if i is None or j is None:
+            return 0
+        return (self.sub if sub_section else self.main)[i, j]
+
+
+class BulkMatrix:
+    """bulk_sections as matrices over (section title, ingredient) columns.
+
+    `membership[s, m]` is 1 when meal m feeds bulk section s, so per-section
+    meal counts are `membership @ t`. Sweet potato mash carries its per-meal
+    grams directly in `per_meal` (column "Sweet Potato"), and the rice tray
+    section its rice per meal (column "Rice").
+    """
+
+    def __init__(self, sections, meals):
+        self.meals = tuple(meals)
+        self.meal_index = {m: i for i, m in enumerate(self.meals)}
+        self.titles = tuple(sec["title"] for sec in sections)
+        self.section_index = {t: s for s, t in enumerate(self.titles)}
+
+        columns = []
+        for sec in sections:
+            if sec.get("custom_type") == "sweet_potato_split":
+                columns.append((sec["title"], "Sweet Potato"))
+            elif sec.get("custom_type") == "rice_trays":
+                columns.append((sec["title"], "Rice"))
+            else:
+                columns += [(sec["title"], ing) for ing in sec.get("ingredients", {})]
+        self.columns = tuple(columns)
+        self.column_index = {c: k for k, c in enumerate(self.columns)}
+        self.column_canonical = tuple(resolve(ing) for _title, ing in self.columns)
+        # Columns of the custom sections: what is ordered for their meals
+        self.ordered_columns = tuple(
+            k for k, (title, _ing) in enumerate(self.columns)
+            if sections[self.section_index[title]].get("custom_type")
+        )
+        # (title, canonical id) -> column, so any spelling finds a section's ingredient
+        self.canonical_column_index = {
+            (title, cid): k for k, ((title, _ing), cid) in enumerate(zip(self.columns, self.column_canonical))
+        }
+
+        self.membership = np.zeros((len(self.titles), len(self.meals)), dtype=np.int64)
+        self.per_meal = np.zeros((len(self.meals), len(self.columns)))
+        self.batch_size = np.zeros(len(self.titles))
+        for s, sec in enumerate(sections):
+            self.batch_size[s] = sec.get("batch_size", 0) or 0
+            meals = sec.get("meals", [])
+            for meal in meals:
+                self.membership[s, self.meal_index[meal.upper()]] = 1
+
+            if sec.get("custom_type") == "sweet_potato_split":
+                k = self.column_index[(sec["title"], "Sweet Potato")]
+                for meal, per in meals.items():
+                    self.per_meal[self.meal_index[meal.upper()], k] = per or 0
+            elif sec.get("custom_type") == "rice_trays":
+                k = self.column_index[(sec["title"], "Rice")]
+                for meal in meals:
+                    self.per_meal[self.meal_index[meal.upper()], k] = sec.get("rice_per_meal", 0) or 0
+            else:
+                for ing, per in sec.get("ingredients", {}).items():
+                    k = self.column_index[(sec["title"], ing)]
+                    for meal in meals:
+                        self.per_meal[self.meal_index[meal.upper()], k] = per
+        self.membership.setflags(write=False)
+        self.per_meal.setflags(write=False)
+        self.batch_size.setflags(write=False)
+
+    def totals_vector(self, meal_totals) -> np.ndarray:
+        return totals_vector(meal_totals, self.meals)
+
+    def section_meals(self, totals) -> np.ndarray:
+        """Meals feeding each bulk section (same dtype as `totals`)."""
+        return self.membership @ np.asarray(totals)
+
+    def column(self, title, ingredient):
+        """Column of (section, ingredient), accepting any registered spelling of the ingredient."""
+        k = self.column_index.get((title, ingredient))
+        if k is None:
+            k = self.canonical_column_index.get((title, resolve(ingredient)))
+        return k
+
+    def column_total(self, title, ingredient, totals) -> float:
+        """One (section, ingredient) total for one day, summed elementwise (no BLAS rounding)."""
+        k = self.column(title, ingredient)
+        if k is None:
+            return 0
+        return float(np.sum(self.per_meal[:, k] * np.asarray(totals)))
+
+    def qty(self, title, ingredient) -> float:
+        k = self.column(title, ingredient)
+        if k is None:
+            return 0
+        s = self.section_index[title]
+        rows = np.flatnonzero(self.membership[s])
+        return self.per_meal[rows[0], k] if len(rows) else 0
+
+
+class IngredientMatrix:
+    """Recipe and bulk data folded onto canonical ingredients, meals x ids.
+
+    Every (meal, ingredient) takes its grams from one source, the one the
+    printed sections use, so the totals agree with the Meat Order / Veg Prep:
+
+    1. the meat/veg line terms naming it (a recipe, a meals or mix figure, a
+       bulk section), summed when several terms of a line apply;
+    2. the Rice Order's rice per meal (the Burrito Mix rice is that rice);
+    3. otherwise the bulk sections the meal draws from, or else its recipe.
+
+    Recipe amounts are kept apart from the others (`recipe_part`) because
+    recipes marked as already prepared drop them; bulk figures still count.
+    """
+
+    def __init__(self, recipe_matrix, bulk_matrix, lines=None):
+        rm, bm = recipe_matrix, bulk_matrix
+        lines = load_recipe_book()["meat_veg"] if lines is None else lines
+        terms = [term for table_lines in lines.values() for line in table_lines for term in line["terms"]]
+        self.meals = rm.meals
+        _canonical, bulk_ids, bulk_proj = _projection([ing for _title, ing in bm.columns])
+        term_ids = [resolve(term["ingredient"]) for term in terms]
+        self.ids = tuple(dict.fromkeys(rm.canonical_ids + bulk_ids + tuple(term_ids)))
+        self.id_index = {cid: c for c, cid in enumerate(self.ids)}
+
+        shape = (len(self.meals), len(self.ids))
+        recipe, other = np.zeros(shape), np.zeros(shape)
+        covered = np.zeros(shape, dtype=bool)
+
+        def from_recipe(name, c, sub_section=False):
+            i = rm.meal_index.get(name.upper())
+            j = rm.canonical_index.get(self.ids[c])
+            if i is not None:
+                if j is not None:
+                    recipe[i, c] += (rm.sub_canonical if sub_section else rm.main_canonical)[i, j]
+                covered[i, c] = True
+
+        def from_column(k, c):
+            rows = np.flatnonzero(bm.per_meal[:, k])
+            other[rows, c] += bm.per_meal[rows, k]
+            covered[rows, c] = True
+
+        for term, cid in zip(terms, term_ids):
+            kind, c = term["type"], self.id_index[cid]
+            if kind in ("recipe", "recipe_batch"):
+                from_recipe(term["recipe"], c, term.get("sub_section", False))
+            elif kind == "recipes":
+                for name in term["recipes"]:
+                    from_recipe(name, c)
+            elif kind in ("meals", "mix_batch"):
+                for name in term["recipes"] if kind == "meals" else [term["meal"]]:
+                    i = rm.meal_index.get(name.upper())
+                    if i is not None:
+                        other[i, c] += term["per_meal"]
+                        covered[i, c] = True
+            else:
+                k = bm.column(term["bulk"], term["ingredient"])
+                if k is not None:
+                    from_column(k, c)
+
+        for k in bm.ordered_columns:
+            c = self.id_index[bm.column_canonical[k]]
+            rows = np.flatnonzero((bm.per_meal[:, k] > 0) & ~covered[:, c])
+            other[rows, c] += bm.per_meal[rows, k]
+            covered[rows, c] = True
+
+        bulk = np.zeros(shape)
+        bulk[:, [self.id_index[c] for c in bulk_ids]] = bm.per_meal @ bulk_proj
+        rest = ~covered & (bulk > 0)
+        other[rest] = bulk[rest]
+        rest = ~covered & (bulk == 0)
+        recipe[:, [self.id_index[c] for c in rm.canonical_ids]] += np.where(
+            rest[:, [self.id_index[c] for c in rm.canonical_ids]], rm.main_canonical + rm.sub_canonical, 0
+        )
+
+        self.recipe_matrix = rm
+        self.recipe_part, self.other_part = recipe, other
+        self.per_meal = recipe + other
+        for arr in (recipe, other, self.per_meal):
+            arr.setflags(write=False)
+
+        # Ingredient -> meals that use it (only those meals feed its total)
+        self.contributing_meals = {
+            cid: tuple(self.meals[i] for i in np.flatnonzero(self.per_meal[:, c]))
+            for c, cid in enumerate(self.ids)
+        }
+
+    def totals(self, totals, prepared=None) -> np.ndarray:
+        """Grams of every canonical ingredient, for a vector or a days x meals matrix.
+
+        Recipes in `prepared` drop their recipe amounts (bulk sections still count).
+        """
+        if not prepared:
+            return np.asarray(totals) @ self.per_meal
+        keep = self.recipe_matrix.keep_mask(prepared)
+        return (np.asarray(totals) * keep) @ self.recipe_part + np.asarray(totals) @ self.other_part
+
+    def totals_table(self, meal_totals, prepared=None):
+        """Company-wide ingredient totals for one day as rows, in purchase units.
+
+        [{"id", "name", "category", "unit", "amount", "meals"}] for every
+        ingredient used today, ordered by category then name.
+        """
+        grams = self.totals(totals_vector(meal_totals, self.meals), prepared)
+        rows = []
+        for c, cid in enumerate(self.ids):
+            if grams[c] <= 0:
+                continue
+            info = ingredient_info(cid)
+            rows.append({
+                "id": cid,
+                "name": info["name"],
+                "category": info["category"],
+                "unit": info["unit"],
+                "amount": grams[c] / UNIT_GRAMS.get(info["unit"], 1),
+                "meals": [m for m in self.contributing_meals[cid] if meal_totals.get(m)],
+            })
+        return sorted(rows, key=lambda r: (r["category"], r["name"]))
+
+
+def totals_vector(meal_totals, meals) -> np.ndarray:
+    """meal_totals dict (UPPER-CASE keys) -> float vector aligned with `meals`."""
+    return np.array([meal_totals.get(m, 0) or 0 for m in meals], dtype=float)
+
+
+def all_meals(recipes=None, sections=None):
+    """Every meal known to the recipe and bulk data, recipes first (UPPER-CASE)."""
+    book = load_recipe_book()
+    recipes = book["meal_recipes"] if recipes is None else recipes
+    sections = book["bulk_sections"] if sections is None else sections
+    names = [n.upper() for n in recipes]
+    for sec in sections:
+        names += [m.upper() for m in sec.get("meals", [])]
+    return tuple(dict.fromkeys(names))
+
+
+@lru_cache(maxsize=1)
+def get_recipe_matrix() -> RecipeMatrix:
+    """The shared RecipeMatrix for meal_recipes, compiled once per process.
+
+    Its meal axis is all_meals(), shared with get_bulk_matrix(), so one
+    totals vector feeds both.
+    """
+    return RecipeMatrix(load_recipe_book()["meal_recipes"], all_meals())
+
+
+@lru_cache(maxsize=1)
+def get_bulk_matrix() -> BulkMatrix:
+    """The shared BulkMatrix for bulk_sections, compiled once per process."""
+    return BulkMatrix(load_recipe_book()["bulk_sections"], all_meals())
+
+
+@lru_cache(maxsize=1)
+def get_ingredient_matrix() -> IngredientMatrix:
+    """The shared IngredientMatrix for meal_recipes + bulk_sections."""
+    return IngredientMatrix(get_recipe_matrix(), get_bulk_matrix())
+
+
+def ingredient_matrix_for(recipes):
+    """IngredientMatrix for `recipes`: the shared one unless it is a modified tree."""
+    if recipes is None or recipes is load_recipe_book()["meal_recipes"]:
+        return get_ingredient_matrix()
+    return IngredientMatrix(*matrices_for(recipes))
+
+
+def matrices_for(recipes, sections=None):
+    """(RecipeMatrix, BulkMatrix) for the given data: the shared ones when unchanged,
+    otherwise compiled for this call (e.g. a recipe tree with bulk toggles applied)."""
+    book = load_recipe_book()
+    meal_recipes, bulk_sections = book["meal_recipes"], book["bulk_sections"]
+    sections = bulk_sections if sections is None else sections
+    if recipes is meal_recipes and sections is bulk_sections:
+        return get_recipe_matrix(), get_bulk_matrix()
+    meals = all_meals(recipes, sections)
+    bulk = get_bulk_matrix()
+    if sections is not bulk_sections or meals != bulk.meals:
+        bulk = BulkMatrix(sections, meals)
+    return RecipeMatrix(recipes, meals), bulk
@@ -1,163 +1,82 @@
-import math
-from utils import fmt_int_up, fmt_qty
+from utils import fmt_int_up_array, fmt_qty_array
+from recipe_book import load_recipe_book
+from recipe_matrix import matrices_for
+from batch_planner import batch_planner_for
 
 # Export meal_recipes for use elsewhere
-meal_recipes = {
-    "Spaghetti Bolognese": {
-        "batch": 90,
-        "ingredients": {
-            "Beef Mince": 100, "Napoli Sauce": 65, "Crushed Tomatoes": 45, "Beef Stock": 30,
-            "Onion": 15, "Zucchini": 15, "Carrot": 15, "Vegetable Oil": 1, "Salt": 3, "Pepper": 1
-        }
-    },
-    "Beef Chow Mein": {
-        "batch": 80,
-        "ingredients": {
-            "Beef Mince": 120, "Celery": 42, "Carrot": 42, "Cabbage": 42, "Onion": 42,
-            "Oil": 2, "Pepper": 1, "Salt": 0.5, "Soy Sauce": 13, "Oyster Sauce": 13
-        }
-    },
-    "Shepherd's Pie": {
-        "batch": 82,
-        "ingredients": {
-            "Beef Mince": 100, "Oil": 2, "Carrots": 15, "Capsicum": 15, "Onion": 15,
-            "Mushroom": 15, "Peas": 15, "Tomato Paste": 6, "Beef Stock": 20, "Salt": 2, "Pepper": 0.5, "Napoli Sauce": 70
-        }
-    },
-    "Beef Burrito Bowl": {
-        "batch": 130,
-        "ingredients": {
-            "Beef Mince": 95, "Onion": 12, "Capsicum": 12, "Vegetable Oil": 2,
-            "Taco Seasoning": 7, "Salt": 1.5, "Pepper": 0.5, "Beef Stock": 40
-        }
-    },
-    "Beef Meatballs": {
-        "batch": 0,
-        "ingredients": {
-            "Mince": 150, "Onion": 10, "Parsley": 3, "Salt": 1.5, "Pepper": 0.2
-        }
-    },
-    "Lebanese Beef Stew": {
-        "batch": 80,
-        "ingredients": {
-            "Chuck Diced": 97, "Onion": 30, "Carrot": 30, "Potato": 30, "Peas": 30,
-            "Oil": 2, "Salt": 2.5, "Pepper": 0.5, "Tomato Paste": 20, "Water": 30, "Beef Stock Powder": 0.44, "Beef Stock Powder Water": 29.56, "Rice": 130
-        }
-    },
-    "Mongolian Beef": {
-        "batch": 0,
-        "ingredients": {
-            "Topside Steak": 100, "Baking Soda": 1, "Water": 10, "Soy Sauce": 5, "Cornflour": 2.5, "Capsicum": 37, "Onion": 37, "Rice": 130
-        }
-    },
-    "Chicken With Vegetables": {
-        "batch": 60,
-        "ingredients": {
-            "Chicken": 135, "Corn": 40, "Beans": 60, "Broccoli": 67
-        }
-    },
-    "Chicken with Sweet Potato and Beans": {
-        "batch": 60,
-        "ingredients": {
-            "Chicken": 135, "Beans": 60
-        }
-    },
-    "Naked Chicken Parma": {
-        "batch": 0,
-        "ingredients": {
-            "Chicken": 150
-        }
-    },
-    "Chicken Pesto Pasta": {
-        "batch": 0,
-        "ingredients": {
-            "Chicken": 130, "Penne": 59, "Sundried Tomatoes": 20
-        }
-    },
-    "Chicken and Broccoli Pasta": {
-        "batch": 0,
-        "ingredients": {
-            "Chicken": 130, "Penne": 59, "Broccoli": 40
-        }
-    },
-    "Butter Chicken": {
-        "batch": 60,
-        "ingredients": {
-            "Chicken": 140, "Peas": 40, "Rice": 130
-        }
-    },
-    "Thai Green Chicken Curry": {
-        "batch": 0,
-        "ingredients": {
-            "Chicken": 144.2, "Rice": 130
-        }
-    },
-    "Moroccan Chicken": {
-        "batch": 0,
-        "ingredients": {
-            "Chicken": 180
-        },
-        "sub_section": {
-            "title": "Chickpea Recipe",
-            "ingredients": {
-                "Onion": 18, "Zucchini": 27, "Red Capsicum": 27, "Garlic": 1.8, "Oil": 1.8, "Chickpeas": 103.5, "Mix Spices": 1.53, "Chicken Stock": 45
-            }
-        }
-    },
-    "Steak with Mushroom Sauce": {
-        "batch": 0,
-        "ingredients": {
-            "Topside Steak": 110
-        }
-    },
-    "Steak On Its Own": {
-        "batch": 20,
-        "ingredients": {
-            "Topside Steak": 200
-        }
-    },
-    "Bean Nachos with Rice": {
-        "batch": 60,
-        "ingredients": {
-            "Drained Beans": 80, "Carrot": 25, "Onion": 20, "Taco Seasoning": 1, "Salt": 1.5, "Pepper": 0.5, "Garlic": 2.5,
-            "Vegetable Oil": 1.5, "Cumin": 0.5, "Crushed Tomato": 85, "Water": 41.7
-        }
-    },
-    "Beef Lasagna": {
-        "batch": 0,
-        "ingredients": {
-            "Lasange Sheets": 150, "Mozzerala Cheese Alba": 750, "Napoli Sauce": 500, "Bolognese": 3200
-        }
-    },
-    "Lamb Souvlaki": {
-        "batch": 90,
-        "ingredients": {
-            "Lamb Shoulder": 140, "Potatoes": 140
-        }
-    },
-    "Chicken Fajita Bowl": {
-        "batch": 60,
-        "ingredients": {
-            "Chicken Thigh": 150, "Capsicum": 52, "Red Onion": 52, "Salsa": 30, "Rice": 130
-        }
-    },
-    "Chicken On Its Own": {
-        "batch": 6,
-        "ingredients": {
-            "Chicken Breast": 200
-        }
-    },
-    "Creamy Chicken & Mushroom Gnocchi": {
-        "batch": 36,
-        "ingredients": {
-            "Gnocchi": 142.5, "Chicken": 80, "Sauce": 200, "Spinach": 25
-        }
-    }
-}
-
-def draw_recipes_section(pdf, meal_totals, xpos, col_w, ch, pad, bottom, start_y=None, meal_recipes_override=None):
+meal_recipes = load_recipe_book()["meal_recipes"]
+
+RECIPE_COLUMNS = [("Ingredient", 0.3), ("Qty/Meal", 0.15), ("Meals", 0.15), ("Batch Total", 0.25), ("Batch", 0.15)]
+SUB_SECTION_COLUMNS = [("Ingredient", 0.3), ("Qty/Meal", 0.15), ("Meals", 0.15), ("Total", 0.25), ("", 0.15)]
+
+
+def calc_recipe_tables(meal_totals, meal_recipes_override=None, prepared=None, only=None):
+    """Meal Raw Ingredients to Cook, as printed: one table per meal.
+
+    Same table shape as bulk_section.calc_bulk_tables, plus an optional
+    "sub_section" table (e.g. Moroccan Chicken's Chickpea Recipe).
+    Recipes in `prepared` (already prepared in bulk) print every ingredient as 0.
+    With `only` (a set of recipe names) just those tables are calculated.
+    """
     recipes = meal_recipes_override if meal_recipes_override is not None else meal_recipes
+    prepared = set(prepared or ())
+
+    # Every qty/meal x meals product in one elementwise pass over the recipe matrix
+    rm, bm = matrices_for(recipes)
+    t = rm.totals_vector(meal_totals)
+    main_amt, sub_amt = rm.amounts(t, prepared=prepared)
+    planner = batch_planner_for(rm, bm)
+    plan = planner.plan(t)
+
+    tables = []
+    # Qty/Meal and total cells of every row are formatted column-wise at the end
+    numbered_rows, qty_col, total_col = [], [], []
+    for name, data in recipes.items():
+        if only is not None and name not in only:
+            continue
+        i = rm.recipe_rows[name]
+        keep = name not in prepared
+        tot = meal_totals.get(name.upper(), 0)
+        batch_val = data.get("batch", 0)
+        batches = int(plan[planner.index[("recipe", name.upper())]])
 
+        rows = []
+        for k, (ing, qty) in enumerate(data["ingredients"].items()):
+            amount = main_amt[i, rm.ingredient_index[ing]]
+            if batch_val > 0 and batches > 0:
+                bt = (amount / batches)
+                bl = str(batches) if k == 0 else ""
+            else:
+                bt = amount
+                bl = ""
+            rows.append([ing, None, str(tot), None, bl])
+            qty_col.append(qty if keep else 0)
+            total_col.append(bt)
+
+        table = {"title": name, "columns": RECIPE_COLUMNS, "rows": rows, "clip": 20}
+
+        if "sub_section" in data:
+            subsec = data["sub_section"]
+            sub_rows = []
+            for ingr, per in subsec["ingredients"].items():
+                adj = sub_amt[i, rm.ingredient_index[ingr]]
+                sub_rows.append([str(ingr), None, str(tot), None, ""])
+                qty_col.append(per if keep else 0)
+                total_col.append(adj)
+            table["sub_section"] = {"title": subsec["title"], "columns": SUB_SECTION_COLUMNS, "rows": sub_rows, "clip": 20}
+
+        tables.append(table)
+        numbered_rows += rows
+        numbered_rows += table.get("sub_section", {}).get("rows", [])
+
+    for row, qty, total in zip(numbered_rows, fmt_qty_array(qty_col), fmt_int_up_array(total_col)):
+        row[1], row[3] = qty, total
+    return tables
+
+
+def draw_recipes_section(
+    pdf, meal_totals, xpos, col_w, ch, pad, bottom, start_y=None, meal_recipes_override=None, prepared=None, tables=None
+):
     pdf.set_y(start_y or pdf.get_y())
     pdf.set_font("Arial", "B", 14)
     pdf.cell(0, 10, "Meal Raw Ingredients to Cook", ln=1, align='C')
@@ -165,9 +84,26 @@ def draw_recipes_section(pdf, meal_totals, xpos, col_w, ch, pad, bottom, start_y
 
     heights = [pdf.get_y(), pdf.get_y()]
 
-    for name, data in recipes.items():
-        main = len(data["ingredients"])
-        sub = len(data.get("sub_section", {}).get("ingredients", {}))
+    def table_headers(x, cols):
+        pdf.set_x(x)
+        pdf.set_font("Arial", "B", 8)
+        for h, w in cols:
+            pdf.cell(col_w * w, ch, h, 1)
+        pdf.ln(ch)
+        pdf.set_font("Arial", "", 8)
+
+    def table_rows(x, table):
+        for row in table["rows"]:
+            pdf.set_x(x)
+            for i, (value, (_label, w)) in enumerate(zip(row, table["columns"])):
+                pdf.cell(col_w * w, ch, value[:table["clip"]] if i == 0 else value, 1)
+            pdf.ln(ch)
+
+    if tables is None:
+        tables = calc_recipe_tables(meal_totals, meal_recipes_override, prepared)
+    for table in tables:
+        main = len(table["rows"])
+        sub = len(table["sub_section"]["rows"]) if "sub_section" in table else 0
         rows = 2 + main + (2 + sub if sub else 0)
         block_h = rows * ch + pad
 
@@ -184,57 +120,19 @@ def draw_recipes_section(pdf, meal_totals, xpos, col_w, ch, pad, bottom, start_y
         pdf.set_xy(x, y)
         pdf.set_font("Arial", "B", 11)
         pdf.set_fill_color(230, 230, 230)
-        pdf.cell(col_w, ch, name, ln=1, fill=True)
+        pdf.cell(col_w, ch, table["title"], ln=1, fill=True)
 
-        pdf.set_x(x)
-        pdf.set_font("Arial", "B", 8)
-        for h, w in [("Ingredient", 0.3), ("Qty/Meal", 0.15), ("Meals", 0.15), ("Batch Total", 0.25), ("Batch", 0.15)]:
-            pdf.cell(col_w * w, ch, h, 1)
-        pdf.ln(ch)
-
-        pdf.set_font("Arial", "", 8)
-        tot = meal_totals.get(name.upper(), 0)
-        batch_val = data.get("batch", 0)
-        batches = math.ceil(tot / batch_val) if batch_val > 0 else 0
+        table_headers(x, table["columns"])
+        table_rows(x, table)
 
-        for i, (ing, qty) in enumerate(data["ingredients"].items()):
-            if batch_val > 0 and batches > 0:
-                bt = (qty * tot / batches)
-                bl = str(batches) if i == 0 else ""
-            else:
-                bt = qty * tot
-                bl = ""
-
-            pdf.set_x(x)
-            pdf.cell(col_w * 0.3, ch, ing[:20], 1)
-            pdf.cell(col_w * 0.15, ch, fmt_qty(qty), 1)
-            pdf.cell(col_w * 0.15, ch, str(tot), 1)
-            pdf.cell(col_w * 0.25, ch, fmt_int_up(bt), 1)
-            pdf.cell(col_w * 0.15, ch, bl, 1)
-            pdf.ln(ch)
-
-        if "sub_section" in data:
-            subsec = data["sub_section"]
+        if "sub_section" in table:
+            subsec = table["sub_section"]
             pdf.set_x(x)
             pdf.set_font("Arial", "B", 9)
             pdf.cell(col_w, ch, subsec["title"], ln=1)
 
-            pdf.set_x(x)
-            pdf.set_font("Arial", "B", 8)
-            for h, w in [("Ingredient", 0.3), ("Qty/Meal", 0.15), ("Meals", 0.15), ("Total", 0.25), ("", 0.15)]:
-                pdf.cell(col_w * w, ch, h, 1)
-            pdf.ln(ch)
-
-            pdf.set_font("Arial", "", 8)
-            for ingr, per in subsec["ingredients"].items():
-                adj = per * tot
-                pdf.set_x(x)
-                pdf.cell(col_w * 0.3, ch, str(ingr)[:20], 1)
-                pdf.cell(col_w * 0.15, ch, fmt_qty(per), 1)
-                pdf.cell(col_w * 0.15, ch, str(tot), 1)
-                pdf.cell(col_w * 0.25, ch, fmt_int_up(adj), 1)
-                pdf.cell(col_w * 0.15, ch, "", 1)
-                pdf.ln(ch)
+            table_headers(x, subsec["columns"])
+            table_rows(x, subsec)
 
         heights[col] = pdf.get_y() + pad
 
@@ -0,0 +1,166 @@
+from production_pdf import ProductionPDF
+from summary_section import draw_summary_section
+from bulk_section import draw_bulk_section, calc_bulk_tables, bulk_sections
+from recipes_section import draw_recipes_section, calc_recipe_tables, meal_recipes
+from prepack_room_section import draw_prepack_room_section, calc_prepack_room_groups
+from meat_veg_section import draw_meat_veg_section, calc_meat_veg_tables
+from recipe_matrix import ingredient_matrix_for
+from perf_trace import span
+
+# ---------- Page layout (mm) ----------
+A4_W, A4_H = 210, 297
+LEFT = 10
+PAGE_W = A4_W - 20
+COL_W = PAGE_W / 2 - 5
+CH, PAD, BOTTOM = 6, 4, A4_H - 17
+XPOS = [LEFT, LEFT + COL_W + 10]
+
+# Report sections in print order: key -> (label, copies)
+# Keys double as the station sheet ids used by the UI.
+REPORT_SECTIONS = {
+    "summary": ("Meal Production Summary", 2),
+    "bulk": ("Bulk Raw Ingredients to Cook", 3),
+    "recipes": ("Meal Raw Ingredients to Cook", 2),
+    "prepack_room": ("Pre-Pack Room", 1),
+    "meat_veg": ("Meat Order and Veg Prep", 3),
+}
+
+def summary_columns(brand_names):
+    return ["Product name"] + list(brand_names) + ["Already Made", "Total"]
+
+
+def prepared_recipes(bulk_toggles):
+    """Ticked bulk toggles -> the recipes whose ingredients count as already prepared.
+
+    The shared recipe data is never copied or modified: this set is applied as
+    a mask when the recipe amounts are calculated.
+    """
+    return frozenset(r for r, c in (bulk_toggles or {}).items() if c and r in meal_recipes)
+
+
+def meal_totals_from_summary(edited_df):
+    return dict(zip(edited_df["Product name"].str.upper(), edited_df["Total"]))
+
+
+def calc_section(key, meal_totals, prepared, only=None):
+    """One calculated section in its drawing shape (prepack: groups; recipes: with sub_sections).
+
+    `only` limits it to some tables / lines (see report_dependencies for the keys).
+    """
+    if key == "bulk":
+        return calc_bulk_tables(meal_totals, only=only)
+    if key == "recipes":
+        return calc_recipe_tables(meal_totals, prepared=prepared, only=only)
+    if key == "prepack_room":
+        return calc_prepack_room_groups(meal_totals, only=only)
+    if key == "meat_veg":
+        return calc_meat_veg_tables(meal_totals, meal_recipes, bulk_sections, prepared, only=only)
+    raise KeyError(f"Unknown report section: {key}")
+
+
+def calc_report_tables(edited_df, bulk_toggles=None, sections=None, calculated=None):
+    """Computed tables per section, exactly as the PDF prints them, without rendering.
+
+    Returns {section_key: [table, ...]} for the requested calculated sections
+    (the summary is the edited table itself, so it is never included).
+    Sub-sections and pre-pack groups are flattened into their own tables.
+    `calculated` ({section_key: drawing shape}, e.g. from an IncrementalReport)
+    supplies sections that are already calculated for these inputs.
+    """
+    keys = [k for k in REPORT_SECTIONS if k != "summary" and (sections is None or k in sections)]
+
+    meal_totals = meal_totals_from_summary(edited_df)
+    prepared = prepared_recipes(bulk_toggles)
+    done = calculated or {}
+
+    out = {}
+    for key in keys:
+        section = done[key] if key in done else calc_section(key, meal_totals, prepared)
+        if key == "recipes":
+            tables = []
+            for table in section:
+                tables.append(table)
+                if "sub_section" in table:
+                    sub = table["sub_section"]
+                    tables.append(dict(sub, title=f"{table['title']}: {sub['title']}"))
+        elif key == "prepack_room":
+            tables = [dict(table, group=group["heading"]) for group in section for table in group["tables"]]
+        else:
+            tables = section
+        out[key] = tables
+    return out
+
+
+def calc_ingredient_totals(edited_df, bulk_toggles=None):
+    """Company-wide totals per purchasable ingredient for the day (see IngredientMatrix.totals_table)."""
+    return ingredient_matrix_for(meal_recipes).totals_table(
+        meal_totals_from_summary(edited_df), prepared_recipes(bulk_toggles)
+    )
+
+
+def _draw_section(pdf, key, edited_df, brand_names, production_date, meal_totals, calculated):
+    if key == "summary":
+        draw_summary_section(pdf, edited_df[summary_columns(brand_names)], brand_names, production_date)
+    elif key == "bulk":
+        pdf.add_page()
+        draw_bulk_section(
+            pdf, meal_totals, XPOS, COL_W, CH, PAD, BOTTOM,
+            start_y=pdf.get_y(),
+            header_date=production_date.strftime("%d/%m/%Y"),
+            tables=calculated,
+        )
+    elif key == "recipes":
+        pdf.add_page()
+        draw_recipes_section(
+            pdf, meal_totals, XPOS, COL_W, CH, PAD, BOTTOM,
+            start_y=pdf.get_y(),
+            tables=calculated,
+        )
+    elif key == "prepack_room":
+        draw_prepack_room_section(pdf, meal_totals, XPOS, COL_W, CH, PAD, BOTTOM, start_y=None, groups=calculated)
+    elif key == "meat_veg":
+        draw_meat_veg_section(
+            pdf, meal_totals, meal_recipes, bulk_sections, XPOS, COL_W, CH, PAD, BOTTOM, start_y=None,
+            tables=calculated,
+        )
+    else:
+        raise KeyError(f"Unknown report section: {key}")
+
+
+def build_report_pdf(edited_df, brand_names, production_date, bulk_toggles=None, sections=None, calculated=None):
+    """Render the daily production report and return the PDF bytes.
+
+    Only the requested `sections` (keys of REPORT_SECTIONS, default: all) are
+    computed and drawn, each with its configured number of copies. Each section
+    is calculated once (or taken from `calculated`, see calc_report_tables)
+    and every copy prints that result. Ticked bulk toggles are applied as a
+    mask over the shared recipe data.
+    """
+    keys = [k for k in REPORT_SECTIONS if sections is None or k in sections]
+
+    meal_totals = meal_totals_from_summary(edited_df)
+    prepared = prepared_recipes(bulk_toggles)
+
+    pdf = ProductionPDF(header_date_str=production_date.strftime("%d/%m/%Y"))
+    pdf.set_auto_page_break(False)
+
+    done = calculated or {}
+    for key in keys:
+        _label, n_copies = REPORT_SECTIONS[key]
+        if key == "summary":
+            section = None
+        elif key in done:
+            section = done[key]
+        else:
+            with span("section.calc", section=key):
+                section = calc_section(key, meal_totals, prepared)
+        for c in range(1, n_copies + 1):
+            pdf.copy_no, pdf.copy_total = c, n_copies
+            with span("section.draw", section=key, copy=c):
+                _draw_section(pdf, key, edited_df, brand_names, production_date, meal_totals, section)
+
+    with span("pdf.output", pages=pdf.page_no()) as out:
+        pdf_bytes = pdf.output(dest="S").encode("latin1")
+        out["bytes"] = len(pdf_bytes)
+    return pdf_bytes
+
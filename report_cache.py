@@ -0,0 +1,94 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from report_builder import REPORT_SECTIONS, build_report_pdf, summary_columns
+from recipe_book import recipe_book_version
+from perf_trace import span
+
+
+def recipe_data_version() -> str:
+    """Short fingerprint of the recipe book the report is computed from."""
+    return recipe_book_version()[:12]
+
+
+def report_cache_key(summary_df, brand_names, production_date, bulk_toggles=None, sections=None) -> str:
+    """Deterministic key for one report: identical inputs -> identical key.
+
+    Covers the edited summary table, ticked bulk toggles, production date,
+    requested sections with their copy counts, and the recipe data version.
+    """
+    keys = [k for k in REPORT_SECTIONS if sections is None or k in sections]
+    h = hashlib.sha256()
+    h.update(summary_df[summary_columns(brand_names)].to_csv(index=False).encode("utf-8"))
+    h.update(json.dumps({
+        "date": production_date.isoformat(),
+        "bulk": sorted(r for r, c in (bulk_toggles or {}).items() if c),
+        "copies": {k: REPORT_SECTIONS[k][1] for k in keys},
+        "recipes": recipe_data_version(),
+    }, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+class ReportCache:
+    """Small LRU of generated PDF bytes, shared by every session in this process.
+
+    Also remembers which keys were already uploaded (and under which file name)
+    so an identical regeneration doesn't push a duplicate to GitHub.
+    """
+
+    def __init__(self, maxsize: int = 32):
+        self.maxsize = maxsize
+        self._pdfs = OrderedDict()
+        self._uploaded = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            pdf_bytes = self._pdfs.get(key)
+            if pdf_bytes is not None:
+                self._pdfs.move_to_end(key)
+            return pdf_bytes
+
+    def put(self, key, pdf_bytes):
+        with self._lock:
+            self._pdfs[key] = pdf_bytes
+            self._pdfs.move_to_end(key)
+            while len(self._pdfs) > self.maxsize:
+                old, _ = self._pdfs.popitem(last=False)
+                self._uploaded.pop(old, None)
+
+    def uploaded_name(self, key):
+        with self._lock:
+            return self._uploaded.get(key)
+
+    def mark_uploaded(self, key, filename):
+        with self._lock:
+            self._uploaded[key] = filename
+
+    def forget_uploaded(self, filename):
+        """Drop the upload record of a deleted file, so its inputs are pushed again."""
+        with self._lock:
+            for key in [k for k, name in self._uploaded.items() if name == filename]:
+                del self._uploaded[key]
+
+
+REPORT_CACHE = ReportCache()
+
+
+def get_or_build_report(edited_df, brand_names, production_date, bulk_toggles=None, sections=None, calculated=None):
+    """Return (cache_key, pdf_bytes), rendering only on a cache miss.
+
+    `calculated` sections (see build_report_pdf) are reused when rendering.
+    """
+    with span("report", sections=",".join(sections) if sections else "all") as report:
+        key = report_cache_key(edited_df, brand_names, production_date, bulk_toggles, sections)
+        pdf_bytes = REPORT_CACHE.get(key)
+        report["cache"] = "hit" if pdf_bytes is not None else "miss"
+        if pdf_bytes is None:
+            pdf_bytes = build_report_pdf(
+                edited_df, brand_names, production_date, bulk_toggles, sections=sections, calculated=calculated
+            )
+            REPORT_CACHE.put(key, pdf_bytes)
+    return key, pdf_bytes
@@ -0,0 +1,177 @@
+"""Which calculated report tables depend on which meals.
+
+Every table of the bulk, recipes and pre-pack sections, and every Veg Prep /
+Meat Order line, is a slot. The graph records the meals (UPPER-CASE, as in
+meal_totals) each slot reads, batch counts included. `IncrementalReport`
+uses it so that an edit to one meal in the Step 4 table recalculates only the
+slots reading that meal and splices them into the previous result.
+
+Slot keys, per section (the `only` keys of report_builder.calc_section):
+
+- "bulk": section title
+- "recipes": recipe name
+- "prepack_room": (group heading, table title)
+- "meat_veg": (table, line name), tables as in meat_veg_section.MEAT_VEG_TABLES
+"""
+from functools import lru_cache
+
+from recipe_book import load_recipe_book
+from report_builder import REPORT_SECTIONS, calc_section, meal_totals_from_summary, prepared_recipes
+from meat_veg_section import MEAT_VEG_TABLES
+from prepack_room_section import (
+    CHECKS_HEADING,
+    CHICKEN_MIX_HEADING,
+    GET_READY_HEADING,
+    INGREDIENTS_HEADING,
+    MEAT_READY_TITLE,
+    PREPARE_HEADING,
+    RICE_MIX_HEADING,
+    SAUCES_READY_TITLE,
+)
+
+
+def _upper(meals):
+    return frozenset(str(m).upper() for m in meals)
+
+
+def _prepack_slots(prepack):
+    slots = {}
+    for sauce in prepack["sauces_to_prepare"]:
+        slots[(PREPARE_HEADING, sauce["title"])] = _upper([sauce["meal"]])
+    slots[(GET_READY_HEADING, SAUCES_READY_TITLE)] = _upper(
+        m for sauce in prepack["sauces_to_get_ready"] for m in sauce.get("per_meal", [sauce.get("meal")])
+    )
+    slots[(GET_READY_HEADING, MEAT_READY_TITLE)] = _upper(m["meal"] for m in prepack["meat_to_get_ready"])
+    for item in prepack["ingredients_to_get_ready"]:
+        slots[(INGREDIENTS_HEADING, item["title"])] = _upper([item["meal"]])
+    for mix in prepack["chicken_mixes"]:
+        slots[(CHICKEN_MIX_HEADING, mix["name"])] = _upper([mix["meal"]])
+    for mix in prepack["rice_mixes"]:
+        slots[(RICE_MIX_HEADING, mix["title"])] = _upper([mix["meal"]])
+
+    # Cooked check rows take the first of several spellings that is present,
+    # so every spelling is a dependency
+    row_meals = {}
+    for check in prepack["cooked_checks"]:
+        slots[(CHECKS_HEADING, check["title"])] = _upper(m for row in check["rows"] for m in row["meals"])
+        for row in check["rows"]:
+            row_meals[(check["title"], row["label"])] = _upper(row["meals"])
+    lamb = prepack["lamb_recipe"]
+    slots[(CHECKS_HEADING, lamb["title"])] = row_meals[(lamb["base"]["check"], lamb["base"]["row"])]
+    return slots
+
+
+def _meat_veg_slots(meat_veg, bulk_meals):
+    slots = {}
+    for table in MEAT_VEG_TABLES:
+        for line in meat_veg[table]:
+            meals = set()
+            for term in line["terms"]:
+                if "bulk" in term:
+                    meals |= bulk_meals[term["bulk"]]
+                elif "meal" in term:
+                    meals.add(term["meal"])
+                else:
+                    meals.update(term.get("recipes", [term.get("recipe")]))
+            slots[(table, line["name"])] = _upper(meals)
+    return slots
+
+
+class ReportDependencies:
+    """Meal -> slot graph for the calculated report sections.
+
+    Ticking a bulk toggle changes the same slots as an edit to that recipe's
+    meal, so toggled recipes are treated as changed meals.
+    """
+
+    def __init__(self, book=None):
+        book = load_recipe_book() if book is None else book
+        bulk_meals = {sec["title"]: _upper(sec["meals"]) for sec in book["bulk_sections"]}
+        self.slots = {
+            "bulk": dict(bulk_meals),
+            "recipes": {name: _upper([name]) for name in book["meal_recipes"]},
+            "prepack_room": _prepack_slots(book["prepack_room"]),
+            "meat_veg": _meat_veg_slots(book["meat_veg"], bulk_meals),
+        }
+        # meal -> {section: {slot, ...}}
+        self.by_meal = {}
+        for section, slots in self.slots.items():
+            for slot, meals in slots.items():
+                for meal in meals:
+                    self.by_meal.setdefault(meal, {}).setdefault(section, set()).add(slot)
+
+    def affected(self, section, changed_meals) -> set:
+        """Slots of `section` that read any of `changed_meals`."""
+        out = set()
+        for meal in changed_meals:
+            out |= self.by_meal.get(str(meal).upper(), {}).get(section, set())
+        return out
+
+
+@lru_cache(maxsize=1)
+def get_report_dependencies() -> ReportDependencies:
+    """The shared dependency graph for the recipe book."""
+    return ReportDependencies()
+
+
+def changed_meals(old_totals, new_totals, old_prepared=frozenset(), new_prepared=frozenset()) -> set:
+    """Meals whose total differs (added / removed keys included), plus recipes whose toggle changed."""
+    changed = {m for m in old_totals.keys() | new_totals.keys() if old_totals.get(m) != new_totals.get(m)}
+    return changed | {r.upper() for r in set(old_prepared) ^ set(new_prepared)}
+
+
+def _splice(key, old, new):
+    """`old` section with the slots recalculated in `new` (same drawing shape, fewer tables/lines)."""
+    if key in ("bulk", "recipes"):
+        fresh = {table["title"]: table for table in new}
+        return [fresh.get(table["title"], table) for table in old]
+    if key == "prepack_room":
+        out = []
+        for old_group, new_group in zip(old, new):
+            fresh = {table["title"]: table for table in new_group["tables"]}
+            out.append(dict(old_group, tables=[fresh.get(t["title"], t) for t in old_group["tables"]]))
+        return out
+    if key == "meat_veg":
+        out = []
+        for old_table, new_table in zip(old, new):
+            fresh = {row[0]: row for row in new_table["rows"]}
+            out.append(dict(old_table, rows=[fresh.get(row[0], row) for row in old_table["rows"]]))
+        return out
+    raise KeyError(f"Unknown report section: {key}")
+
+
+class IncrementalReport:
+    """Calculated report sections kept up to date across edits (one per session).
+
+    `update` diffs the new meal totals and bulk toggles against the inputs each
+    section was last calculated for, and recalculates only the affected slots.
+    The result is identical to calculating every section from scratch.
+    """
+
+    def __init__(self, dependencies=None):
+        self.dependencies = dependencies or get_report_dependencies()
+        self.sections = {}
+        self._inputs = {}
+        # section -> slots recalculated by the last update (None: whole section)
+        self.last_recalculated = {}
+
+    def update(self, edited_df, bulk_toggles=None, sections=None) -> dict:
+        """{section_key: drawing shape} for the requested sections, as calc_section returns them."""
+        keys = [k for k in REPORT_SECTIONS if k != "summary" and (sections is None or k in sections)]
+        meal_totals = meal_totals_from_summary(edited_df)
+        prepared = prepared_recipes(bulk_toggles)
+
+        for key in keys:
+            if key not in self.sections:
+                self.sections[key] = calc_section(key, meal_totals, prepared)
+                self.last_recalculated[key] = None
+            else:
+                old_totals, old_prepared = self._inputs[key]
+                changed = changed_meals(old_totals, meal_totals, old_prepared, prepared)
+                dirty = self.dependencies.affected(key, changed)
+                if dirty:
+                    fresh = calc_section(key, meal_totals, prepared, only=dirty)
+                    self.sections[key] = _splice(key, self.sections[key], fresh)
+                self.last_recalculated[key] = dirty
+            self._inputs[key] = (meal_totals, prepared)
+        return {key: self.sections[key] for key in keys}
@@ -0,0 +1,142 @@
+"""Index of archived report PDFs, each filename parsed once.
+
+Daily reports are named daily_production_report_<yyyy-mm-dd>_<HH-MM-SS>.pdf
+and weekly summaries weekly_summary_<start>_to_<end>_<HH-MM-SS>.pdf. A
+`ReportIndex` turns a GitHub folder listing into one record per file:
+
+- "name", "download_url": as listed
+- "kind": DAILY or WEEKLY
+- "dt": generation time (a weekly summary is dated by its end day), None if
+  the name does not parse
+- "date": dt's date (None if undated); weekly records also have "start"
+- "month": (year, month) of "date", (-1, -1) if undated
+- "label": the UI label
+- "csv_path": the paired summary CSV (daily reports only)
+
+Records are kept sorted by time, so date ranges are two bisections and the
+listing is never re-parsed by the tabs that read it.
+
+Every regeneration of a day's report stays in the archive; the newest one
+is authoritative, and `latest_per_day` picks it so no day is counted twice.
+"""
+import calendar
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time
+
+DAILY = "daily"
+WEEKLY = "weekly"
+
+DAILY_PREFIX = "daily_production_report_"
+WEEKLY_PREFIX = "weekly_summary_"
+
+
+def parse_daily_filename(name: str):
+    """(yyyy-mm-dd, HH-MM-SS) strings of a daily report name, (None, None) if it does not parse."""
+    try:
+        base = name.replace(DAILY_PREFIX, "").replace(".pdf", "")
+        d, t = base.split("_", 1)
+        datetime.strptime(d, "%Y-%m-%d")
+        datetime.strptime(t, "%H-%M-%S")
+        return d, t
+    except Exception:
+        return None, None
+
+
+def month_label(year: int, month: int):
+    if year == -1 and month == -1:
+        return "Other"
+    return f"{calendar.month_name[month]} {year}"
+
+
+def _daily_record(name):
+    d, t = parse_daily_filename(name)
+    if not d:
+        return {"dt": None, "label": name}
+    dt = datetime.strptime(f"{d} {t}", "%Y-%m-%d %H-%M-%S")
+    # AU date + time
+    return {"dt": dt, "label": f"Daily Report — {dt.strftime('%d/%m/%Y %I:%M %p').replace(' 0', ' ')}"}
+
+
+def _weekly_record(name):
+    n = name.replace(WEEKLY_PREFIX, "").replace(".pdf", "")
+    try:
+        rng, tm = n.rsplit("_", 1)
+        start, _, end = rng.partition("_to_")
+        start = datetime.strptime(start, "%Y-%m-%d").date()
+        dt = datetime.strptime(f"{end} {tm}", "%Y-%m-%d %H-%M-%S")
+    except Exception:
+        return {"dt": None, "start": None, "label": name}
+    tlabel = dt.strftime("%I:%M %p").lstrip("0")
+    label = f"Weekly Summary — {start.strftime('%d/%m/%Y')} to {dt.strftime('%d/%m/%Y')} — {tlabel}"
+    return {"dt": dt, "start": start, "label": label}
+
+
+def report_record(name, download_url=None, kind=DAILY, csv_folder=None) -> dict:
+    """One listed file as an index record (see the module docstring)."""
+    record = {"name": name, "download_url": download_url, "kind": kind}
+    record.update(_weekly_record(name) if kind == WEEKLY else _daily_record(name))
+    dt = record["dt"]
+    record["date"] = dt.date() if dt else None
+    record["month"] = (dt.year, dt.month) if dt else (-1, -1)
+    record["csv_path"] = f"{csv_folder}/{name.replace('.pdf', '.csv')}" if csv_folder and kind == DAILY else None
+    return record
+
+
+def latest_per_day(records) -> list:
+    """The newest generation of each dated report among `records`, newest first."""
+    latest = {}
+    for r in records:
+        if r["date"] is not None and (r["date"] not in latest or r["dt"] > latest[r["date"]]["dt"]):
+            latest[r["date"]] = r
+    return sorted(latest.values(), key=lambda r: r["dt"], reverse=True)
+
+
+class ReportIndex:
+    """Records of one report folder listing, sorted by time.
+
+    Undated names sort before every dated one, so they never fall in a date
+    range and are listed last (as "Other") when newest first.
+    """
+
+    def __init__(self, records):
+        # oldest first; ties keep their order
+        self.records = sorted(records, key=lambda r: r["dt"] or datetime.min)
+        self._times = [r["dt"] or datetime.min for r in self.records]
+        self.by_name = {r["name"]: r for r in self.records}
+        self._months = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def newest_first(self) -> list:
+        return self.records[::-1]
+
+    def in_range(self, start, end) -> list:
+        """Records generated on start..end (dates, inclusive), newest first."""
+        lo = bisect_left(self._times, datetime.combine(start, time.min))
+        hi = bisect_right(self._times, datetime.combine(end, time.max))
+        return self.records[lo:hi][::-1]
+
+    def latest_per_day(self, start=None, end=None) -> list:
+        """Newest generation of each day's report (on start..end if given), newest first."""
+        if start is None or end is None:
+            return latest_per_day(self.records)
+        return latest_per_day(self.in_range(start, end))
+
+    def by_month(self) -> dict:
+        """{(year, month): records newest first}, months newest first ((-1, -1) last)."""
+        if self._months is None:
+            self._months = {}
+            for r in reversed(self.records):
+                self._months.setdefault(r["month"], []).append(r)
+        return self._months
+
+    def search(self, text) -> "ReportIndex":
+        """Index of the records whose file name contains `text` (case-insensitive)."""
+        text = text.lower()
+        return ReportIndex(r for r in self.records if text in r["name"].lower())
+
+
+def report_index(files, kind=DAILY, csv_folder=None) -> ReportIndex:
+    """Index of a GitHub folder listing ([{"name", "download_url"}])."""
+    return ReportIndex(report_record(f["name"], f.get("download_url"), kind, csv_folder) for f in files or [])
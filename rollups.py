@@ -0,0 +1,125 @@
+"""Month / quarter rollups of the archived daily summaries, per brand.
+
+The archived daily summary CSVs (reports/data) keep their brand columns.
+`period_rollups` stacks every day of the requested periods into one frame
+and sums it with a single groupby over (period, product), so a quarter of
+daily files is one pass. A closed period (ended before today) has all its
+reports, so its rollup is kept in ROLLUP_CACHE, keyed by the exact reports
+it was built from: adding or deleting one of them builds it again. A period
+with a report whose CSV could not be loaded is not cached, so a CSV added
+later (e.g. by backfill_csvs) is picked up.
+"""
+import threading
+from datetime import date, timedelta
+
+import pandas as pd
+
+from range_summary_section import SUMMARY_FIXED_COLUMNS, stack_daily_frames
+
+PERIOD_KINDS = {
+    "month": "Month",
+    "quarter": "Quarter",
+}
+
+
+def period_key(day, kind) -> str:
+    """"2026-08" (month) or "2026-Q3" (quarter) for a date."""
+    if kind == "month":
+        return f"{day.year}-{day.month:02d}"
+    return f"{day.year}-Q{(day.month - 1) // 3 + 1}"
+
+
+def period_bounds(key, kind):
+    """(first day, last day) of a period key."""
+    year, part = key.split("-")
+    first_month = int(part) if kind == "month" else (int(part[1:]) - 1) * 3 + 1
+    last_month = first_month if kind == "month" else first_month + 2
+    start = date(int(year), first_month, 1)
+    after = date(int(year) + last_month // 12, last_month % 12 + 1, 1)
+    return start, after - timedelta(days=1)
+
+
+def period_label(key, kind) -> str:
+    start, end = period_bounds(key, kind)
+    if kind == "month":
+        return start.strftime("%B %Y")
+    return f"{key.split('-')[1]} {start.year} ({start.strftime('%b')} - {end.strftime('%b')})"
+
+
+def is_closed(key, kind, today=None) -> bool:
+    return period_bounds(key, kind)[1] < (today or date.today())
+
+
+class RollupCache:
+    """Rollups of closed periods, shared by every session in this process."""
+
+    def __init__(self):
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind, key, report_names):
+        with self._lock:
+            hit = self._tables.get((kind, key))
+        if hit is not None and hit[0] == frozenset(report_names):
+            return hit[1]
+        return None
+
+    def put(self, kind, key, report_names, table):
+        with self._lock:
+            self._tables[(kind, key)] = (frozenset(report_names), table)
+
+
+ROLLUP_CACHE = RollupCache()
+
+
+def rollup_frame(frames, kind, meal_order) -> pd.DataFrame:
+    """(day, summary_df) pairs -> one row per (period, meal).
+
+    Columns: "Period", "Product name", one column per brand (0 where a day
+    didn't have it), "Already Made", "Total". Meals follow `meal_order`;
+    other products are dropped.
+    """
+    stacked = stack_daily_frames(frames)
+    keys = {day: period_key(day, kind) for day in stacked["Day"].unique()}
+    stacked["Period"] = stacked["Day"].map(keys)
+    stacked = stacked[stacked["Product name"].isin(meal_order)]
+
+    brand_cols = [c for c in stacked.columns if c not in SUMMARY_FIXED_COLUMNS and c not in ("Day", "Period")]
+    out = stacked.groupby(["Period", "Product name"])[brand_cols + ["Already Made", "Total"]].sum().reset_index()
+    out["meal_order"] = out["Product name"].map({m: i for i, m in enumerate(meal_order)})
+    out = out.sort_values(["Period", "meal_order"]).drop(columns="meal_order")
+    out[brand_cols + ["Already Made", "Total"]] = out[brand_cols + ["Already Made", "Total"]].astype(int)
+    return out.reset_index(drop=True)
+
+
+def period_rollups(kind, period_reports, load_frames, meal_order, today=None) -> dict:
+    """{period key: rollup table (as rollup_frame, without "Period")} for the periods that have data.
+
+    `period_reports` is {period key: [report names]}; `load_frames(names)`
+    returns their (day, summary_df) pairs, one per report whose CSV loaded.
+    Cached closed periods are not loaded again; the rest are loaded together
+    and summed in one groupby.
+    """
+    tables, todo = {}, {}
+    for key, names in period_reports.items():
+        cached = ROLLUP_CACHE.get(kind, key, names) if is_closed(key, kind, today) else None
+        if cached is not None:
+            tables[key] = cached
+        elif names:
+            todo[key] = names
+
+    frames = load_frames([n for names in todo.values() for n in names]) if todo else []
+    if frames:
+        # A period keeps the brand columns of its own reports only
+        period_brands, loaded = {}, {}
+        for day, df in frames:
+            key = period_key(day, kind)
+            period_brands.setdefault(key, set()).update(df.columns)
+            loaded[key] = loaded.get(key, 0) + 1
+        for key, part in rollup_frame(frames, kind, meal_order).groupby("Period", sort=False):
+            table = part.drop(columns="Period").reset_index(drop=True)
+            table = table[[c for c in table.columns if c in SUMMARY_FIXED_COLUMNS or c in period_brands[key]]]
+            tables[key] = table
+            if key in todo and loaded[key] == len(todo[key]) and is_closed(key, kind, today):
+                ROLLUP_CACHE.put(kind, key, todo[key], table)
+    return tables
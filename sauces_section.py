@@ -1,18 +1,11 @@
 import math
+from collections.abc import Mapping
 from utils import fmt_int_up, fmt_weight
+from recipe_book import load_recipe_book
 
-def draw_sauces_section(pdf, meal_totals, xpos, col_w, ch, pad, bottom, start_y=None):
-    sauces = {
-        "Thai Sauce": {
-            "ingredients": [("Green Curry Paste", 7.21), ("Coconut Cream", 97.85)],
-            "meal_key": "THAI GREEN CHICKEN CURRY"
-        },
-        "Lamb Sauce": {
-            "ingredients": [("Greek Yogurt", 20), ("Garlic", 1), ("Salt", 0.2)],
-            "meal_key": "LAMB SOUVLAKI"
-        }
-    }
+SAUCES = load_recipe_book()["sauces"]
 
+def draw_sauces_section(pdf, meal_totals, xpos, col_w, ch, pad, bottom, start_y=None):
     pdf.add_page()
     pdf.set_font("Arial", "B", 14)
     pdf.cell(0, 10, "Sauces", ln=1, align='C')
@@ -21,10 +14,11 @@ def draw_sauces_section(pdf, meal_totals, xpos, col_w, ch, pad, bottom, start_y=
     heights = [pdf.get_y(), pdf.get_y()]
     col = 0
 
-    for name, data in sauces.items():
-        if not isinstance(data, dict) or "ingredients" not in data or "meal_key" not in data:
+    for data in SAUCES:
+        if not isinstance(data, Mapping) or "ingredients" not in data or "meal" not in data:
             continue
-        if not isinstance(data["ingredients"], list):
+        name = data.get("title")
+        if not isinstance(data["ingredients"], (list, tuple)):
             continue
 
         rows = 2 + len(data["ingredients"])
@@ -54,7 +48,7 @@ def draw_sauces_section(pdf, meal_totals, xpos, col_w, ch, pad, bottom, start_y=
 
         pdf.set_font("Arial", "", 8)
 
-        key = data["meal_key"].upper()
+        key = data["meal"].upper()
         tm = meal_totals.get(key, 0)
         if not isinstance(tm, (int, float)):
             tm = 0
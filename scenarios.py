@@ -0,0 +1,138 @@
+"""What-if scenarios for a day's production summary, evaluated in batches.
+
+A scenario perturbs the edited summary (the Step 4 table):
+
+- "brand_scale": {brand: factor}, e.g. {"Clean Eats": 1.15} for +15%
+  (scaled brand quantities are rounded up to whole meals)
+- "meal_overrides": {meal: total}, replacing a meal's final Total
+- "bulk_toggles": {recipe: bool}, like the Step 3 toggles
+
+Every scenario becomes one row of a scenarios x meals matrix. Ingredient
+totals, batch counts and Meat Order / Veg Prep lines are then evaluated for
+all rows at once (one pass per distinct set of bulk toggles, since those
+change the recipe matrix), and returned side by side as a comparison table.
+"""
+import numpy as np
+import pandas as pd
+
+from batch_planner import get_batch_planner
+from ingredient_registry import ingredient_info
+from recipe_book import UNIT_GRAMS
+from recipe_matrix import get_bulk_matrix, get_ingredient_matrix, get_recipe_matrix
+from meat_veg_section import meat_veg_plan
+from report_builder import prepared_recipes
+
+# Comparison table columns besides one column per scenario
+SCENARIO_LABEL_COLUMNS = ("Group", "Item", "Unit")
+
+# Batch rule kinds (see BatchPlanner) -> group label in the comparison table
+BATCH_GROUPS = {
+    "recipe": "Recipe batches",
+    "bulk": "Bulk batches",
+    "chicken_mix": "Chicken mix batches",
+    "rice_mix": "Rice mix batches",
+    "mix": "Mix batches",
+}
+
+
+def scenario(name, brand_scale=None, meal_overrides=None, bulk_toggles=None) -> dict:
+    return {
+        "name": name,
+        "brand_scale": dict(brand_scale or {}),
+        "meal_overrides": dict(meal_overrides or {}),
+        "bulk_toggles": dict(bulk_toggles or {}),
+    }
+
+
+def scenario_totals(edited_df, brand_names, scenarios) -> np.ndarray:
+    """scenarios x meals matrix of final meal totals on the shared meal axis."""
+    meals = get_recipe_matrix().meals
+    meal_index = {m: i for i, m in enumerate(meals)}
+    products = edited_df["Product name"].astype(str).str.upper().tolist()
+
+    # summary rows -> meal axis (rows that are not meals drop out; a repeated
+    # product keeps its last row, like meal_totals_from_summary)
+    to_meals = np.zeros((len(products), len(meals)))
+    last_row = {product: r for r, product in enumerate(products) if product in meal_index}
+    for product, r in last_row.items():
+        to_meals[r, meal_index[product]] = 1
+
+    already = pd.to_numeric(edited_df["Already Made"], errors="coerce").fillna(0).to_numpy(dtype=float)
+    if brand_names:
+        brands = edited_df[list(brand_names)].apply(pd.to_numeric, errors="coerce").fillna(0).to_numpy(dtype=float)
+        scale = np.array([[s["brand_scale"].get(b, 1.0) for b in brand_names] for s in scenarios], dtype=float)
+        # scenarios x rows x brands -> whole meals per brand, then the summary's Total rule
+        scaled = np.ceil(brands[None, :, :] * scale[:, None, :] - 1e-9)
+        totals = np.clip(scaled.sum(axis=2) - already[None, :], 0, None)
+    else:
+        totals = np.zeros((len(scenarios), len(products)))
+
+    T = totals @ to_meals
+    for s, spec in enumerate(scenarios):
+        for meal, total in spec["meal_overrides"].items():
+            i = meal_index.get(str(meal).strip().upper())
+            if i is not None:
+                T[s, i] = max(float(total), 0)
+    return T
+
+
+def _ingredient_rows(grams, ids):
+    """(group, item, unit) labels and amounts (purchase units) for canonical ingredient columns."""
+    infos = [ingredient_info(cid) for cid in ids]
+    order = sorted(range(len(ids)), key=lambda c: (infos[c]["category"], infos[c]["name"]))
+    labels = [("Ingredients", infos[c]["name"], infos[c]["unit"]) for c in order]
+    amounts = [grams[:, c] / UNIT_GRAMS.get(infos[c]["unit"], 1) for c in order]
+    return labels, amounts
+
+
+def evaluate_scenarios(edited_df, brand_names, scenarios) -> pd.DataFrame:
+    """Comparison table: one row per ingredient / batch rule / meat-veg line, one column per scenario.
+
+    Rows that are zero in every scenario are left out. Ingredients are in
+    purchase units, Meat Order / Veg Prep in grams rounded up like the report.
+    """
+    T = scenario_totals(edited_df, brand_names, scenarios)
+    rm, bm = get_recipe_matrix(), get_bulk_matrix()
+    im = get_ingredient_matrix()
+    planner = get_batch_planner()
+    plan = meat_veg_plan(rm, bm)
+
+    grams = np.zeros((len(scenarios), len(im.ids)))
+    meat_veg = {}
+    # Scenarios sharing the same bulk toggles are evaluated together
+    groups = {}
+    for s, spec in enumerate(scenarios):
+        groups.setdefault(prepared_recipes(spec["bulk_toggles"]), []).append(s)
+    for prepared, rows in groups.items():
+        grams[rows] = im.totals(T[rows], prepared)
+        for table, (names, amounts) in plan.evaluate_days(T[rows], prepared).items():
+            names, all_amounts = meat_veg.setdefault(table, (names, np.zeros((len(scenarios), len(names)))))
+            all_amounts[rows] = amounts
+
+    labels, values = _ingredient_rows(grams, im.ids)
+    batches = planner.plan(T)
+    # recipe / mix rules are keyed by UPPER-CASE meal: print the recipe's own spelling
+    spelling = {n.upper(): n for n in rm.recipe_rows}
+    for r, (kind, name) in enumerate(planner.keys):
+        labels.append((BATCH_GROUPS.get(kind, kind), spelling.get(name, name), "batches"))
+        values.append(batches[:, r])
+    for table, (names, amounts) in meat_veg.items():
+        rounded = np.where(amounts >= 0, np.ceil(amounts), np.floor(amounts))
+        group = table.replace("_", " ").title()
+        for k, name in enumerate(names):
+            labels.append((group, name, "g"))
+            values.append(rounded[:, k])
+
+    values = np.array(values).reshape(len(labels), len(scenarios))
+    keep = np.flatnonzero(np.any(values != 0, axis=1))
+    out = pd.DataFrame([labels[k] for k in keep], columns=list(SCENARIO_LABEL_COLUMNS))
+    scenario_cols = pd.DataFrame(values[keep].round(3), columns=[s["name"] for s in scenarios])
+    return pd.concat([out, scenario_cols], axis=1)
+
+
+def scenario_deltas(table: pd.DataFrame) -> pd.DataFrame:
+    """The comparison table with every scenario shown as its change from the first (baseline) one."""
+    cols = [c for c in table.columns if c not in SCENARIO_LABEL_COLUMNS]
+    out = table.copy()
+    out[cols[1:]] = out[cols[1:]].sub(out[cols[0]], axis=0).round(3)
+    return out
@@ -0,0 +1,44 @@
+from datetime import date
+
+import pandas as pd
+
+from content_index import ContentIndex, parse_query
+
+PRODUCTS = ["Butter Chicken", "Lamb Souvlaki"]
+COLUMNS = ["Clean Eats", "Already Made", "Total"]
+
+
+def summary(butter, lamb):
+    return pd.DataFrame({
+        "Product name": PRODUCTS,
+        "Clean Eats": [butter, lamb],
+        "Already Made": [0, 0],
+        "Total": [butter, lamb],
+    })
+
+
+def index():
+    records = [
+        {"name": "a.pdf", "date": date(2026, 8, 3), "csv_path": "reports/data/a.csv"},
+        {"name": "b.pdf", "date": date(2026, 8, 4), "csv_path": "reports/data/b.csv"},
+        {"name": "c.pdf", "date": date(2026, 8, 5), "csv_path": "reports/data/c.csv"},
+    ]
+    frames = {"a.pdf": summary(0, 12), "b.pdf": summary(3, 0), "c.pdf": summary(40, 7)}
+    contents = ContentIndex()
+    contents.sync(records, lambda todo: ([(r["name"], frames[r["name"]]) for r in todo], []))
+    return contents
+
+
+def test_equal_to_zero_finds_days_without_the_product():
+    query = parse_query("Butter Chicken total = 0", PRODUCTS, COLUMNS)
+    assert index().query(**query)["report"].tolist() == ["a.pdf"]
+
+
+def test_less_than_includes_zero_days():
+    query = parse_query("Butter Chicken < 5", PRODUCTS, COLUMNS)
+    assert index().query(**query)["report"].tolist() == ["b.pdf", "a.pdf"]
+
+
+def test_containing_skips_zero_days():
+    query = parse_query("Lamb Souvlaki in August", PRODUCTS, COLUMNS, today=date(2026, 10, 19))
+    assert index().query(**query)["report"].tolist() == ["c.pdf", "a.pdf"]
@@ -0,0 +1,24 @@
+import metrics
+import perf_trace
+from perf_trace import span
+
+
+def test_failed_and_ok_api_calls_render_together(monkeypatch):
+    monkeypatch.setattr(metrics.API_CALLS, "values", {})
+    monkeypatch.setattr(metrics.API_SECONDS, "values", {})
+    with span("github", method="GET") as call:
+        call["status"] = 200
+    with span("github", method="GET"):
+        pass  # the request raised: no status
+    text = metrics.render_metrics()
+    assert 'github_api_calls_total{method="GET",status="200"} 1' in text
+    assert 'github_api_calls_total{method="GET",status="error"} 1' in text
+
+
+def test_a_failing_listener_does_not_break_the_span(monkeypatch):
+    def broken(record):
+        raise TypeError("boom")
+
+    monkeypatch.setattr(perf_trace, "SPAN_LISTENERS", [broken, *perf_trace.SPAN_LISTENERS])
+    with span("step") as record:
+        record["ok"] = True
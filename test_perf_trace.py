@@ -0,0 +1,25 @@
+import json
+
+import perf_trace
+from perf_trace import span
+
+
+def test_no_file_without_a_path(monkeypatch, tmp_path):
+    monkeypatch.setattr(perf_trace, "PERF_LOG_PATH", "")
+    monkeypatch.chdir(tmp_path)
+    with span("step"):
+        pass
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_log_is_rotated_at_the_size_cap(monkeypatch, tmp_path):
+    path = tmp_path / "perf_log.jsonl"
+    monkeypatch.setattr(perf_trace, "PERF_LOG_PATH", str(path))
+    monkeypatch.setattr(perf_trace, "PERF_LOG_MAX_BYTES", 200)
+    for n in range(10):
+        with span("step", n=n):
+            pass
+    assert path.stat().st_size < 200 + 100
+    assert (tmp_path / "perf_log.jsonl.1").exists()
+    last = json.loads(path.read_text(encoding="utf-8").splitlines()[-1])
+    assert last["n"] == 9
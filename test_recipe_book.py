@@ -0,0 +1,102 @@
+import copy
+import json
+
+import pytest
+
+from recipe_book import RECIPE_BOOK_PATH, RecipeBookError, load_recipe_book, validate_recipe_book
+
+with open(RECIPE_BOOK_PATH, encoding="utf-8") as f:
+    BOOK = json.load(f)
+
+
+def line(book, table, name):
+    return next(item for item in book["meat_veg"][table] if item["name"] == name)
+
+
+def drop_key(path, key):
+    def mutate(book):
+        obj = book
+        for part in path:
+            obj = obj[part]
+        del obj[key]
+    return mutate
+
+
+def set_value(path, value):
+    def mutate(book):
+        obj = book
+        for part in path[:-1]:
+            obj = obj[part]
+        obj[path[-1]] = value
+    return mutate
+
+
+def set_term(table, name, **fields):
+    def mutate(book):
+        line(book, table, name)["terms"][0].update(fields)
+    return mutate
+
+
+def rename_recipe_ingredient(book):
+    ingredients = book["meal_recipes"]["Butter Chicken"]["ingredients"]
+    ingredients["Chiken"] = ingredients.pop("Chicken")
+
+
+def replace_line(table, name, value):
+    def mutate(book):
+        lines = book["meat_veg"][table]
+        lines[lines.index(line(book, table, name))] = value
+    return mutate
+
+
+def drop_line_terms(book):
+    del line(book, "meat_order", "MINCE")["terms"]
+
+
+INVALID = {
+    "chicken mix without divisor": (drop_key(["prepack_room", "chicken_mixes", 0], "divisor"), "missing divisor"),
+    "rice mix without batch_size": (drop_key(["prepack_room", "rice_mixes", 0], "batch_size"), "missing batch_size"),
+    "chicken mix for an unknown meal": (set_value(["prepack_room", "chicken_mixes", 0, "meal"], "Chicken Pestp"), "unknown meal"),
+    "rice mix for an unknown meal": (set_value(["prepack_room", "rice_mixes", 0, "meal"], "Burrito"), "unknown meal"),
+    "mix_batch term for an unknown meal": (set_term("veg_prep", "SPINACH", meal="Gnocchi"), "unknown meal"),
+    "meals term for an unknown meal": (set_term("meat_order", "NORMAL CHICKEN", recipes=["Butter Chiken"]), "unknown meal"),
+    "recipe term for an unknown recipe": (set_term("meat_order", "CHUCK ROLL (LEBO)", recipe="Lebo Stew"), "unknown meal"),
+    "bulk term for an unknown section": (set_term("meat_order", "LAMB SHOULDER", bulk="Lamb"), "unknown bulk section"),
+    "bulk term for an ingredient the section lacks": (set_term("meat_order", "LAMB SHOULDER", ingredient="Chicken"), "has no"),
+    "unknown term type": (set_term("meat_order", "MINCE", type="recipe_sum"), "unknown term type"),
+    "line without terms": (drop_line_terms, "missing terms"),
+    "line that is not an object": (replace_line("meat_order", "MINCE", ["MINCE"]), "expected an object"),
+    "term ingredient not registered": (set_term("meat_order", "MINCE", ingredient="Mince Meat"), "not in the ingredient registry"),
+    "recipe ingredient not registered": (rename_recipe_ingredient, "not in the ingredient registry"),
+    "aliases that are not a list": (set_value(["ingredients", "chicken", "aliases"], "x"), "expected a list of spellings"),
+    "registry that is not an object": (set_value(["ingredients"], []), "ingredients: expected an object"),
+    "recipe ingredients that are not an object": (
+        set_value(["meal_recipes", "Butter Chicken", "ingredients"], [["Chicken", 100]]), "expected an object"),
+    "bulk meals that are not a list": (set_value(["bulk_sections", 0, "meals"], "Spaghetti Bolognese"), "list of meal names"),
+    "rice trays without rice_per_meal": (drop_key(["bulk_sections", 2], "rice_per_meal"), "missing rice_per_meal"),
+    "sauce without ingredients": (drop_key(["sauces", 0], "ingredients"), "missing ingredients"),
+    "sauce that is not an object": (set_value(["sauces", 0], "Thai Sauce"), "sauces[0]: expected an object"),
+    "negative per_meal": (set_term("meat_order", "NORMAL CHICKEN", per_meal=-1), "must be a number"),
+}
+
+
+def test_shipped_book_is_valid():
+    assert validate_recipe_book(BOOK) == []
+
+
+@pytest.mark.parametrize("case", list(INVALID))
+def test_invalid_book_is_reported(case):
+    mutate, message = INVALID[case]
+    book = copy.deepcopy(BOOK)
+    mutate(book)
+    errors = validate_recipe_book(book)
+    assert any(message in e for e in errors), errors
+
+
+def test_invalid_file_raises_recipe_book_error(tmp_path):
+    book = copy.deepcopy(BOOK)
+    drop_line_terms(book)
+    path = tmp_path / "recipe_book.json"
+    path.write_text(json.dumps(book), encoding="utf-8")
+    with pytest.raises(RecipeBookError, match="missing terms"):
+        load_recipe_book(str(path))
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from ingredient_registry import resolve
+from meat_veg_section import MEAT_VEG, meat_veg_plan
+from recipe_matrix import get_bulk_matrix, get_ingredient_matrix, get_recipe_matrix
+
+# Ingredients whose whole company-wide total is printed as Meat Order / Veg Prep lines
+LINE_IDS = (
+    "topside_steak", "beef_mince", "chuck_diced", "lamb_shoulder", "chicken", "premixed_chicken_thigh",
+    "potato", "sweet_potato", "carrot", "broccoli", "cabbage", "celery", "mushroom", "zucchini",
+)
+
+
+def line_totals(meal_totals, prepared=None):
+    """Canonical id -> sum of the printed lines made of that ingredient alone."""
+    rm, bm = get_recipe_matrix(), get_bulk_matrix()
+    printed = meat_veg_plan(rm, bm).evaluate(meal_totals, prepared)
+    totals = {}
+    for table, lines in MEAT_VEG.items():
+        amounts = dict(printed[table])
+        for line in lines:
+            ids = {resolve(term["ingredient"]) for term in line["terms"]}
+            if len(ids) == 1:
+                (cid,) = ids
+                totals[cid] = totals.get(cid, 0) + amounts[line["name"]]
+    return totals
+
+
+def ingredient_totals(meal_totals, prepared=None):
+    im = get_ingredient_matrix()
+    grams = im.totals(get_recipe_matrix().totals_vector(meal_totals), prepared)
+    return {cid: grams[c] for c, cid in enumerate(im.ids)}
+
+
+def test_steak_matches_meat_order():
+    meal_totals = {"STEAK ON ITS OWN": 10, "STEAK WITH MUSHROOM SAUCE": 10}
+    assert ingredient_totals(meal_totals)["topside_steak"] == pytest.approx(4000)
+    assert line_totals(meal_totals)["topside_steak"] == pytest.approx(4000)
+
+
+def test_rice_and_lamb_come_from_their_bulk_sections():
+    totals = ingredient_totals({"BEEF BURRITO BOWL": 10, "LAMB SOUVLAKI": 10})
+    assert totals["rice"] == pytest.approx(530)
+    assert totals["lamb_shoulder"] == pytest.approx(1487)
+
+
+@pytest.mark.parametrize("prepared", [None, ("Beef Chow Mein", "Steak On Its Own", "Lebanese Beef Stew")])
+def test_totals_match_printed_lines(prepared):
+    # Small counts keep every batch rule at one batch, so no line is rounded up
+    rng = np.random.default_rng(7)
+    meals = get_recipe_matrix().meals
+    for _ in range(20):
+        meal_totals = dict(zip(meals, rng.integers(0, 4, len(meals)).tolist()))
+        expected, actual = line_totals(meal_totals, prepared), ingredient_totals(meal_totals, prepared)
+        for cid in LINE_IDS:
+            assert actual[cid] == pytest.approx(expected[cid]), cid
@@ -0,0 +1,14 @@
+from report_cache import ReportCache
+
+
+def test_forget_uploaded_allows_a_new_push():
+    cache = ReportCache()
+    cache.put("a", b"pdf")
+    cache.mark_uploaded("a", "daily_production_report_2026-10-19_08-00-00.pdf")
+    cache.mark_uploaded("b", "other.pdf")
+
+    cache.forget_uploaded("daily_production_report_2026-10-19_08-00-00.pdf")
+
+    assert cache.uploaded_name("a") is None
+    assert cache.uploaded_name("b") == "other.pdf"
+    assert cache.get("a") == b"pdf"
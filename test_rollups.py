@@ -0,0 +1,34 @@
+from datetime import date
+
+import pandas as pd
+
+import rollups
+
+MEALS = ["Butter Chicken"]
+
+
+def frame(qty):
+    return pd.DataFrame({"Product name": MEALS, "Clean Eats": [qty], "Already Made": [0], "Total": [qty]})
+
+
+def test_period_with_a_missing_csv_is_not_cached(monkeypatch):
+    monkeypatch.setattr(rollups, "ROLLUP_CACHE", rollups.RollupCache())
+    days = {"r1": date(2025, 1, 6), "r2": date(2025, 1, 7)}
+    available = {"r1": frame(10)}
+    loads = []
+
+    def load_frames(names):
+        loads.append(list(names))
+        return [(days[n], available[n]) for n in names if n in available]
+
+    periods = {"2025-01": ["r1", "r2"]}
+    first = rollups.period_rollups("month", periods, load_frames, MEALS, today=date(2026, 1, 1))
+    assert first["2025-01"]["Total"].tolist() == [10]
+
+    available["r2"] = frame(5)  # e.g. backfilled from the PDF
+    second = rollups.period_rollups("month", periods, load_frames, MEALS, today=date(2026, 1, 1))
+    assert second["2025-01"]["Total"].tolist() == [15]
+
+    third = rollups.period_rollups("month", periods, load_frames, MEALS, today=date(2026, 1, 1))
+    assert third["2025-01"]["Total"].tolist() == [15]
+    assert len(loads) == 2
@@ -0,0 +1,63 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from utils import fmt_int_up, fmt_int_up_array, fmt_qty, fmt_qty_array
+
+EDGE_VALUES = [
+    0, 0.0, -0.0, 1, -1, 0.5, 1.5, 2.5, -0.5, -2.5, 3.5, 0.1 + 0.2, 1e-12, -1e-12,
+    0.0005, 0.0015, 0.9999999999, 1.0000000001, 123.4565, -7.25,
+    math.nan, math.inf, -math.inf, 2.0 ** 53 - 1, 2.0 ** 53, 2.0 ** 53 + 2, -(2.0 ** 53), 1e20, -1e19, 1e308,
+]
+
+ODD_VALUES = [None, "12", " 3.5 ", "abc", "", True, False, np.float32(1.1), np.int64(7), [1]]
+
+
+def random_values(rng, n):
+    values = []
+    for _ in range(n):
+        kind = rng.random()
+        if kind < 0.3:
+            values.append(rng.uniform(-1e4, 1e4))
+        elif kind < 0.5:
+            values.append(rng.randint(-10 ** 6, 10 ** 6))
+        elif kind < 0.7:
+            values.append(round(rng.uniform(-100, 100), rng.randint(0, 5)) + rng.choice([0, 0.5]))
+        elif kind < 0.85:
+            values.append(rng.uniform(0, 1) * 10 ** rng.randint(-5, 18))
+        else:
+            values.append(rng.choice(EDGE_VALUES))
+    return values
+
+
+def scalar_int_up(values):
+    return [fmt_int_up(v) for v in values]
+
+
+def scalar_qty(values, max_dp):
+    return [fmt_qty(v, max_dp) for v in values]
+
+
+@pytest.mark.parametrize("values", [EDGE_VALUES, ODD_VALUES, EDGE_VALUES + ODD_VALUES, []])
+def test_edge_values_match_scalar(values):
+    assert fmt_int_up_array(values) == scalar_int_up(values)
+    for max_dp in (0, 2, 3, 5):
+        assert fmt_qty_array(values, max_dp) == scalar_qty(values, max_dp)
+
+
+def test_random_values_match_scalar():
+    rng = random.Random(0)
+    for _ in range(500):
+        values = random_values(rng, rng.randint(1, 40))
+        assert fmt_int_up_array(values) == scalar_int_up(values)
+        assert fmt_qty_array(values) == scalar_qty(values, 3)
+        assert fmt_qty_array(values, 1) == scalar_qty(values, 1)
+
+
+def test_numpy_input_matches_scalar():
+    values = np.random.default_rng(0).normal(0, 1000, 2000)
+    values[::97] = np.nan
+    assert fmt_int_up_array(values) == scalar_int_up(values)
+    assert fmt_qty_array(values) == scalar_qty(values, 3)
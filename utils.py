@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 def fmt_int_up(value) -> str:
     """Round UP to a whole number string.
 
@@ -40,6 +42,52 @@ def fmt_qty(value, max_dp: int = 3) -> str:
     except Exception:
         return "0"
 
+# Beyond this float64 no longer holds every integer: such values use the scalar path
+_EXACT_INT = 2.0 ** 53
+
+
+def _float_array(values) -> np.ndarray:
+    """Values as floats, NaN wherever float(value) would fail (those format as "0")."""
+    try:
+        return np.asarray(values, dtype=float).reshape(-1)
+    except (TypeError, ValueError):
+        out = []
+        for v in values:
+            try:
+                out.append(float(v))
+            except Exception:
+                out.append(math.nan)
+        return np.array(out, dtype=float)
+
+
+def fmt_int_up_array(values) -> list:
+    """fmt_int_up over a whole column in one pass: same strings, one per value."""
+    v = _float_array(values)
+    exact = np.isfinite(v) & (np.abs(v) < _EXACT_INT)
+    safe = np.where(exact, v, 0.0)
+    rounded = np.where(safe >= 0, np.ceil(safe), np.floor(safe))
+    out = list(map(str, rounded.astype(np.int64).tolist()))
+    for k in np.flatnonzero(~exact):
+        out[k] = fmt_int_up(v[k])
+    return out
+
+
+def fmt_qty_array(values, max_dp: int = 3) -> list:
+    """fmt_qty over a whole column in one pass: same strings, one per value."""
+    v = _float_array(values)
+    exact = np.isfinite(v) & (np.abs(v) < _EXACT_INT)
+    safe = np.where(exact, v, 0.0)
+    nearest = np.round(safe)
+    whole = (np.abs(safe - nearest) < 1e-9).tolist()
+    pattern = f"%.{max_dp}f"
+    out = [
+        str(n) if w else (pattern % x).rstrip("0").rstrip(".")
+        for x, n, w in zip(safe.tolist(), nearest.astype(np.int64).tolist(), whole)
+    ]
+    for k in np.flatnonzero(~exact):
+        out[k] = fmt_qty(v[k], max_dp)
+    return out
+
 # Backwards-compatible alias (in case any old code still calls it)
 def fmt_weight(value) -> str:
     return fmt_int_up(value)